@@ -0,0 +1,155 @@
+"""Benchmark of the memory used by the sampled positions, colors and yaw angles
+of a synthetic drone show.
+
+The script samples a synthetic show (5000 drones, 30 minutes at 25 frames
+per second by default) and measures the memory needed to store one sample of
+each channel with `tracemalloc`, in three representations:
+
+- one plain dataclass instance per sample, as in earlier versions of the
+  add-on (reproduced below),
+- one instance of the current, slotted value types per sample
+  (`Point4D`, `Color4D` and `YawSetpoint`),
+- the array-backed model classes (`Trajectory`, `LightProgram` and
+  `YawSetpointList`).
+
+Only a subset of the drones is materialized (50 by default) because the
+object-based representations of the whole show would not fit into memory;
+the totals for the whole show are extrapolated from the subset. The sampled
+values are generated with a fixed random seed so the results are reproducible.
+
+The script needs the `mathutils` module, therefore it should be run with the
+Python interpreter bundled with Blender::
+
+    blender --background --factory-startup --python etc/benchmarks/memory.py
+
+Command line arguments can be passed to the script after a ``--`` separator,
+e.g. ``-- --drones 1000 --duration 600``.
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src" / "modules"))
+
+from sbstudio.model.color import Color4D  # noqa: E402
+from sbstudio.model.light_program import LightProgram  # noqa: E402
+from sbstudio.model.point import Point4D  # noqa: E402
+from sbstudio.model.trajectory import Trajectory  # noqa: E402
+from sbstudio.model.yaw import YawSetpoint, YawSetpointList  # noqa: E402
+
+
+@dataclass
+class LegacyPoint4D:
+    t: float
+    x: float
+    y: float
+    z: float
+
+
+@dataclass
+class LegacyColor4D:
+    t: float
+    r: int
+    g: int
+    b: int
+    is_fade: bool = True
+
+
+@dataclass
+class LegacyYawSetpoint:
+    time: float
+    angle: float
+
+
+def sample_drone(rng, num_frames, fps):
+    """Returns the sampled timestamps, positions, colors and yaw angles of a
+    single drone of the synthetic show, in the same data types as the ones
+    used by the exporter.
+    """
+    times = np.arange(num_frames, dtype=np.float64) / fps
+    steps = rng.normal(scale=0.05, size=(num_frames, 3)).astype(np.float32)
+    positions = np.cumsum(steps, axis=0, dtype=np.float32)
+    colors = rng.integers(0, 256, size=(num_frames, 3), dtype=np.uint8)
+    yaw_angles = np.cumsum(rng.normal(scale=0.5, size=num_frames))
+    return times, positions, colors, yaw_angles
+
+
+def measure(build, drones):
+    """Builds a representation of the given sampled drones with the given
+    function and returns the number of bytes allocated for it.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = [build(*drone) for drone in drones]
+        allocated = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del result
+    return allocated
+
+
+def objects_with(point_type, color_type, setpoint_type):
+    def build(times, positions, colors, yaw_angles):
+        times = times.tolist()
+        return (
+            [point_type(t, x, y, z) for t, (x, y, z) in zip(times, positions.tolist())],
+            [color_type(t, r, g, b) for t, (r, g, b) in zip(times, colors.tolist())],
+            [setpoint_type(t, angle) for t, angle in zip(times, yaw_angles.tolist())],
+        )
+
+    return build
+
+
+def arrays(times, positions, colors, yaw_angles):
+    return (
+        Trajectory.from_arrays(times, positions),
+        LightProgram.from_arrays(times, colors),
+        YawSetpointList.from_arrays(times, yaw_angles),
+    )
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--drones", type=int, default=5000)
+    parser.add_argument("--duration", type=float, default=1800, help="seconds")
+    parser.add_argument("--fps", type=int, default=25)
+    parser.add_argument("--measured-drones", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    options = parser.parse_args(argv)
+
+    num_frames = int(options.duration * options.fps) + 1
+    num_measured = min(options.measured_drones, options.drones)
+    rng = np.random.default_rng(options.seed)
+    drones = [sample_drone(rng, num_frames, options.fps) for _ in range(num_measured)]
+
+    num_samples = num_measured * num_frames
+    num_show_samples = options.drones * num_frames
+    print(
+        f"{options.drones} drones, {num_frames} frames each; measured "
+        f"{num_measured} drones and extrapolated to the whole show"
+    )
+    print("Bytes per sample of all three channels (position, color, yaw):")
+
+    for name, build in (
+        ("dataclasses", objects_with(LegacyPoint4D, LegacyColor4D, LegacyYawSetpoint)),
+        ("slotted dataclasses", objects_with(Point4D, Color4D, YawSetpoint)),
+        ("array-backed models", arrays),
+    ):
+        per_sample = measure(build, drones) / num_samples
+        total = per_sample * num_show_samples / 2**30
+        print(f"  {name:<20} {per_sample:8.1f} bytes/sample, {total:8.2f} GiB total")
+
+
+if __name__ == "__main__":
+    main()
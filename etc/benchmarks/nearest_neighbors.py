@@ -0,0 +1,78 @@
+"""Benchmark of the closest-pair algorithms used by the safety checks.
+
+Compares the divide-and-conquer algorithm of `find_nearest_neighbors()` with
+the spatial hash of `sbstudio.math.spatial_hash`, on random point sets of
+1000, 5000 and 20000 points, and checks that the closest pairs found by the
+two are at the same distance. It also measures the time needed to find all
+the pairs closer than the proximity threshold with the spatial hash.
+
+The points are drawn uniformly from a cube whose size is chosen such that
+there is one point per 3x3x3 m cell on average, which is denser than what a
+typical drone show looks like, and the proximity threshold is 3 m. The points
+are generated with a fixed random seed so the results are reproducible.
+
+The script does not depend on Blender::
+
+    python etc/benchmarks/nearest_neighbors.py
+"""
+
+import sys
+
+from pathlib import Path
+from timeit import repeat
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src" / "modules"))
+
+from sbstudio.math.nearest_neighbors import find_nearest_neighbors  # noqa: E402
+from sbstudio.math.spatial_hash import SpatialHash, find_closest_pair  # noqa: E402
+
+NUM_POINTS = (1000, 5000, 20000)
+THRESHOLD = 3.0
+NUM_REPEATS = 5
+
+
+def measure(func, *args):
+    """Returns the shortest running time of the given function with the given
+    arguments in milliseconds.
+    """
+    return min(repeat(lambda: func(*args), number=1, repeat=NUM_REPEATS)) * 1000
+
+
+def find_all_close_pairs(points):
+    return SpatialHash(points, THRESHOLD).find_pairs()
+
+
+def main():
+    rng = np.random.default_rng(42)
+
+    print(f"Proximity threshold: {THRESHOLD} m; times are in milliseconds")
+    print(
+        f"{'points':>8} {'divide & conquer':>17} {'spatial hash':>13} "
+        f"{'speedup':>8} {'all close pairs':>16}"
+    )
+
+    for num_points in NUM_POINTS:
+        side = (num_points * THRESHOLD**3) ** (1 / 3)
+        points = rng.uniform(0, side, size=(num_points, 3))
+
+        _, _, expected = find_nearest_neighbors(points)
+        _, _, distance = find_closest_pair(points, THRESHOLD)
+        if abs(expected - distance) > 1e-9:
+            raise RuntimeError(
+                f"closest pair mismatch for {num_points} points: "
+                f"{expected} != {distance}"
+            )
+
+        divide_and_conquer = measure(find_nearest_neighbors, points)
+        spatial_hash = measure(find_closest_pair, points, THRESHOLD)
+        all_pairs = measure(find_all_close_pairs, points)
+        print(
+            f"{num_points:>8} {divide_and_conquer:>17.1f} {spatial_hash:>13.1f} "
+            f"{divide_and_conquer / spatial_hash:>7.1f}x {all_pairs:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Benchmark of the JSON serializers of trajectories, light programs and yaw
+setpoint lists.
+
+Compares the current `as_dict()` methods with the original, pure Python
+implementations (reproduced below), checks that the JSON output of the two is
+byte-identical, and prints the running times.
+
+The script needs the `mathutils` module, therefore it should be run with the
+Python interpreter bundled with Blender::
+
+    blender --background --factory-startup --python etc/benchmarks/serialization.py
+"""
+
+import json
+import sys
+
+from pathlib import Path
+from random import Random
+from timeit import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src" / "modules"))
+
+from sbstudio.model.color import Color4D  # noqa: E402
+from sbstudio.model.light_program import LightProgram  # noqa: E402
+from sbstudio.model.point import Point4D  # noqa: E402
+from sbstudio.model.trajectory import Trajectory  # noqa: E402
+from sbstudio.model.yaw import YawSetpoint, YawSetpointList  # noqa: E402
+
+NUM_DRONES = 100
+NUM_POINTS = 5000
+NUM_REPEATS = 3
+
+
+def trajectory_as_dict(trajectory, ndigits=3, *, version=1):
+    if version == 0:
+        return {
+            "points": [
+                [
+                    round(point.t, ndigits=ndigits),
+                    round(point.x, ndigits=ndigits),
+                    round(point.y, ndigits=ndigits),
+                    round(point.z, ndigits=ndigits),
+                ]
+                for point in trajectory.points
+            ],
+            "version": 0,
+        }
+    else:
+        return {
+            "points": [
+                [
+                    round(point.t, ndigits=ndigits),
+                    [
+                        round(point.x, ndigits=ndigits),
+                        round(point.y, ndigits=ndigits),
+                        round(point.z, ndigits=ndigits),
+                    ],
+                    [],
+                ]
+                for point in trajectory.points
+            ],
+            "version": 1,
+        }
+
+
+def light_program_as_dict(light_program, ndigits=3):
+    return {
+        "data": [
+            [
+                round(color.t, ndigits=ndigits),
+                [int(color.r), int(color.g), int(color.b)],
+                1 if color.is_fade else 0,
+            ]
+            for color in light_program.colors
+        ],
+        "version": 1,
+    }
+
+
+def yaw_setpoints_as_dict(setpoints, ndigits=3):
+    return {
+        "setpoints": [
+            [
+                round(setpoint.time, ndigits=ndigits),
+                round(setpoint.angle, ndigits=ndigits),
+            ]
+            for setpoint in setpoints.setpoints
+        ],
+        "version": 1,
+    }
+
+
+def create_show(rng):
+    trajectories, light_programs, yaw_setpoints = [], [], []
+    for _ in range(NUM_DRONES):
+        times = [index / 24 for index in range(NUM_POINTS)]
+        trajectories.append(
+            Trajectory(
+                [
+                    Point4D(
+                        t=t,
+                        x=rng.uniform(-50, 50),
+                        y=rng.uniform(-50, 50),
+                        z=rng.uniform(0, 100),
+                    )
+                    for t in times
+                ]
+            )
+        )
+        light_programs.append(
+            LightProgram(
+                [
+                    Color4D(
+                        t=t,
+                        r=rng.randrange(256),
+                        g=rng.randrange(256),
+                        b=rng.randrange(256),
+                        is_fade=rng.random() < 0.5,
+                    )
+                    for t in times
+                ]
+            )
+        )
+        yaw_setpoints.append(
+            YawSetpointList(
+                [YawSetpoint(time=t, angle=rng.uniform(-360, 360)) for t in times]
+            )
+        )
+    return trajectories, light_programs, yaw_setpoints
+
+
+def run(name, items, old, new):
+    old_output = json.dumps([old(item) for item in items])
+    new_output = json.dumps([new(item) for item in items])
+    if old_output != new_output:
+        raise RuntimeError(f"{name}: output differs from the original")
+
+    old_time = timeit(lambda: [old(item) for item in items], number=NUM_REPEATS)
+    new_time = timeit(lambda: [new(item) for item in items], number=NUM_REPEATS)
+    print(
+        f"{name:<24} original: {old_time / NUM_REPEATS:7.3f}s  "
+        f"current: {new_time / NUM_REPEATS:7.3f}s  "
+        f"speedup: {old_time / new_time:5.2f}x"
+    )
+
+
+def main():
+    trajectories, light_programs, yaw_setpoints = create_show(Random(42))
+    print(f"{NUM_DRONES} drones, {NUM_POINTS} points each")
+
+    run(
+        "Trajectory, version 0",
+        trajectories,
+        lambda item: trajectory_as_dict(item, version=0),
+        lambda item: item.as_dict(version=0),
+    )
+    run(
+        "Trajectory, version 1",
+        trajectories,
+        lambda item: trajectory_as_dict(item, version=1),
+        lambda item: item.as_dict(version=1),
+    )
+    run("LightProgram", light_programs, light_program_as_dict, LightProgram.as_dict)
+    run(
+        "YawSetpointList", yaw_setpoints, yaw_setpoints_as_dict, YawSetpointList.as_dict
+    )
+
+
+if __name__ == "__main__":
+    main()
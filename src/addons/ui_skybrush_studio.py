@@ -70,6 +70,7 @@ from sbstudio.plugin.operators import (
     AddMarkersFromZippedCSVOperator,
     AppendFormationToStoryboardOperator,
     ApplyColorsToSelectedDronesOperator,
+    CheckSafetyOfShowOperator,
     CreateFormationOperator,
     CreateNewScheduleOverrideEntryOperator,
     CreateNewStoryboardEntryOperator,
@@ -201,6 +202,7 @@ operators = (
     ApplyColorsToSelectedDronesOperator,
     SwapColorsInLEDControlPanelOperator,
     ValidateTrajectoriesOperator,
+    CheckSafetyOfShowOperator,
     SetServerURLOperator,
     SkybrushExportOperator,
     SkybrushCSVExportOperator,
@@ -247,8 +249,10 @@ panels = (
 #: Headers in this addon
 headers = ()
 
-#: Background tasks in this addon
-tasks = (InitializationTask(), SafetyCheckTask(), UpdateLightEffectsTask())
+#: Background tasks in this addon. The order matters: frame change handlers
+#: registered earlier have priority in the per-frame time budget of the
+#: scheduler during playback; see `sbstudio.plugin.tasks.scheduler`
+tasks = (InitializationTask(), UpdateLightEffectsTask(), SafetyCheckTask())
 
 #: Getters for the overlays in this addon, used to disable them before unloading
 overlay_getters = (
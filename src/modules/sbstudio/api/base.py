@@ -9,14 +9,27 @@ from natsort import natsorted
 from pathlib import Path
 from shutil import copyfileobj
 from ssl import create_default_context, CERT_NONE
-from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from time import perf_counter
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 from urllib.error import HTTPError
 from urllib.parse import urljoin
 from urllib.request import Request, urlopen
+from zlib import compressobj, MAX_WBITS
 
 from sbstudio.model.color import Color3D
 from sbstudio.model.point import Point3D
 from sbstudio.model.light_program import LightProgram
+from sbstudio.model.point_cloud import PointCloud
 from sbstudio.model.safety_check import SafetyCheckParams
 from sbstudio.model.time_markers import TimeMarkers
 from sbstudio.model.trajectory import Trajectory
@@ -26,11 +39,18 @@ from sbstudio.utils import create_path_and_open
 
 from .constants import COMMUNITY_SERVER_URL
 from .errors import SkybrushStudioAPIError
-from .types import Limits, Mapping, SmartRTHPlan, TransitionPlan
+from .local import can_render_locally, render_locally
+from .types import Limits, Mapping, SmartRTHPlan, TransferStats, TransitionPlan
 
 __all__ = ("SkybrushStudioAPI",)
 
 
+Points = Union[Sequence[Coordinate3D], PointCloud]
+"""Type alias for the point sets accepted by the operations of the API: a
+sequence of coordinates or a point cloud.
+"""
+
+
 class Response:
     """Class representing a response from the Skybrush Studio API."""
 
@@ -107,6 +127,149 @@ class Response:
 
 _API_KEY_REGEXP = re.compile(r"^[a-zA-Z0-9-_.]*$")
 
+_STREAM_CHUNK_SIZE = 65536
+"""Minimum size of the compressed chunks sent in a single write when a request
+body is streamed to the server.
+"""
+
+
+def _iter_json(obj: Any, encoder: json.JSONEncoder) -> Iterator[str]:
+    """Encodes the given object as JSON incrementally, yielding the encoded
+    representation in fragments.
+
+    Dictionaries are encoded item by item. Iterators (e.g., generators) are
+    encoded as JSON arrays, and they are consumed lazily so the items that they
+    yield do not need to be in memory all at the same time. Everything else,
+    including lists, is encoded in one go with the given encoder; iterators
+    are therefore expanded lazily only if they are nested in dictionaries or
+    other iterators. The fragments, when concatenated, are identical to the
+    output of the `encode()` method of the encoder if the iterators are
+    replaced with lists.
+
+    Parameters:
+        obj: the object to encode
+        encoder: the JSON encoder to use for the leaf values
+    """
+    if isinstance(obj, dict):
+        yield "{"
+        items = sorted(obj.items()) if encoder.sort_keys else obj.items()
+        first = True
+        for key, value in items:
+            key = _convert_json_key(key, encoder)
+            if key is None:
+                continue
+            if not first:
+                yield encoder.item_separator
+            first = False
+            yield encoder.encode(key)
+            yield encoder.key_separator
+            yield from _iter_json(value, encoder)
+        yield "}"
+    elif isinstance(obj, Iterator):
+        yield "["
+        for index, item in enumerate(obj):
+            if index:
+                yield encoder.item_separator
+            yield from _iter_json(item, encoder)
+        yield "]"
+    else:
+        yield encoder.encode(obj)
+
+
+def _convert_json_key(key: Any, encoder: json.JSONEncoder) -> Optional[str]:
+    """Converts a dictionary key to a string in the same way as the given JSON
+    encoder does.
+
+    Returns:
+        the converted key or `None` if the key should be skipped because it is
+        not a valid JSON key and the encoder is configured to skip such keys
+
+    Raises:
+        TypeError: if the key is not a valid JSON key and the encoder is not
+            configured to skip such keys
+    """
+    if isinstance(key, str):
+        return key
+    elif isinstance(key, float):
+        # Same representation as for float values, including NaN and infinity
+        return encoder.encode(key)
+    elif key is True:
+        return "true"
+    elif key is False:
+        return "false"
+    elif key is None:
+        return "null"
+    elif isinstance(key, int):
+        return int.__repr__(key)
+    elif encoder.skipkeys:
+        return None
+    else:
+        raise TypeError(
+            f"keys must be str, int, float, bool or None, "
+            f"not {key.__class__.__name__}"
+        )
+
+
+def _points_as_list(points: Points) -> Sequence[Coordinate3D]:
+    """Converts a point set accepted by the operations of the API into a
+    sequence of coordinates that can be encoded as JSON.
+    """
+    return points.as_list() if isinstance(points, PointCloud) else points
+
+
+def _iter_gzipped(
+    fragments: Iterable[str], stats: Optional[TransferStats] = None
+) -> Iterator[bytes]:
+    """Encodes the given string fragments in UTF-8 and compresses them with
+    `gzip` incrementally, yielding the compressed data in chunks of at least
+    `_STREAM_CHUNK_SIZE` bytes (except the last one).
+
+    Parameters:
+        fragments: the fragments to compress
+        stats: optional statistics object to update while the fragments are
+            being produced, compressed and consumed
+    """
+    compressor = compressobj(wbits=MAX_WBITS | 16)
+    buffer = bytearray()
+    fragments = iter(fragments)
+
+    if stats is not None:
+        stats.is_streamed = True
+        stats.upload_started_at = perf_counter()
+
+    while True:
+        started_at = perf_counter()
+        fragment = next(fragments, None)
+        if fragment is None:
+            break
+
+        encoded = fragment.encode("utf-8")
+        encoded_at = perf_counter()
+        buffer += compressor.compress(encoded)
+
+        if stats is not None:
+            stats.serialization_time += encoded_at - started_at
+            stats.compression_time += perf_counter() - encoded_at
+            stats.uncompressed_bytes += len(encoded)
+
+        if len(buffer) >= _STREAM_CHUNK_SIZE:
+            if stats is not None:
+                stats.compressed_bytes += len(buffer)
+                stats.notify()
+            yield bytes(buffer)
+            buffer.clear()
+
+    buffer += compressor.flush()
+    if buffer:
+        if stats is not None:
+            stats.compressed_bytes += len(buffer)
+            stats.notify()
+        yield bytes(buffer)
+
+    if stats is not None:
+        # The consumer asked for more data so the last chunk was sent
+        stats.upload_finished_at = perf_counter()
+
 
 class SkybrushStudioAPI:
     """Class that represents a connection to the API of a Skybrush Studio
@@ -134,6 +297,8 @@ class SkybrushStudioAPI:
         self,
         url: str = COMMUNITY_SERVER_URL,
         api_key: Optional[str] = None,
+        *,
+        use_local_renderer: bool = False,
     ):
         """Constructor.
 
@@ -141,6 +306,9 @@ class SkybrushStudioAPI:
             url: the root URL of the Skybrush Studio API; defaults to the public
                 online service
             api_key: the API key used to authenticate with the server
+            use_local_renderer: whether to render exported shows on the local
+                machine instead of sending them to the server. Requires the
+                `skybrush` package; see `sbstudio.api.local`
         """
         self._api_key = None
         self._root = None  # type: ignore
@@ -148,6 +316,7 @@ class SkybrushStudioAPI:
 
         self.api_key = api_key
         self.url = url
+        self.use_local_renderer = use_local_renderer
 
     @property
     def api_key(self) -> Optional[str]:
@@ -158,6 +327,19 @@ class SkybrushStudioAPI:
     def api_key(self, value: Optional[str]) -> None:
         self._api_key = self.validate_api_key(value) if value else None
 
+    @property
+    def use_local_renderer(self) -> bool:
+        """Whether exported shows are rendered on the local machine instead
+        of sending them to the server. Exports fail instead of falling back
+        to the server if this is set and the renderers are not available
+        locally.
+        """
+        return self._use_local_renderer
+
+    @use_local_renderer.setter
+    def use_local_renderer(self, value: bool) -> None:
+        self._use_local_renderer = bool(value)
+
     @property
     def url(self) -> str:
         """The URL where the API can be accessed."""
@@ -170,7 +352,14 @@ class SkybrushStudioAPI:
         self._root = value
 
     @contextmanager
-    def _send_request(self, url: str, data: Any = None) -> Iterator[Response]:
+    def _send_request(
+        self,
+        url: str,
+        data: Any = None,
+        *,
+        stream: bool = False,
+        stats: Optional[TransferStats] = None,
+    ) -> Iterator[Response]:
         """Sends a request to the given URL, relative to the API root, and
         returns the corresponding HTTP response object.
 
@@ -187,6 +376,15 @@ class SkybrushStudioAPI:
                 object, it will be encoded as JSON, compressed with `gzip` and
                 then sent as a request with `Content-Type` equal to
                 `application/json`.
+            stream: whether to encode and compress the JSON request body
+                incrementally while it is being sent to the server with
+                chunked transfer encoding, instead of preparing the whole body
+                in advance. Iterators (e.g., generators) in `data` are consumed
+                lazily and they are encoded as JSON arrays. Ignored when `data`
+                is `None` or a `bytes` object.
+            stats: optional statistics object that is filled with the sizes
+                of the request body and the timings of the request while it
+                is being processed
 
         Raises:
             SkybrushStudioAPIError: when the request returned a non-successful
@@ -199,32 +397,54 @@ class SkybrushStudioAPI:
             method = "GET"
         else:
             method = "POST"
-            if not isinstance(data, bytes):
-                data = json.dumps(data).encode("utf-8")
+            if isinstance(data, bytes):
+                content_type = "application/octet-stream"
+                if stats is not None:
+                    stats.uncompressed_bytes = stats.compressed_bytes = len(data)
+            elif stream:
+                data = _iter_gzipped(_iter_json(data, json.JSONEncoder()), stats)
                 content_type = "application/json"
                 content_encoding = "gzip"
             else:
-                content_type = "application/octet-stream"
-
-        if content_encoding == "gzip":
-            data = compress(data)
+                started_at = perf_counter()
+                data = json.dumps(data).encode("utf-8")
+                encoded_at = perf_counter()
+                compressed_data = compress(data)
+                if stats is not None:
+                    stats.serialization_time = encoded_at - started_at
+                    stats.compression_time = perf_counter() - encoded_at
+                    stats.uncompressed_bytes = len(data)
+                    stats.compressed_bytes = len(compressed_data)
+                data = compressed_data
+                content_type = "application/json"
+                content_encoding = "gzip"
 
         headers = {}
         if content_type is not None:
             headers["Content-Type"] = content_type
         if content_encoding is not None:
             headers["Content-Encoding"] = content_encoding
+        if stream and content_type == "application/json":
+            # Body is an iterator of unknown length so it must be sent in chunks
+            headers["Transfer-Encoding"] = "chunked"
         if self._api_key is not None:
             headers["X-Skybrush-API-Key"] = self._api_key
 
         url = urljoin(self._root, url.lstrip("/"))
         req = Request(url, data=data, headers=headers, method=method)
 
+        if stats is not None and not stream:
+            stats.upload_started_at = perf_counter()
+
         try:
             with urlopen(req, context=self._request_context) as raw_response:
+                if stats is not None:
+                    stats.response_started_at = perf_counter()
                 response = Response(raw_response)
                 response._run_sanity_checks()
                 yield response
+                if stats is not None:
+                    stats.response_finished_at = perf_counter()
         except HTTPError as ex:
             # If the status code is 400 or 403, we may have more details about the
             # error in the response itself
@@ -303,6 +523,7 @@ class SkybrushStudioAPI:
         time_markers: Optional[TimeMarkers] = None,
         renderer: str = "skyc",
         renderer_params: Optional[Dict[str, Any]] = None,
+        stats: Optional[TransferStats] = None,
     ) -> Optional[bytes]:
         """Export drone show data into Skybrush Compiled Format (.skyc).
 
@@ -321,6 +542,16 @@ class SkybrushStudioAPI:
                 purposes in Skybrush Viewer
             time_markers: when specified, time markers will be exported to the
                 .skyc file as temporal cues
+            renderer: the name of the output format
+            renderer_params: additional parameters to pass to the renderer
+            stats: optional statistics object that is filled with the sizes
+                of the request body and the timings of the request; not used
+                when the show is rendered on the local machine
+
+        If `use_local_renderer` is set, the show is rendered on the local
+        machine with the `skybrush` package and it is not sent to the server
+        at all. The export fails if the package is not installed so the show
+        never leaves the machine when local rendering was requested.
 
         Note: drone names must match in trajectories and lights
 
@@ -368,10 +599,12 @@ class SkybrushStudioAPI:
                         "validation": validation.as_dict(ndigits=ndigits),
                     },
                     "swarm": {
-                        "drones": [
+                        # Generator, not a list; drones are formatted one by
+                        # one while the request body is being streamed
+                        "drones": (
                             format_drone(name)
                             for name in natsorted(trajectories.keys())
-                        ]
+                        )
                     },
                     "meta": meta,
                 },
@@ -382,7 +615,24 @@ class SkybrushStudioAPI:
         if renderer_params is not None:
             data["output"]["parameters"] = renderer_params
 
-        with self._send_request("operations/render", data) as response:
+        if self._use_local_renderer:
+            if not can_render_locally(renderer):
+                raise SkybrushStudioAPIError(
+                    "Local rendering is enabled but the skybrush Python package "
+                    f"is not installed or cannot render {renderer!r} files. "
+                    "Install the package or disable local rendering in the "
+                    "add-on preferences to render the show on the server."
+                )
+            return render_locally(
+                _iter_json(data["input"]["data"], json.JSONEncoder()),
+                output,
+                renderer=renderer,
+                parameters=renderer_params,
+            )
+
+        with self._send_request(
+            "operations/render", data, stream=True, stats=stats
+        ) as response:
             if output:
                 response.save_to_file(output)
             else:
@@ -440,6 +690,7 @@ class SkybrushStudioAPI:
         fps: float = 4,
         ndigits: int = 3,
         time_markers: Optional[TimeMarkers] = None,
+        stats: Optional[TransferStats] = None,
     ) -> None:
         """Export drone show data into Skybrush Compiled Format (.skyc).
 
@@ -451,6 +702,8 @@ class SkybrushStudioAPI:
             fps: number of frames per second in the plots [1/s]
             ndigits: round floats to this precision
             time_markers: temporal cues to use in the plots
+            stats: optional statistics object that is filled with the sizes
+                of the request body and the timings of the request
         """
 
         if time_markers is None:
@@ -492,7 +745,7 @@ class SkybrushStudioAPI:
             },
         }
 
-        with self._send_request("operations/render", data) as response:
+        with self._send_request("operations/render", data, stats=stats) as response:
             response.save_to_file(output)
 
     def get_limits(self) -> Limits:
@@ -502,8 +755,8 @@ class SkybrushStudioAPI:
 
     def match_points(
         self,
-        source: Sequence[Coordinate3D],
-        target: Sequence[Coordinate3D],
+        source: Points,
+        target: Points,
         *,
         radius: Optional[float] = None,
     ) -> Tuple[Mapping, Optional[float]]:
@@ -512,12 +765,18 @@ class SkybrushStudioAPI:
         trajectories between the matched points when neither the source nor the
         target points are too close to each other.
 
+        Point clouds are sent with their coordinates rounded to millimeters.
+
         Returns:
             the mapping and the minimum clearance between points during the
             transition; ``None`` if not known or not calculated due to
             efficiency reasons
         """
-        data = {"version": 1, "source": source, "target": target}
+        data = {
+            "version": 1,
+            "source": _points_as_list(source),
+            "target": _points_as_list(target),
+        }
         if radius is not None:
             data["radius"] = radius
 
@@ -638,8 +897,8 @@ class SkybrushStudioAPI:
 
     def plan_transition(
         self,
-        source: Sequence[Coordinate3D],
-        target: Sequence[Coordinate3D],
+        source: Points,
+        target: Points,
         *,
         max_velocity_xy: float,
         max_velocity_z: float,
@@ -654,8 +913,9 @@ class SkybrushStudioAPI:
         accelerations.
 
         Parameters:
-            source: the list of source points
-            target: the list of target points
+            source: the list or point cloud of source points; point clouds
+                are sent with their coordinates rounded to millimeters
+            target: the list or point cloud of target points
             max_velocity_xy: maximum allowed velocity in the XY plane
             max_velocity_z: maximum allowed velocity along the Z axis
             max_velocity_z_up: maximum allowed velocity along the Z axis, upwards,
@@ -671,8 +931,8 @@ class SkybrushStudioAPI:
 
         data = {
             "version": 1,
-            "source": source,
-            "target": target,
+            "source": _points_as_list(source),
+            "target": _points_as_list(target),
             "max_velocity_xy": max_velocity_xy,
             "max_velocity_z": max_velocity_z,
             "max_acceleration": max_acceleration,
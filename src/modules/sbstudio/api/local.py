@@ -0,0 +1,109 @@
+"""Rendering of drone shows on the local machine, without sending them to a
+Skybrush Studio server.
+
+Local rendering needs the `skybrush` Python package that contains the same
+importers and renderers that the Skybrush Studio server uses. The package is
+optional; when it is not installed, shows must be rendered by the server.
+
+There is deliberately no stand-alone .skyc writer in this module. Besides the
+show description, .skyc files contain compiled light programs and fitted
+trajectory segments whose encoding is defined by the `skybrush` package, and
+a re-implementation that drifts from it could produce files that the rest of
+the Skybrush toolchain misinterprets.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, Iterable, Optional
+
+__all__ = ("can_render_locally", "render_locally")
+
+
+_RENDERERS = {"skyc": "skybrush.io.skyc.renderer"}
+"""Mapping from the names of the output formats that can be rendered locally
+to the names of the corresponding renderers of the `skybrush` package.
+"""
+
+
+@lru_cache(maxsize=1)
+def _is_skybrush_installed() -> bool:
+    """Returns whether the `skybrush` package is installed."""
+    try:
+        from skybrush.io.base.importer import find_importer_function  # noqa: F401
+        from skybrush.io.base.renderer import find_renderer_function  # noqa: F401
+    except ImportError:
+        return False
+    else:
+        return True
+
+
+def can_render_locally(renderer: str = "skyc") -> bool:
+    """Returns whether shows can be rendered into the given output format on
+    the local machine.
+
+    Parameters:
+        renderer: the name of the output format, as used by the Skybrush Studio
+            server
+    """
+    return renderer in _RENDERERS and _is_skybrush_installed()
+
+
+def render_locally(
+    fragments: Iterable[str],
+    output: Optional[Path] = None,
+    *,
+    renderer: str = "skyc",
+    parameters: Optional[Dict[str, Any]] = None,
+) -> Optional[bytes]:
+    """Renders a drone show on the local machine.
+
+    The show is written into a temporary JSON file fragment by fragment so
+    the JSON representation of the whole show never needs to be in memory at
+    the same time, and then it is converted into the output format with the
+    renderers of the `skybrush` package.
+
+    Parameters:
+        fragments: the fragments of the Skybrush JSON representation of the
+            show, in the same format as the show data that is sent to the
+            Skybrush Studio server with a render request
+        output: the file path where the output should be saved or `None`
+            if the output must be returned instead of saving it to a file
+        renderer: the name of the output format
+        parameters: additional parameters to pass to the renderer
+
+    Returns:
+        the rendered show or `None` if an output filename was specified
+
+    Raises:
+        RuntimeError: if the show cannot be rendered into the given output
+            format on the local machine
+    """
+    if not can_render_locally(renderer):
+        raise RuntimeError(f"Output format {renderer!r} cannot be rendered locally")
+
+    from skybrush.io.base.importer import find_importer_function, ImportContext
+    from skybrush.io.base.renderer import find_renderer_function, RenderContext
+
+    with TemporaryDirectory() as work_dir:
+        json_path = Path(work_dir) / "show.json"
+        with open(json_path, "w", encoding="utf-8") as fp:
+            for fragment in fragments:
+                fp.write(fragment)
+
+        importer = find_importer_function("skybrush.io.json.importer")
+        world = importer([json_path], ImportContext(), {})
+
+        # Always render into the temporary directory first so a failed
+        # rendering does not leave a partially written output file behind
+        rendered_path = Path(work_dir) / f"show.{renderer}"
+        render = find_renderer_function(_RENDERERS[renderer])
+        render(world, RenderContext(), {**(parameters or {}), "output": rendered_path})
+
+        if output is None:
+            return rendered_path.read_bytes()
+
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        copyfile(rendered_path, output)
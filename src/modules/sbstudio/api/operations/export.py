@@ -1,12 +1,12 @@
 from natsort import natsorted
 from pathlib import Path
-from tempfile import TemporaryDirectory
 from typing import Dict
 
 from sbstudio.model.light_program import LightProgram
 from sbstudio.model.trajectory import Trajectory
 
 from ..enums import SkybrushJSONFormat
+from ..local import can_render_locally, render_locally
 
 from .base import SkybrushAPIOperationBase
 
@@ -101,32 +101,10 @@ class SkybrushExporter(SkybrushAPIOperationBase):
             output: the filename where the output content will be written
         """
 
-        try:
-            from skybrush.io.base.importer import find_importer_function, ImportContext
-            from skybrush.io.base.renderer import find_renderer_function, RenderContext
-
-            is_skybrush_installed = True
-        except ImportError:
-            is_skybrush_installed = False
-
-        # temporary hack to see intermediate results
-        # self.save_to_json(r"d:\download\temp.json", format=SkybrushJSONFormat.RAW)
-        # return
-
-        if is_skybrush_installed:
-            with TemporaryDirectory() as work_dir:
-                # first create a temporary JSON representation
-                json_output = Path(work_dir) / Path("show.json")
-                self.save_to_json(json_output, format=SkybrushJSONFormat.RAW)
-                # then send it to skybrush to convert it to .skyc
-                importer = find_importer_function("skybrush.io.json.importer")
-                context = ImportContext()
-                parameters = {}
-                world = importer([json_output], context, parameters)
-                renderer = find_renderer_function("skybrush.io.skyc.renderer")
-                context = RenderContext()
-                parameters = {"output": output}
-                renderer(world, context, parameters)
+        if can_render_locally("skyc"):
+            render_locally(
+                [self.as_json(format=SkybrushJSONFormat.RAW)], output, renderer="skyc"
+            )
         else:
             # if Skybrush Studio is not present locally, try to convert online
             self._ask_skybrush_studio_server("render", output)
@@ -82,8 +82,8 @@ class SkybrushMatcher(SkybrushAPIOperationBase):
 
         if is_skybrush_installed:
             # convert point clouds to skybrush inner format
-            source = [Pos3D(x=x, y=y, z=z) for x, y, z in self._source]
-            target = [Pos3D(x=x, y=y, z=z) for x, y, z in self._target]
+            source = [Pos3D(x=x, y=y, z=z) for x, y, z in self._source.array.tolist()]
+            target = [Pos3D(x=x, y=y, z=z) for x, y, z in self._target.array.tolist()]
             # call skybrush matching algorithm with default params
             mapping_src = match_pointclouds(source, target, partial=True)
             # invert the mapping
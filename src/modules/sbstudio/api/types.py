@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 from math import inf
-from typing import Any, List, Optional
+from time import perf_counter
+from typing import Any, Callable, List, Optional
 
 Mapping = list[Optional[int]]
 """Type alias for mappings from drone indices to the corresponding target
@@ -130,3 +131,80 @@ class TransitionPlan:
             if self.start_times and self.durations
             else 0.0
         )
+
+
+@dataclass
+class TransferStats:
+    """Statistics about a request sent to the Skybrush Studio server, filled
+    by the API object while the request is being processed.
+
+    Timestamps are taken from `time.perf_counter()`. When the request body
+    is streamed, serialization, compression and upload happen in an
+    interleaved manner; the time spent on serialization and compression is
+    therefore accumulated separately and the rest of the upload is spent on
+    the network.
+    """
+
+    uncompressed_bytes: int = 0
+    """Size of the JSON-encoded request body, before compression."""
+
+    compressed_bytes: int = 0
+    """Size of the request body sent over the network."""
+
+    serialization_time: float = 0.0
+    """Time spent on encoding the request body as JSON [s]."""
+
+    compression_time: float = 0.0
+    """Time spent on compressing the request body [s]."""
+
+    is_streamed: bool = False
+    """Whether the request body is streamed. The end of the upload of a
+    request body that is not streamed cannot be told apart from the start of
+    the processing on the server.
+    """
+
+    upload_started_at: Optional[float] = None
+    """Time when the upload of the request body started."""
+
+    upload_finished_at: Optional[float] = None
+    """Time when the last chunk of the request body was sent; `None` if the
+    request body was not streamed and this is not known.
+    """
+
+    response_started_at: Optional[float] = None
+    """Time when the headers of the response arrived from the server."""
+
+    response_finished_at: Optional[float] = None
+    """Time when the response was processed completely."""
+
+    on_progress: Optional[Callable[["TransferStats"], None]] = field(
+        default=None, repr=False
+    )
+    """Function to call after each chunk of a streamed request body was
+    passed on for sending.
+    """
+
+    @property
+    def upload_rate(self) -> Optional[float]:
+        """Average upload rate of the compressed request body so far, in bytes
+        per second; `None` if not known, e.g., when the request body was not
+        streamed.
+        """
+        if self.upload_started_at is None:
+            return None
+
+        if self.upload_finished_at is not None:
+            end = self.upload_finished_at
+        elif self.is_streamed:
+            # Upload is still in progress
+            end = perf_counter()
+        else:
+            return None
+
+        duration = end - self.upload_started_at
+        return self.compressed_bytes / duration if duration > 0 else None
+
+    def notify(self) -> None:
+        """Calls the progress callback, if any."""
+        if self.on_progress is not None:
+            self.on_progress(self)
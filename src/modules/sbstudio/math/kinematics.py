@@ -0,0 +1,306 @@
+"""Velocity, acceleration and jerk of sampled drone swarms, computed with
+finite differences over all the drones and frames at once.
+
+The functions take the sampled positions of a swarm as a NumPy array of shape
+`(frames, drones, 3)`, which is the same layout as the one used for sampled
+positions during export, and an array of the timestamps of the frames.
+Derivatives are estimated with backward differences, i.e. the velocity of a
+drone in a frame is its displacement since the previous frame divided by the
+time elapsed. Derivatives that cannot be estimated because there are not
+enough preceding frames (the velocity in the first frame, the acceleration in
+the first two frames and the jerk in the first three frames) are zero, just
+like the velocities estimated by the safety check at the start of the scene.
+"""
+
+from dataclasses import dataclass, fields
+from numpy import asarray, diff, float64, hypot, newaxis, subtract, zeros
+from numpy.typing import ArrayLike, NDArray
+from typing import Optional
+
+__all__ = (
+    "KinematicPeak",
+    "KinematicPeaks",
+    "Kinematics",
+    "get_kinematic_peaks",
+    "get_kinematics",
+    "get_velocities",
+)
+
+
+@dataclass(frozen=True)
+class KinematicPeak:
+    """Peak value of a kinematic quantity over all drones and frames."""
+
+    value: float
+    """The peak value."""
+
+    drone: int
+    """Index of the drone where the peak occurs."""
+
+    frame: int
+    """Index of the frame where the peak occurs."""
+
+    time: float
+    """Timestamp of the frame where the peak occurs, in seconds."""
+
+
+@dataclass(frozen=True)
+class KinematicPeaks:
+    """Peak values of the kinematic quantities of a sampled swarm.
+
+    Each peak is `None` if the swarm has no drones or no frames. Vertical
+    velocities are split into an upward and a downward peak, both of them
+    reported as non-negative speeds.
+    """
+
+    velocity_xy: Optional[KinematicPeak] = None
+    """Peak horizontal speed, in m/s."""
+
+    velocity_z_up: Optional[KinematicPeak] = None
+    """Peak upward vertical speed, in m/s."""
+
+    velocity_z_down: Optional[KinematicPeak] = None
+    """Peak downward vertical speed, in m/s."""
+
+    acceleration_xy: Optional[KinematicPeak] = None
+    """Peak magnitude of the horizontal acceleration, in m/s^2."""
+
+    acceleration_z: Optional[KinematicPeak] = None
+    """Peak magnitude of the vertical acceleration, in m/s^2."""
+
+    jerk_xy: Optional[KinematicPeak] = None
+    """Peak magnitude of the horizontal jerk, in m/s^3."""
+
+    jerk_z: Optional[KinematicPeak] = None
+    """Peak magnitude of the vertical jerk, in m/s^3."""
+
+    def merge(self, other: "KinematicPeaks") -> "KinematicPeaks":
+        """Returns the larger one of each peak in this object and the given
+        other object. Ties are resolved in favour of this object.
+        """
+        result = {}
+        for field in fields(self):
+            ours = getattr(self, field.name)
+            theirs = getattr(other, field.name)
+            if ours is None or (theirs is not None and theirs.value > ours.value):
+                result[field.name] = theirs
+            else:
+                result[field.name] = ours
+        return KinematicPeaks(**result)
+
+
+@dataclass(frozen=True)
+class Kinematics:
+    """Velocities, accelerations and jerks of the drones of a sampled swarm
+    in each frame.
+    """
+
+    times: NDArray[float64]
+    """The timestamps of the frames, in seconds; shape is `(frames,)`."""
+
+    velocity: NDArray[float64]
+    """Velocities of the drones; shape is `(frames, drones, 3)`."""
+
+    acceleration: NDArray[float64]
+    """Accelerations of the drones; shape is `(frames, drones, 3)`."""
+
+    jerk: NDArray[float64]
+    """Jerks of the drones; shape is `(frames, drones, 3)`."""
+
+    @property
+    def velocity_xy(self) -> NDArray[float64]:
+        """Horizontal speeds of the drones; shape is `(frames, drones)`."""
+        return hypot(self.velocity[..., 0], self.velocity[..., 1])
+
+    @property
+    def velocity_z(self) -> NDArray[float64]:
+        """Vertical velocities of the drones, positive upwards; shape is
+        `(frames, drones)`.
+        """
+        return self.velocity[..., 2]
+
+    @property
+    def acceleration_xy(self) -> NDArray[float64]:
+        """Magnitudes of the horizontal accelerations of the drones; shape is
+        `(frames, drones)`.
+        """
+        return hypot(self.acceleration[..., 0], self.acceleration[..., 1])
+
+    @property
+    def acceleration_z(self) -> NDArray[float64]:
+        """Vertical accelerations of the drones, positive upwards; shape is
+        `(frames, drones)`.
+        """
+        return self.acceleration[..., 2]
+
+    @property
+    def jerk_xy(self) -> NDArray[float64]:
+        """Magnitudes of the horizontal jerks of the drones; shape is
+        `(frames, drones)`.
+        """
+        return hypot(self.jerk[..., 0], self.jerk[..., 1])
+
+    @property
+    def jerk_z(self) -> NDArray[float64]:
+        """Vertical jerks of the drones, positive upwards; shape is
+        `(frames, drones)`.
+        """
+        return self.jerk[..., 2]
+
+    def get_peaks(self) -> KinematicPeaks:
+        """Returns the peak values of the kinematic quantities, together with
+        the drone and the frame where they occur.
+        """
+        return self._get_peaks()
+
+    def _get_peaks(self, start: int = 0, frame_offset: int = 0) -> KinematicPeaks:
+        """Returns the peak values of the kinematic quantities, considering
+        the frames from the given start index only.
+
+        Parameters:
+            start: index of the first frame to consider
+            frame_offset: offset to add to the frame indices of the peaks
+        """
+        if start >= len(self.times) or self.velocity.shape[1] == 0:
+            return KinematicPeaks()
+
+        def find_peak(values: NDArray[float64]) -> KinematicPeak:
+            values = values[start:]
+            frame, drone = divmod(int(values.argmax()), values.shape[1])
+            return KinematicPeak(
+                value=float(values[frame, drone]),
+                drone=drone,
+                frame=frame + start + frame_offset,
+                time=float(self.times[frame + start]),
+            )
+
+        velocity_z = self.velocity_z
+        return KinematicPeaks(
+            velocity_xy=find_peak(self.velocity_xy),
+            velocity_z_up=find_peak(velocity_z),
+            velocity_z_down=find_peak(-velocity_z),
+            acceleration_xy=find_peak(self.acceleration_xy),
+            acceleration_z=find_peak(abs(self.acceleration_z)),
+            jerk_xy=find_peak(self.jerk_xy),
+            jerk_z=find_peak(abs(self.jerk_z)),
+        )
+
+
+def get_kinematics(positions: ArrayLike, times: ArrayLike) -> Kinematics:
+    """Computes the velocities, accelerations and jerks of the drones of a
+    sampled swarm in each frame.
+
+    The result holds three float64 arrays of the same shape as the positions.
+    Use `get_kinematic_peaks()` if only the peak values are needed; it
+    processes long shows in chunks to keep the memory usage bounded.
+
+    Parameters:
+        positions: the sampled positions; shape is `(frames, drones, 3)`
+        times: the timestamps of the frames, in seconds; shape is `(frames,)`
+
+    Returns:
+        the velocities, accelerations and jerks of the drones
+
+    Raises:
+        ValueError: if the shapes of the arrays do not match or the timestamps
+            are not strictly increasing
+    """
+    positions, times, dt = _validate(positions, times)
+    velocity = _get_velocities(positions, dt)
+    acceleration = zeros(positions.shape, dtype=float64)
+    jerk = zeros(positions.shape, dtype=float64)
+    acceleration[2:] = diff(velocity[1:], axis=0) / dt[1:]
+    jerk[3:] = diff(acceleration[2:], axis=0) / dt[2:]
+    return Kinematics(times, velocity, acceleration, jerk)
+
+
+def get_kinematic_peaks(
+    positions: ArrayLike, times: ArrayLike, *, chunk_size: int = 256
+) -> KinematicPeaks:
+    """Returns the peak velocities, accelerations and jerks of the drones of a
+    sampled swarm, together with the drone and the frame where they occur.
+
+    The frames are processed in chunks, so the temporary arrays never hold
+    more than `chunk_size` frames (plus a few frames of overlap that the
+    finite differences need), no matter how long the show is.
+
+    Parameters:
+        positions: the sampled positions; shape is `(frames, drones, 3)`
+        times: the timestamps of the frames, in seconds; shape is `(frames,)`
+        chunk_size: the number of frames to process at once
+
+    Returns:
+        the peak values of the kinematic quantities
+
+    Raises:
+        ValueError: if the shapes of the arrays do not match or the timestamps
+            are not strictly increasing
+    """
+    positions = asarray(positions)
+    times = asarray(times, dtype=float64).reshape(-1)
+    chunk_size = max(1, chunk_size)
+
+    # The jerk in a frame depends on the three preceding frames so each chunk
+    # is extended with the last three frames of the previous one
+    overlap = 3
+    result = KinematicPeaks()
+    for start in range(0, max(len(times), 1), chunk_size):
+        first = max(start - overlap, 0)
+        end = start + chunk_size
+        kinematics = get_kinematics(positions[first:end], times[first:end])
+        result = result.merge(
+            kinematics._get_peaks(start=start - first, frame_offset=first)
+        )
+
+    return result
+
+
+def get_velocities(positions: ArrayLike, times: ArrayLike) -> NDArray[float64]:
+    """Computes the velocities of the drones of a sampled swarm in each frame,
+    without the accelerations and jerks that `get_kinematics()` would also
+    compute.
+
+    Parameters:
+        positions: the sampled positions; shape is `(frames, drones, 3)`
+        times: the timestamps of the frames, in seconds; shape is `(frames,)`
+
+    Returns:
+        the velocities of the drones; shape is `(frames, drones, 3)`
+
+    Raises:
+        ValueError: if the shapes of the arrays do not match or the timestamps
+            are not strictly increasing
+    """
+    positions, _, dt = _validate(positions, times)
+    return _get_velocities(positions, dt)
+
+
+def _get_velocities(positions: NDArray, dt: NDArray[float64]) -> NDArray[float64]:
+    velocity = zeros(positions.shape, dtype=float64)
+    # Differences are computed in double precision even if the positions are
+    # single-precision floats, as in the sampled frames of the exporter
+    subtract(positions[1:], positions[:-1], out=velocity[1:], dtype=float64)
+    velocity[1:] /= dt
+    return velocity
+
+
+def _validate(positions: ArrayLike, times: ArrayLike):
+    """Converts the positions and the timestamps of a sampled swarm into
+    arrays and checks their shapes.
+
+    Returns:
+        the positions, the timestamps and the time differences between
+        consecutive frames, the latter in a shape that can be broadcast
+        against the positions
+    """
+    positions = asarray(positions)
+    times = asarray(times, dtype=float64).reshape(-1)
+    if positions.ndim != 3 or positions.shape[2] != 3:
+        raise ValueError("positions must have shape (frames, drones, 3)")
+    if positions.shape[0] != len(times):
+        raise ValueError("positions and times must have the same number of frames")
+
+    dt = diff(times)
+    if (dt <= 0).any():
+        raise ValueError("timestamps must be strictly increasing")
+    return positions, times, dt[:, newaxis, newaxis]
@@ -1,6 +1,6 @@
 """Algorithm to find the nearest neighbors in a set of points."""
 
-from numpy import array, fill_diagonal, inf, newaxis, searchsorted, sum
+from numpy import array, fill_diagonal, inf, newaxis, ptp, searchsorted, sum
 
 __all__ = ("find_nearest_neighbors",)
 
@@ -52,7 +52,7 @@ def _nearest_neighbors_divide_and_conquer(points):
         return None, None, inf
 
     # Find the principal axis along which the dataset is the "widest"
-    principal_axis = points.ptp(axis=0).argmax()
+    principal_axis = ptp(points, axis=0).argmax()
     points = points[points[:, principal_axis].argsort(), :]
     p, q, dist_sq = _nearest_neighbors_divide_and_conquer_step(points, principal_axis)
     return p, q, dist_sq**0.5
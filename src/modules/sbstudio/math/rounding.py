@@ -0,0 +1,63 @@
+"""Vectorized rounding of floating-point numbers that gives the same results
+as the built-in `round()` function of Python.
+"""
+
+from numpy import (
+    absolute,
+    around,
+    asarray,
+    errstate,
+    flatnonzero,
+    float64,
+    floor,
+    isfinite,
+    ndarray,
+)
+
+__all__ = ("round_array",)
+
+
+_EXACT_LIMIT = 2.0**52
+"""Limit above which all floating-point numbers are integers."""
+
+
+def round_array(values, ndigits: int = 0) -> ndarray:
+    """Rounds each item of the given array to the given number of decimal
+    digits, giving exactly the same results as calling `round(value, ndigits)`
+    on each item individually.
+
+    `numpy.around()` scales the numbers by a power of ten, rounds them to the
+    nearest integer and scales them back. The scaling step introduces a
+    rounding error, so the result may differ from the correctly rounded
+    result of `round()` when the scaled number is very close to halfway
+    between two integers. This function uses `numpy.around()` for the bulk
+    of the work and then falls back to `round()` for the few items where the
+    two methods might disagree.
+
+    Parameters:
+        values: the values to round; anything that can be converted into a
+            NumPy array of floats
+        ndigits: the number of decimal digits to round to
+
+    Returns:
+        a new NumPy array of floats with the same shape as the input
+    """
+    values = asarray(values, dtype=float64)
+
+    # Overflows are taken care of by the fallback below, and around() leaves
+    # infinities and NaNs intact
+    with errstate(over="ignore", invalid="ignore"):
+        result = around(values, ndigits)
+        scaled = values * 10.0**ndigits
+        magnitude = absolute(scaled)
+        distance_from_half = absolute(scaled - floor(scaled) - 0.5)
+        suspicious = (distance_from_half <= 1e-7 * (magnitude + 1)) | (
+            magnitude >= _EXACT_LIMIT
+        )
+        suspicious &= isfinite(values)
+
+    flat_values, flat_result = values.reshape(-1), result.reshape(-1)
+    for index in flatnonzero(suspicious):
+        flat_result[index] = round(float(flat_values[index]), ndigits)
+
+    return result
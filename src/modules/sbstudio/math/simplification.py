@@ -0,0 +1,330 @@
+"""Simplification of sampled trajectories, light programs and yaw angles,
+operating directly on NumPy arrays.
+
+Each function takes an error budget that specifies how much the simplified
+channel may deviate from the samples. With the default error budgets, the
+functions make exactly the same keep/drop decisions as the `simplify()` and
+`simplify_in_place()` methods of the corresponding model classes. The
+functions do not depend on Blender, so they can also be used from worker
+processes that run outside of Blender.
+"""
+
+from numpy import (
+    absolute,
+    asarray,
+    concatenate,
+    diff,
+    empty,
+    errstate,
+    flatnonzero,
+    float64,
+    full,
+    intp,
+    newaxis,
+    ones,
+    sqrt,
+)
+from numpy.typing import NDArray
+from typing import List, Optional, Tuple
+
+from sbstudio.math.rounding import round_array
+from sbstudio.utils import simplify_path_indices
+
+__all__ = (
+    "get_interpolation_errors",
+    "get_keypoints",
+    "get_light_program_keypoints",
+    "get_trajectory_keypoints",
+    "simplify_sampled_channels",
+    "simplify_yaw_angles",
+)
+
+
+def get_trajectory_keypoints(
+    times: NDArray, positions: NDArray, *, eps: float = 0.0
+) -> NDArray[intp]:
+    """Returns the indices of the samples of a trajectory that should be kept
+    such that the linearly interpolated trajectory between the kept samples
+    is never farther than the given distance from any of the samples.
+
+    Within each run of identical consecutive positions, only the first and
+    the last sample is kept; this is lossless and it is the same as what
+    `Trajectory.simplify_in_place()` does. When the error budget is positive,
+    the remaining samples are simplified further with the Ramer-Douglas-Peucker
+    algorithm, using the Euclidean distance between each sample and the
+    interpolated position at the time of the sample.
+
+    Parameters:
+        times: the timestamps of the samples
+        positions: the sampled positions, one row per sample
+        eps: the maximum allowed distance of any sample from the simplified
+            trajectory
+
+    Returns:
+        the indices of the samples to keep, in increasing order
+    """
+    num_samples = len(positions)
+
+    # Comparing the columns one by one is faster than comparing the rows and
+    # reducing the result with all()
+    same_as_previous = positions[1:, 0] == positions[:-1, 0]
+    for column in range(1, positions.shape[1]):
+        same_as_previous &= positions[1:, column] == positions[:-1, column]
+
+    keep = ones(num_samples, dtype=bool)
+    keep[1:-1] = ~(same_as_previous[:-1] & same_as_previous[1:])
+    result = flatnonzero(keep)
+
+    if eps > 0 and len(result) > 2:
+        # Removing samples from static runs is lossless so it is enough to
+        # simplify the remaining samples
+        times = asarray(times, dtype=float64)
+        positions = asarray(positions, dtype=float64)
+        result = result[
+            get_keypoints(times[result], positions[result], eps=eps, euclidean=True)
+        ]
+
+    return result
+
+
+def get_interpolation_errors(
+    times: NDArray[float64],
+    values: NDArray[float64],
+    start: int,
+    end: int,
+    *,
+    euclidean: bool = False,
+) -> NDArray[float64]:
+    """Returns the distances of the samples of a time series strictly between
+    two given samples from the segment connecting the two samples.
+
+    The distance of a sample from a segment is the distance between the value
+    of the sample and the linearly interpolated value of the segment at the
+    time of the sample. Segments with zero duration are evaluated at their
+    midpoints. All the samples of the segment are evaluated in one go.
+
+    Parameters:
+        times: the timestamps of the samples
+        values: the values of the samples, one row per sample
+        start: the index of the sample where the segment starts
+        end: the index of the sample where the segment ends
+        euclidean: whether to use the Euclidean distance between values;
+            the default is to use the largest absolute difference of their
+            components
+
+    Returns:
+        the distances of the samples with indices `start + 1`, ...,
+        `end - 1` from the segment
+    """
+    timespan = times[end] - times[start]
+    if timespan > 0:
+        ratio = (times[start + 1 : end] - times[start]) / timespan
+    else:
+        ratio = full(end - start - 1, 0.5)
+
+    interp = values[start] + ratio[:, newaxis] * (values[end] - values[start])
+    diffs = interp - values[start + 1 : end]
+    if euclidean:
+        return sqrt((diffs * diffs).sum(axis=1))
+    else:
+        return absolute(diffs).max(axis=1)
+
+
+def get_keypoints(
+    times: NDArray, values: NDArray, *, eps: float, euclidean: bool = False
+) -> NDArray[intp]:
+    """Returns the indices of the samples of a time series that are kept by
+    the Ramer-Douglas-Peucker algorithm, using `get_interpolation_errors()`
+    to measure the distances of the samples from the segments.
+
+    Parameters:
+        times: the timestamps of the samples
+        values: the values of the samples, one row per sample
+        eps: the maximum allowed distance of any sample from the simplified
+            time series
+        euclidean: whether to use the Euclidean distance between values;
+            the default is to use the largest absolute difference of their
+            components
+
+    Returns:
+        the indices of the samples to keep, in increasing order. A single
+        sample is returned twice.
+    """
+    num_samples = len(times)
+    if num_samples == 0:
+        return empty(0, dtype=intp)
+
+    times = asarray(times, dtype=float64)
+    values = asarray(values, dtype=float64).reshape(num_samples, -1)
+
+    keypoints = simplify_path_indices(
+        num_samples,
+        eps=eps,
+        distance_func=lambda start, end: get_interpolation_errors(
+            times, values, start, end, euclidean=euclidean
+        ),
+    )
+    return asarray(keypoints, dtype=intp)
+
+
+def get_light_program_keypoints(
+    times: NDArray, colors: NDArray, *, eps: float = 4
+) -> NDArray[intp]:
+    """Returns the indices of the samples of a light program that should be
+    kept such that no color component of the linearly interpolated light
+    program between the kept samples deviates from the samples by more than
+    the given amount. With the default error budget, this is the same as what
+    `LightProgram.simplify()` does.
+
+    Parameters:
+        times: the timestamps of the samples
+        colors: the sampled RGB colors, one row per sample
+        eps: the maximum allowed deviation of any color component from the
+            linearly interpolated color between two keypoints
+
+    Returns:
+        the indices of the samples to keep, in increasing order. As with
+        `LightProgram.simplify()`, a single sample is returned twice.
+    """
+    return get_keypoints(times, colors, eps=eps)
+
+
+def simplify_yaw_angles(
+    times: NDArray, angles: NDArray, *, eps: float = 0.0
+) -> Tuple[NDArray[float64], NDArray[float64]]:
+    """Simplifies a list of yaw setpoints.
+
+    The angles are shifted such that the first angle is in the [0; 360)
+    range, and intermediate setpoints on constant angular speed segments are
+    removed. With the default error budget, this is what
+    `YawSetpointList.simplify()` does. When the error budget is positive, the
+    setpoints are simplified with the Ramer-Douglas-Peucker algorithm first.
+
+    Parameters:
+        times: the timestamps of the setpoints, in seconds
+        angles: the yaw angles of the setpoints, in degrees
+        eps: the maximum allowed deviation of the simplified yaw angles from
+            the original ones, in degrees
+
+    Returns:
+        the timestamps and the angles of the simplified setpoints
+
+    Raises:
+        RuntimeError: if the timestamps are not strictly increasing
+    """
+    times = asarray(times, dtype=float64).reshape(-1)
+    angles = asarray(angles, dtype=float64).reshape(-1)
+    if not len(times):
+        return empty(0, dtype=float64), empty(0, dtype=float64)
+
+    first_angle = float(angles[0])
+    delta = first_angle % 360 - first_angle
+    angles = angles + delta if delta else angles.copy()
+
+    if eps > 0 and len(times) > 2:
+        indices = get_keypoints(times, angles, eps=eps)
+        times, angles = times[indices], angles[indices]
+    else:
+        times = times.copy()
+
+    if len(times) < 2:
+        return times, angles
+
+    dts = diff(times)
+    not_causal = flatnonzero(dts <= 0)
+    if len(not_causal):
+        index = not_causal[0] + 1
+        raise RuntimeError(
+            f"Yaw timestamps are not causal "
+            f"({float(times[index])} <= {float(times[index - 1])})"
+        )
+
+    # Timestamps and angles are rounded when calculating the angular speeds
+    # to avoid large numeric errors at division by small numbers. Steps
+    # shorter than the rounding precision yield infinite speeds.
+    with errstate(divide="ignore", invalid="ignore"):
+        speeds = diff(round_array(angles, 3)) / round_array(dts, 3)
+        prev_speeds = concatenate(([-1e12], speeds[:-1]))
+        same_speed = absolute(speeds - prev_speeds) < 1e-6
+
+    # A setpoint is removed if the angular speed is the same before and after
+    # it; the first setpoint is compared to a fake speed that never matches
+    keep = ones(len(times), dtype=bool)
+    keep[:-1] = ~same_speed
+    return times[keep], angles[keep]
+
+
+def simplify_sampled_channels(
+    times: NDArray,
+    positions: Optional[NDArray],
+    light_times: NDArray,
+    colors: Optional[NDArray],
+    yaw_angles: Optional[NDArray],
+    *,
+    position_eps: float = 0.0,
+    color_eps: float = 4,
+    yaw_eps: float = 0.0,
+) -> List[
+    Tuple[
+        Optional[NDArray[intp]],
+        Optional[NDArray[intp]],
+        Optional[Tuple[NDArray[float64], NDArray[float64]]],
+    ]
+]:
+    """Simplifies the sampled channels of multiple objects.
+
+    Parameters:
+        times: the timestamps of the position and yaw samples; shape is
+            `(frames,)`
+        positions: the sampled positions; shape is `(frames, objects, 3)`.
+            `None` if positions should not be simplified.
+        light_times: the timestamps of the color samples; shape is
+            `(light_frames,)`
+        colors: the sampled colors; shape is `(light_frames, objects, 3)`.
+            `None` if colors should not be simplified.
+        yaw_angles: the sampled yaw angles; shape is `(frames, objects)`.
+            `None` if yaw angles should not be simplified.
+        position_eps: the maximum allowed deviation of the simplified
+            trajectories from the sampled positions
+        color_eps: the maximum allowed deviation of the color components
+            of the simplified light programs from the sampled colors
+        yaw_eps: the maximum allowed deviation of the simplified yaw angles
+            from the sampled ones
+
+    Returns:
+        one tuple for each object, consisting of the indices of the position
+        samples to keep, the indices of the color samples to keep and the
+        timestamps and angles of the simplified yaw setpoints. Items
+        corresponding to channels that were not simplified are `None`.
+    """
+    num_objects = next(
+        array.shape[1] for array in (positions, colors, yaw_angles) if array is not None
+    )
+
+    result = []
+    for index in range(num_objects):
+        result.append(
+            (
+                (
+                    get_trajectory_keypoints(
+                        times, positions[:, index], eps=position_eps
+                    )
+                    if positions is not None
+                    else None
+                ),
+                (
+                    get_light_program_keypoints(
+                        light_times, colors[:, index], eps=color_eps
+                    )
+                    if colors is not None
+                    else None
+                ),
+                (
+                    simplify_yaw_angles(times, yaw_angles[:, index], eps=yaw_eps)
+                    if yaw_angles is not None
+                    else None
+                ),
+            )
+        )
+
+    return result
@@ -0,0 +1,576 @@
+"""Uniform-grid spatial hash for finding pairs of close points in a 3D point
+set in expected linear time.
+
+The points are assigned to the cells of a uniform grid and sorted by cell.
+Two points closer than the cell size are always in the same cell or in
+adjacent cells, therefore it is enough to compare each point with the points
+in its own cell and in the neighboring cells. When the points are not too
+densely packed compared to the cell size (which is the case for drones kept
+at least a safety distance apart), each cell holds a bounded number of
+points and the number of compared pairs grows linearly with the number of
+points.
+
+`ProximityTracker` keeps such an index between updates of a gradually
+changing point set, such as the positions of the drones in consecutive frames
+of a show, and re-buckets only the points that moved to another cell.
+"""
+
+from numpy import (
+    arange,
+    argpartition,
+    argsort,
+    asarray,
+    concatenate,
+    cumsum,
+    empty,
+    float64,
+    flatnonzero,
+    floor,
+    insert,
+    int64,
+    intp,
+    repeat,
+    searchsorted,
+    sqrt,
+    sum,
+    zeros,
+)
+from numpy.typing import ArrayLike, NDArray
+from typing import List, Optional, Tuple
+
+__all__ = ("ProximityTracker", "SpatialHash", "find_closest_pair")
+
+
+_MAX_NUM_CELLS = 2**60
+"""Maximum number of cells in the bounding box of the grid, to ensure that cell
+keys fit into 64-bit integers.
+"""
+
+_NEIGHBOR_OFFSETS = [
+    (dx, dy, dz)
+    for dx in (-1, 0, 1)
+    for dy in (-1, 0, 1)
+    for dz in (-1, 0, 1)
+    if (dx, dy, dz) > (0, 0, 0)
+]
+"""Offsets of the neighboring cells to compare the points of a cell with.
+Only half of the neighbors are listed because the comparison is symmetric.
+"""
+
+_ALL_OFFSETS = [
+    (dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+]
+"""Offsets of a cell and all its neighboring cells."""
+
+_MAX_MOVED_FRACTION = 0.1
+"""Fraction of the points that may move to another cell in a single update of
+a proximity tracker before it rebuilds its index from scratch instead of
+updating it incrementally.
+"""
+
+_MIN_MOVED_FOR_REBUILD = 64
+"""Number of points that may always move to another cell in a single update of
+a proximity tracker without triggering a rebuild, irrespectively of the total
+number of points.
+"""
+
+
+class SpatialHash:
+    """Spatial index of a 3D point set that assigns the points to the cells of
+    a uniform grid.
+
+    The index is immutable; construct a new index when the points change.
+    """
+
+    _cell_size: float
+    """The size of the cells of the grid."""
+
+    _points: NDArray[float64]
+    """The indexed points, one row per point, sorted by cell."""
+
+    _order: NDArray[intp]
+    """The original indices of the points in `_points`."""
+
+    _keys: NDArray[int64]
+    """The sorted cell keys of the points in `_points`."""
+
+    _strides: Tuple[int, int, int]
+    """The differences between the keys of adjacent cells along the X, Y and
+    Z axes.
+    """
+
+    def __init__(self, points: ArrayLike, cell_size: float):
+        """Constructor.
+
+        Parameters:
+            points: the points to index, one `(x, y, z)` row per point
+            cell_size: the size of the cells of the grid. Queries are
+                efficient for distances not larger than the cell size.
+
+        Raises:
+            ValueError: if the cell size is not positive
+        """
+        if not cell_size > 0:
+            raise ValueError("cell size must be positive")
+
+        points = asarray(points, dtype=float64).reshape(-1, 3)
+
+        # Grow the cells if the bounding box of the points would contain too
+        # many of them; larger cells make the queries slower but not wrong
+        if len(points):
+            origin = points.min(axis=0)
+            extent = points.max(axis=0) - origin
+        else:
+            origin = extent = asarray((0.0, 0.0, 0.0))
+        while True:
+            num_cells = [int(value // cell_size) + 3 for value in extent.tolist()]
+            if num_cells[0] * num_cells[1] * num_cells[2] <= _MAX_NUM_CELLS:
+                break
+            cell_size *= 2
+
+        # Cell coordinates are shifted by one so the neighbors of every
+        # occupied cell have valid, non-negative keys
+        cells = floor((points - origin) / cell_size).astype(int64) + 1
+        strides = (num_cells[1] * num_cells[2], num_cells[2], 1)
+        keys = cells[:, 0] * strides[0] + cells[:, 1] * strides[1] + cells[:, 2]
+
+        order = argsort(keys, kind="stable")
+        self._cell_size = float(cell_size)
+        self._points = points[order]
+        self._order = order
+        self._keys = keys[order]
+        self._strides = strides
+
+    @property
+    def cell_size(self) -> float:
+        """The size of the cells of the grid. This may be larger than the size
+        requested in the constructor if the points span a very large region.
+        """
+        return self._cell_size
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def find_closest_pair(self) -> Optional[Tuple[int, int, float]]:
+        """Finds the closest pair of points among those that are closer to
+        each other than the cell size.
+
+        Returns:
+            the indices of the two points in increasing order and their
+            distance, or `None` if no two points are closer to each other
+            than the cell size
+        """
+        pairs, distances = self.find_pairs(max_pairs=1)
+        if not len(pairs):
+            return None
+        first, second = pairs[0].tolist()
+        return first, second, float(distances[0])
+
+    def find_pairs(
+        self, distance: Optional[float] = None, *, max_pairs: Optional[int] = None
+    ) -> Tuple[NDArray[intp], NDArray[float64]]:
+        """Finds all pairs of points that are closer to each other than the
+        given distance.
+
+        Parameters:
+            distance: the distance threshold; must not be larger than the
+                cell size. `None` means the cell size.
+            max_pairs: the maximum number of pairs to return; when there are
+                more pairs than this, only the closest ones are returned.
+                `None` means no limit.
+
+        Returns:
+            an array with one row per pair, containing the indices of the two
+            points in increasing order, and an array with the distances of the
+            pairs. Pairs are sorted by distance.
+
+        Raises:
+            ValueError: if the distance is larger than the cell size
+        """
+        if distance is None:
+            distance = self._cell_size
+        elif distance > self._cell_size:
+            raise ValueError("distance must not be larger than the cell size")
+
+        first, second, distances_sq = self._find_pairs_sq(distance**2)
+        return _sort_pairs(first, second, distances_sq, max_pairs)
+
+    def _find_pairs_sq(
+        self, distance_sq: float
+    ) -> Tuple[NDArray[intp], NDArray[intp], NDArray[float64]]:
+        """Finds all pairs of points whose squared distance is less than the
+        given value.
+
+        Returns:
+            the original indices of the first and second points of the pairs,
+            and the squared distances of the pairs, in no particular order
+        """
+        num_points = len(self._points)
+        keys, points = self._keys, self._points
+        firsts: List[NDArray[intp]] = []
+        seconds: List[NDArray[intp]] = []
+        distances_sq: List[NDArray[float64]] = []
+
+        stride_x, stride_y, stride_z = self._strides
+        for offset in [(0, 0, 0)] + _NEIGHBOR_OFFSETS:
+            dx, dy, dz = offset
+            neighbor_keys = keys + (dx * stride_x + dy * stride_y + dz * stride_z)
+            end = searchsorted(keys, neighbor_keys, side="right")
+            if offset == (0, 0, 0):
+                # Points are compared only to the points after them in their
+                # own cell so each pair is visited once
+                start = arange(1, num_points + 1)
+            else:
+                start = searchsorted(keys, neighbor_keys, side="left")
+
+            first, second = _expand_ranges(start, end)
+            if not len(first):
+                continue
+
+            dist_sq = sum((points[first] - points[second]) ** 2, axis=1)
+            close = dist_sq < distance_sq
+            firsts.append(first[close])
+            seconds.append(second[close])
+            distances_sq.append(dist_sq[close])
+
+        if not firsts:
+            return (
+                empty(0, dtype=intp),
+                empty(0, dtype=intp),
+                empty(0, dtype=float64),
+            )
+
+        return (
+            self._order[concatenate(firsts)],
+            self._order[concatenate(seconds)],
+            concatenate(distances_sq),
+        )
+
+
+class ProximityTracker:
+    """Tracks the pairs of points that are closer to each other than a given
+    distance in a point set that changes gradually over time, such as the
+    positions of the drones in consecutive frames of a show.
+
+    The tracker assigns the points to the cells of a uniform grid whose cell
+    size is the distance threshold, and keeps the points sorted by cell as
+    well as the list of candidate pairs, i.e. all the pairs of points in the
+    same or in adjacent cells, between updates. When the points are updated,
+    only the points that moved to another cell are re-bucketed and only their
+    candidate pairs are recomputed. The index is rebuilt from scratch when the
+    number of points changes, when the points leave the region covered by the
+    grid or when too many points moved to another cell, e.g., after jumping to
+    a different frame.
+    """
+
+    _distance: float
+    """The distance threshold."""
+
+    _cell_size: float
+    """The size of the cells of the grid."""
+
+    _origin: NDArray[float64]
+    """The corner of the grid with the smallest coordinates."""
+
+    _num_cells: NDArray[int64]
+    """The number of cells of the grid along the X, Y and Z axes."""
+
+    _strides: Tuple[int, int, int]
+    """The differences between the keys of adjacent cells along the X, Y and
+    Z axes.
+    """
+
+    _points: NDArray[float64]
+    """The points passed to the last update, one row per point."""
+
+    _keys: NDArray[int64]
+    """The cell keys of the points, in the original order of the points."""
+
+    _sorted_keys: NDArray[int64]
+    """The cell keys of the points, sorted."""
+
+    _order: NDArray[intp]
+    """The original indices of the points in the order of `_sorted_keys`."""
+
+    _first: NDArray[intp]
+    """The original indices of the first points of the candidate pairs."""
+
+    _second: NDArray[intp]
+    """The original indices of the second points of the candidate pairs."""
+
+    def __init__(self, distance: float):
+        """Constructor.
+
+        Parameters:
+            distance: the distance threshold; pairs of points closer to each
+                other than this distance are reported by `find_pairs()`
+
+        Raises:
+            ValueError: if the distance is not positive
+        """
+        if not distance > 0:
+            raise ValueError("distance must be positive")
+
+        self._distance = float(distance)
+        self._rebuild(empty((0, 3), dtype=float64))
+
+    @property
+    def distance(self) -> float:
+        """The distance threshold of the tracker."""
+        return self._distance
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def find_pairs(
+        self, *, max_pairs: Optional[int] = None
+    ) -> Tuple[NDArray[intp], NDArray[float64]]:
+        """Finds all pairs of points that are closer to each other than the
+        distance threshold, using the points passed to the last update.
+
+        Parameters:
+            max_pairs: the maximum number of pairs to return; when there are
+                more pairs than this, only the closest ones are returned.
+                `None` means no limit.
+
+        Returns:
+            an array with one row per pair, containing the indices of the two
+            points in increasing order, and an array with the distances of the
+            pairs. Pairs are sorted by distance.
+        """
+        first, second, points = self._first, self._second, self._points
+        distances_sq = sum((points[first] - points[second]) ** 2, axis=1)
+        close = flatnonzero(distances_sq < self._distance**2)
+        return _sort_pairs(first[close], second[close], distances_sq[close], max_pairs)
+
+    def update(self, points: ArrayLike) -> bool:
+        """Updates the positions of the points.
+
+        Parameters:
+            points: the new positions of the points, one `(x, y, z)` row per
+                point. The points are assumed to be in the same order as in
+                the previous update.
+
+        Returns:
+            whether the index had to be rebuilt from scratch
+        """
+        points = asarray(points, dtype=float64).reshape(-1, 3)
+        if len(points) != len(self._points):
+            self._rebuild(points)
+            return True
+
+        cells = floor((points - self._origin) / self._cell_size).astype(int64)
+        if (cells < 0).any() or (cells >= self._num_cells).any():
+            self._rebuild(points)
+            return True
+
+        keys = self._get_keys(cells)
+        moved = flatnonzero(keys != self._keys)
+        if len(moved) > max(_MIN_MOVED_FOR_REBUILD, len(points) * _MAX_MOVED_FRACTION):
+            self._rebuild(points)
+            return True
+
+        self._points = points
+        if len(moved):
+            self._move(moved, keys)
+
+        return False
+
+    def _get_keys(self, cells: NDArray[int64]) -> NDArray[int64]:
+        """Returns the keys of the given cells of the grid."""
+        stride_x, stride_y, stride_z = self._strides
+        return cells[:, 0] * stride_x + cells[:, 1] * stride_y + cells[:, 2]
+
+    def _move(self, moved: NDArray[intp], keys: NDArray[int64]) -> None:
+        """Re-buckets the points that moved to another cell and recomputes
+        their candidate pairs.
+
+        Parameters:
+            moved: the original indices of the points that moved to another
+                cell
+            keys: the new cell keys of all the points
+        """
+        is_moved = zeros(len(keys), dtype=bool)
+        is_moved[moved] = True
+
+        # Remove the moved points from the sorted index and insert them back
+        # at the positions corresponding to their new cells
+        kept = ~is_moved[self._order]
+        order, sorted_keys = self._order[kept], self._sorted_keys[kept]
+        new_keys = keys[moved]
+        by_key = argsort(new_keys, kind="stable")
+        positions = searchsorted(sorted_keys, new_keys[by_key])
+        self._order = insert(order, positions, moved[by_key])
+        self._sorted_keys = insert(sorted_keys, positions, new_keys[by_key])
+        self._keys = keys
+
+        # Drop the candidate pairs of the moved points and collect the new
+        # ones from the cells around their new positions
+        kept = ~(is_moved[self._first] | is_moved[self._second])
+        firsts = [self._first[kept]]
+        seconds = [self._second[kept]]
+        stride_x, stride_y, stride_z = self._strides
+        for dx, dy, dz in _ALL_OFFSETS:
+            neighbor_keys = new_keys + (dx * stride_x + dy * stride_y + dz * stride_z)
+            start = searchsorted(self._sorted_keys, neighbor_keys, side="left")
+            end = searchsorted(self._sorted_keys, neighbor_keys, side="right")
+            owner, position = _expand_ranges(start, end)
+            first, second = moved[owner], self._order[position]
+
+            # Pairs of two moved points are found from both sides; keep one
+            valid = (first != second) & (~is_moved[second] | (first < second))
+            firsts.append(first[valid])
+            seconds.append(second[valid])
+
+        self._first = concatenate(firsts)
+        self._second = concatenate(seconds)
+
+    def _rebuild(self, points: NDArray[float64]) -> None:
+        """Rebuilds the grid, the sorted index and the candidate pairs from
+        scratch for the given points.
+        """
+        # The grid covers the bounding box of the points extended by its own
+        # size in every direction so the points may drift for a while before
+        # they leave the grid
+        if len(points):
+            lower = points.min(axis=0)
+            extent = points.max(axis=0) - lower
+        else:
+            lower = extent = zeros(3, dtype=float64)
+        cell_size = self._distance
+        while True:
+            margin = extent + cell_size
+            num_cells = ((extent + 2 * margin) // cell_size).astype(int64) + 1
+            if int(num_cells[0]) * int(num_cells[1]) * int(num_cells[2]) <= (
+                _MAX_NUM_CELLS
+            ):
+                break
+            cell_size *= 2
+
+        self._cell_size = float(cell_size)
+        self._origin = lower - margin
+        self._num_cells = num_cells
+        self._strides = (int(num_cells[1] * num_cells[2]), int(num_cells[2]), 1)
+        self._points = points
+
+        cells = floor((points - self._origin) / self._cell_size).astype(int64)
+        keys = self._get_keys(cells)
+        order = argsort(keys, kind="stable")
+        self._keys = keys
+        self._sorted_keys = keys[order]
+        self._order = order
+
+        # Points are compared to the points after them in their own cell and
+        # to the points of half of the neighboring cells so each candidate
+        # pair is found once
+        firsts: List[NDArray[intp]] = [empty(0, dtype=intp)]
+        seconds: List[NDArray[intp]] = [empty(0, dtype=intp)]
+        sorted_keys = self._sorted_keys
+        stride_x, stride_y, stride_z = self._strides
+        for offset in [(0, 0, 0)] + _NEIGHBOR_OFFSETS:
+            dx, dy, dz = offset
+            neighbor_keys = sorted_keys + (
+                dx * stride_x + dy * stride_y + dz * stride_z
+            )
+            end = searchsorted(sorted_keys, neighbor_keys, side="right")
+            if offset == (0, 0, 0):
+                start = arange(1, len(points) + 1)
+            else:
+                start = searchsorted(sorted_keys, neighbor_keys, side="left")
+            first, second = _expand_ranges(start, end)
+            firsts.append(order[first])
+            seconds.append(order[second])
+
+        self._first = concatenate(firsts)
+        self._second = concatenate(seconds)
+
+
+def find_closest_pair(
+    points: ArrayLike, cell_size: float
+) -> Optional[Tuple[int, int, float]]:
+    """Finds the closest pair of points in the given point set.
+
+    The points are indexed with a spatial hash with the given cell size first.
+    If no two points are closer to each other than the cell size, the cell
+    size is doubled until a close pair is found, so the result is exact even
+    if the closest pair is farther apart than the initial cell size. The
+    initial cell size should be close to the expected distance of the closest
+    pair, e.g., the proximity warning threshold of the safety check.
+
+    Parameters:
+        points: the input points, one `(x, y, z)` row per point
+        cell_size: the initial cell size of the spatial hash
+
+    Returns:
+        the indices of the two points in increasing order and their distance,
+        or `None` if there are less than two points
+    """
+    points = asarray(points, dtype=float64).reshape(-1, 3)
+    if len(points) < 2:
+        return None
+
+    while True:
+        index = SpatialHash(points, cell_size)
+        result = index.find_closest_pair()
+        if result is not None:
+            return result
+        cell_size = index.cell_size * 2
+
+
+def _expand_ranges(
+    start: NDArray[intp], end: NDArray[intp]
+) -> Tuple[NDArray[intp], NDArray[intp]]:
+    """Expands a list of ranges into explicit indices.
+
+    Parameters:
+        start: the start of each range, inclusive
+        end: the end of each range, exclusive. Ranges where the end is not
+            larger than the start are empty.
+
+    Returns:
+        the index of the range and the position within the range for every
+        position covered by the ranges
+    """
+    counts = end - start
+    counts[counts < 0] = 0
+    total = int(counts.sum())
+    owner = repeat(arange(len(start)), counts)
+    position = repeat(start - (cumsum(counts) - counts), counts) + arange(total)
+    return owner, position
+
+
+def _sort_pairs(
+    first: NDArray[intp],
+    second: NDArray[intp],
+    distances_sq: NDArray[float64],
+    max_pairs: Optional[int],
+) -> Tuple[NDArray[intp], NDArray[float64]]:
+    """Selects the closest pairs of points from the given pairs and sorts them
+    by distance.
+
+    Parameters:
+        first: the indices of the first points of the pairs
+        second: the indices of the second points of the pairs
+        distances_sq: the squared distances of the pairs
+        max_pairs: the maximum number of pairs to return; `None` means no
+            limit
+
+    Returns:
+        an array with one row per pair, containing the indices of the two
+        points in increasing order, and an array with the distances of the
+        pairs, sorted by distance
+    """
+    if max_pairs is not None and len(distances_sq) > max_pairs:
+        if max_pairs <= 0:
+            selected = empty(0, dtype=intp)
+        else:
+            selected = argpartition(distances_sq, max_pairs - 1)[:max_pairs]
+        first, second = first[selected], second[selected]
+        distances_sq = distances_sq[selected]
+
+    by_distance = argsort(distances_sq, kind="stable")
+    pairs = empty((len(by_distance), 2), dtype=intp)
+    pairs[:, 0] = first[by_distance]
+    pairs[:, 1] = second[by_distance]
+    pairs.sort(axis=1)
+    return pairs, sqrt(distances_sq[by_distance])
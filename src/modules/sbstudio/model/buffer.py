@@ -0,0 +1,173 @@
+"""Growable NumPy storage shared by the model classes that hold long,
+time-ordered sequences of items, such as trajectories, light programs, yaw
+setpoint lists and point clouds.
+"""
+
+from collections.abc import Sequence as SequenceABC
+from numpy import argsort, empty, intp
+from numpy.typing import NDArray
+from typing import Any, Callable, Generic, Iterator, Optional, Tuple, TypeVar
+
+__all__ = ("ColumnBuffer", "ItemSequence", "get_time_order")
+
+
+T = TypeVar("T")
+
+
+class ColumnBuffer:
+    """One or more NumPy arrays ("columns") with the same number of items
+    along their first axis and with spare capacity at their ends, so new
+    items can be appended in amortized constant time.
+
+    Each item of a column may be a scalar or an array of fixed shape; e.g.,
+    the points of a trajectory are stored in a single column of `(t, x, y, z)`
+    rows while a light program stores its timestamps, colors and fade flags in
+    three separate columns.
+    """
+
+    __slots__ = ("_columns", "_length")
+
+    _columns: Tuple[NDArray[Any], ...]
+    """The columns; their first `_length` items are in use and the remaining
+    items are spare capacity.
+    """
+
+    _length: int
+    """Number of items in the buffer."""
+
+    def __init__(self, *columns: NDArray[Any], copy: bool = True):
+        """Constructor.
+
+        Parameters:
+            columns: the initial contents of the columns; they must have the
+                same length
+            copy: whether to copy the columns. When this is `False`, the
+                buffer shares its items with the given arrays until the first
+                append that needs to grow the buffer.
+        """
+        if not columns:
+            raise ValueError("at least one column is needed")
+        length = len(columns[0])
+        if any(len(column) != length for column in columns):
+            raise ValueError("columns must have the same length")
+        self._columns = tuple(column.copy() if copy else column for column in columns)
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def columns(self) -> Tuple[NDArray[Any], ...]:
+        """Read-only views of the items of the columns."""
+        return tuple(self.column(index) for index in range(len(self._columns)))
+
+    def column(self, index: int = 0) -> NDArray[Any]:
+        """Returns a read-only view of the items of the column with the given
+        index.
+        """
+        result = self._columns[index][: self._length]
+        result.flags.writeable = False
+        return result
+
+    def writable_column(self, index: int = 0) -> NDArray[Any]:
+        """Returns a writable view of the items of the column with the given
+        index, for modifying the items in-place.
+        """
+        return self._columns[index][: self._length]
+
+    def append(self, *items: Any) -> None:
+        """Appends an item to the end of each column.
+
+        Parameters:
+            items: the items to append, one for each column
+        """
+        length = self._length
+        if length == len(self._columns[0]):
+            # Grow geometrically so appending takes amortized constant time
+            self._resize(max(2 * length, 16))
+
+        for column, item in zip(self._columns, items):
+            column[length] = item
+        self._length = length + 1
+
+    def take(self, index: Any) -> "ColumnBuffer":
+        """Returns a new buffer with the items at the given index.
+
+        Parameters:
+            index: a slice, an array of indices or a boolean mask. Slices
+                share their items with this buffer, other indices copy them,
+                following the semantics of NumPy indexing.
+        """
+        result = self.__class__.__new__(self.__class__)
+        result._columns = tuple(
+            column[: self._length][index] for column in self._columns
+        )
+        result._length = len(result._columns[0])
+        return result
+
+    def _resize(self, capacity: int) -> None:
+        """Moves the items into new columns with the given capacity."""
+        length = self._length
+        columns = []
+        for column in self._columns:
+            new_column = empty((capacity,) + column.shape[1:], dtype=column.dtype)
+            new_column[:length] = column[:length]
+            columns.append(new_column)
+        self._columns = tuple(columns)
+
+
+class ItemSequence(SequenceABC, Generic[T]):
+    """Read-only sequence of objects created on-the-fly from the corresponding
+    items of one or more arrays.
+    """
+
+    __slots__ = ("_columns", "_factory")
+
+    def __init__(self, factory: Callable[..., T], *columns: NDArray[Any]):
+        """Constructor.
+
+        Parameters:
+            factory: function that creates an object of the sequence; called
+                with the items of the columns at the same index, converted to
+                Python objects (lists in case of multi-dimensional columns)
+            columns: the arrays backing the sequence
+        """
+        self._factory = factory
+        self._columns = columns
+
+    def __len__(self) -> int:
+        return len(self._columns[0])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(
+                ItemSequence(
+                    self._factory, *(column[index] for column in self._columns)
+                )
+            )
+        return self._factory(*(column[index].tolist() for column in self._columns))
+
+    def __iter__(self) -> Iterator[T]:
+        factory = self._factory
+        for items in zip(*(column.tolist() for column in self._columns)):
+            yield factory(*items)
+
+    def __eq__(self, other):
+        if isinstance(other, ItemSequence):
+            other = list(other)
+        return list(self) == other
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+
+def get_time_order(times: NDArray[Any]) -> Optional[NDArray[intp]]:
+    """Returns the order in which the items with the given timestamps should
+    be arranged to sort them by time, or `None` if they are sorted already.
+
+    The order is stable so items with the same timestamp keep their relative
+    order.
+    """
+    if len(times) > 1 and (times[1:] < times[:-1]).any():
+        return argsort(times, kind="stable")
+    return None
@@ -7,7 +7,7 @@ __all__ = (
 )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Color3D:
     """Simplest representation of a 3D color in RGB space."""
 
@@ -41,7 +41,7 @@ class Color3D:
         return Vector((self.r / 255, self.g / 255, self.b / 255, 1))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Color4D:
     """Simplest representation of a 4D color in RGB space and time."""
 
@@ -1,53 +1,114 @@
+from numpy import asarray, bool_, clip, float64, int64, ones, uint8
+from numpy.typing import ArrayLike, NDArray
 from operator import attrgetter
-from typing import Optional, Sequence
+from typing import Iterable, Optional, Sequence
 
-from sbstudio.utils import simplify_path
+from sbstudio.math.rounding import round_array
+from sbstudio.math.simplification import get_light_program_keypoints
 
+from .buffer import ColumnBuffer, ItemSequence, get_time_order
 from .color import Color4D
 
 __all__ = ("LightProgram",)
 
 
-def _simplify_color_distance_func(keypoints, start, end):
-    """Distance function for LightProgram.simplify()"""
-    timespan = end.t - start.t
+class LightProgram:
+    """Simplest representation of a causal light program in space and time.
 
-    result = []
+    The color between given points is linearly interpolated or kept constant
+    from past according to the is_fade property of each Color4D element.
 
-    for point in keypoints:
-        ratio = (point.t - start.t) / timespan if timespan > 0 else 0.5
-        interp = (
-            start.r + ratio * (end.r - start.r),
-            start.g + ratio * (end.g - start.g),
-            start.b + ratio * (end.b - start.b),
-        )
+    The keypoints are stored in growable columns: a float64 array of
+    timestamps, an `(n, 3)` array of 8-bit RGB colors and a boolean array of
+    the fade flags. Color components are clipped to the range [0; 255]. The
+    `colors` property provides a read-only sequence of `Color4D` objects for
+    code that does not work with arrays directly.
+    """
+
+    _buffer: ColumnBuffer
+    """Buffer holding the timestamps, the colors and the fade flags of the
+    keypoints in three columns.
+    """
 
-        diff = max(
-            abs(interp[0] - point.r),
-            abs(interp[1] - point.g),
-            abs(interp[2] - point.b),
+    def __init__(self, colors: Optional[Sequence[Color4D]] = None):
+        colors = list(colors) if colors is not None else []
+        get_fields = attrgetter("t", "r", "g", "b")
+        fields = asarray([get_fields(color) for color in colors], dtype=float64)
+        fields = fields.reshape(-1, 4)
+        self._set_data(
+            fields[:, 0],
+            fields[:, 1:],
+            asarray([bool(color.is_fade) for color in colors], dtype=bool_),
         )
-        result.append(diff)
 
-    return result
+    @classmethod
+    def from_arrays(
+        cls,
+        times: ArrayLike,
+        rgb: ArrayLike,
+        fades: Optional[ArrayLike] = None,
+    ) -> "LightProgram":
+        """Constructs a light program from an array of timestamps and the
+        corresponding colors and fade flags. The keypoints are sorted by time;
+        the arrays are always copied.
 
+        Parameters:
+            times: the timestamps of the keypoints
+            rgb: the colors of the keypoints, one `(r, g, b)` row per keypoint,
+                with components in the range [0; 255]
+            fades: the fade flags of the keypoints; `None` means that all the
+                keypoints are fades
+        """
+        times = asarray(times, dtype=float64).reshape(-1)
+        fades = (
+            ones(len(times), dtype=bool_)
+            if fades is None
+            else asarray(fades, dtype=bool_).reshape(-1)
+        )
+        result = cls.__new__(cls)
+        result._set_data(times, asarray(rgb).reshape(-1, 3), fades)
+        return result
+
+    @property
+    def colors(self) -> Sequence[Color4D]:
+        """The keypoints of the light program as a read-only sequence of
+        `Color4D` objects. The objects are created on-the-fly; modifying them
+        does not modify the light program.
+        """
+        return ItemSequence(_color_from_items, self.times, self.rgb, self.fades)
 
-class LightProgram:
-    """Simplest representation of a causal light program in space and time.
+    @colors.setter
+    def colors(self, value: Iterable[Color4D]) -> None:
+        self._buffer = LightProgram(list(value))._buffer
 
-    The color between given points is linearly interpolated or kept constant
-    from past according to the is_fade property of each Color4D element.
+    @property
+    def times(self) -> NDArray[float64]:
+        """Read-only view of the timestamps of the keypoints."""
+        return self._buffer.column(0)
 
-    """
+    @property
+    def rgb(self) -> NDArray[uint8]:
+        """Read-only view of the colors of the keypoints, with one
+        `(r, g, b)` row per keypoint.
+        """
+        return self._buffer.column(1)
 
-    def __init__(self, colors: Optional[Sequence[Color4D]] = None):
-        self.colors = sorted(colors, key=attrgetter("t")) if colors is not None else []
+    @property
+    def fades(self) -> NDArray[bool_]:
+        """Read-only view of the fade flags of the keypoints."""
+        return self._buffer.column(2)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
 
     def append(self, color: Color4D) -> None:
         """Add a color to the end of the light code."""
-        if self.colors and self.colors[-1].t > color.t:
+        times = self.times
+        if len(times) and times[-1] > color.t:
             raise ValueError("New color must come after existing light code in time")
-        self.colors.append(color)
+        self._buffer.append(
+            color.t, _to_rgb((color.r, color.g, color.b)), bool(color.is_fade)
+        )
 
     def as_dict(self, ndigits: int = 3):
         """Create a Skybrush-compatible dictionary representation of this instance.
@@ -58,15 +119,11 @@ class LightProgram:
         Return:
             dictionary to be converted to JSON later
         """
+        times = round_array(self.times, ndigits).tolist()
+        rgb = self.rgb.astype(int64).tolist()
+        fades = self.fades.astype(int64).tolist()
         return {
-            "data": [
-                [
-                    round(color.t, ndigits=ndigits),
-                    [int(color.r), int(color.g), int(color.b)],
-                    1 if color.is_fade else 0,
-                ]
-                for color in self.colors
-            ],
+            "data": [[t, c, f] for t, c, f in zip(times, rgb, fades)],
             "version": 1,
         }
 
@@ -78,8 +135,35 @@ class LightProgram:
             LightProgram instance with the simplified light code.
 
         """
-        new_items = simplify_path(
-            list(self.colors), eps=4, distance_func=_simplify_color_distance_func
+        keep = get_light_program_keypoints(self.times, self.rgb, eps=4)
+        return LightProgram.from_arrays(
+            self.times[keep], self.rgb[keep], self.fades[keep]
         )
 
-        return LightProgram(new_items)
+    def _set_data(
+        self, times: NDArray[float64], rgb: ArrayLike, fades: NDArray[bool_]
+    ) -> None:
+        """Replaces the keypoints of the light program with the given ones,
+        sorted by time. The sort is stable so keypoints with the same
+        timestamp keep their relative order.
+        """
+        rgb = _to_rgb(rgb)
+        order = get_time_order(times)
+        if order is not None:
+            times, rgb, fades = times[order], rgb[order], fades[order]
+        self._buffer = ColumnBuffer(times, rgb, fades)
+
+
+def _color_from_items(t: float, rgb: Sequence[int], is_fade: bool) -> Color4D:
+    r, g, b = rgb
+    return Color4D(t, r, g, b, is_fade=is_fade)
+
+
+def _to_rgb(values: ArrayLike) -> NDArray[uint8]:
+    """Converts color components to 8-bit integers, truncating fractional
+    parts and clipping them to the range [0; 255].
+    """
+    values = asarray(values)
+    if values.dtype == uint8:
+        return values
+    return clip(values.astype(int64), 0, 255).astype(uint8)
@@ -4,7 +4,7 @@ from mathutils import Vector
 __all__ = ("Point3D", "Point4D")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Point3D:
     """Simplest representation of a 3D point in space."""
 
@@ -38,7 +38,7 @@ class Point3D:
         return [round(value, ndigits=3) for value in [self.x, self.y, self.z]]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Point4D:
     """Simplest representation of a 4D point in space and time."""
 
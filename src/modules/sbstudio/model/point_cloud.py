@@ -1,22 +1,76 @@
+from numpy import asarray, float64
+from numpy.typing import ArrayLike, NDArray
 from typing import List, Optional, Union
 
+from sbstudio.math.rounding import round_array
+
+from .buffer import ColumnBuffer
 from .point import Point3D, Point4D
 
 __all__ = ("PointCloud",)
 
 
 class PointCloud:
-    """Simplest representation of a list/group/cloud of Point3D points."""
+    """Simplest representation of a list/group/cloud of Point3D points.
+
+    The points are stored in a growable NumPy array with one `(x, y, z)` row
+    per point.
+    """
+
+    _buffer: ColumnBuffer
+    """Buffer holding the points in a single column of `(x, y, z)` rows."""
 
     def __init__(self, points: Optional[List[Union[Point3D, Point4D]]] = None):
-        self._points = [Point3D(x=p.x, y=p.y, z=p.z) for p in points or []]
+        self._buffer = ColumnBuffer(
+            asarray([(p.x, p.y, p.z) for p in points or []], dtype=float64).reshape(
+                -1, 3
+            ),
+            copy=False,
+        )
+
+    @classmethod
+    def from_array(cls, data: ArrayLike, *, copy: bool = True) -> "PointCloud":
+        """Constructs a point cloud from an array with one `(x, y, z)` row per
+        point, such as the ones returned by
+        `get_world_coordinates_of_markers_from_formation()`.
+
+        Parameters:
+            data: the points of the point cloud, one row per point
+            copy: whether to copy the array. When this is `False` and the
+                array is a float64 array already, the point cloud shares its
+                points with the array until the first append that needs to
+                grow the point cloud, so modifying the array in-place modifies
+                the point cloud as well.
+        """
+        result = cls.__new__(cls)
+        result._buffer = ColumnBuffer(
+            asarray(data, dtype=float64).reshape(-1, 3), copy=copy
+        )
+        return result
+
+    @property
+    def array(self) -> NDArray[float64]:
+        """Read-only view of the points, with one `(x, y, z)` row per point."""
+        return self._buffer.column()
 
     def __getitem__(self, item):
-        return self._points[item]
+        if isinstance(item, slice):
+            return [Point3D(*row) for row in self.array[item].tolist()]
+
+        length = len(self._buffer)
+        if item < 0:
+            item += length
+        if item < 0 or item >= length:
+            raise IndexError("point cloud index out of range")
+        x, y, z = self.array[item].tolist()
+        return Point3D(x, y, z)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
 
     def append(self, point: Union[Point3D, Point4D]) -> None:
         """Add a point to the end of the point cloud."""
-        self._points.append(Point3D(x=point.x, y=point.y, z=point.z))
+        self._buffer.append((point.x, point.y, point.z))
 
     def as_list(self, ndigits: int = 3):
         """Create a Skybrush-compatible list representation of this instance.
@@ -28,16 +82,9 @@ class PointCloud:
             list representation of this instance, to be converted to JSON later
 
         """
-        return [
-            [
-                round(point.x, ndigits=ndigits),
-                round(point.y, ndigits=ndigits),
-                round(point.z, ndigits=ndigits),
-            ]
-            for point in self._points
-        ]
+        return round_array(self.array, ndigits).tolist()
 
     @property
     def count(self):
         """Return the number of points."""
-        return len(self._points)
+        return len(self._buffer)
@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from sbstudio.math.kinematics import KinematicPeak, KinematicPeaks
 
 from .types import Coordinate3D
 
@@ -41,6 +43,39 @@ class SafetyCheckParams:
             result["maxVelocityZUp"] = round(self.max_velocity_z_up, ndigits=ndigits)
         return result
 
+    def get_velocity_limit_violations(
+        self, peaks: KinematicPeaks
+    ) -> Dict[str, KinematicPeak]:
+        """Returns the peak velocities of a sampled show that exceed the
+        velocity limits of the safety check.
+
+        Parameters:
+            peaks: the peak values of the kinematic quantities of the show, as
+                returned by `sbstudio.math.kinematics.get_kinematic_peaks()`
+
+        Return:
+            the peaks that exceed the limits, indexed by the names of the
+            corresponding attributes of `peaks` (`velocity_xy`,
+            `velocity_z_up` or `velocity_z_down`)
+        """
+        max_velocity_z_up = (
+            self.max_velocity_z
+            if self.max_velocity_z_up is None
+            else self.max_velocity_z_up
+        )
+        limits = {
+            "velocity_xy": self.max_velocity_xy,
+            "velocity_z_up": max_velocity_z_up,
+            "velocity_z_down": self.max_velocity_z,
+        }
+
+        result = {}
+        for name, limit in limits.items():
+            peak = getattr(peaks, name)
+            if peak is not None and peak.value > limit:
+                result[name] = peak
+        return result
+
 
 @dataclass
 class SafetyCheckResult:
@@ -51,6 +86,10 @@ class SafetyCheckResult:
     drones_over_max_velocity_z: List[Coordinate3D] = field(default_factory=list)
     drones_below_min_nav_altitude: List[Coordinate3D] = field(default_factory=list)
     closest_pair: Optional[Tuple[Coordinate3D, Coordinate3D]] = None
+    pairs_too_close: List[Tuple[Coordinate3D, Coordinate3D]] = field(
+        default_factory=list
+    )
+    pairs_too_close_truncated: bool = False
     min_distance: Optional[float] = None
     min_altitude: Optional[float] = None
 
@@ -60,5 +99,7 @@ class SafetyCheckResult:
         self.drones_over_max_velocity_z.clear()
         self.drones_below_min_nav_altitude.clear()
         self.closest_pair = None
+        self.pairs_too_close.clear()
+        self.pairs_too_close_truncated = False
         self.min_distance = None
         self.min_altitude = None
@@ -0,0 +1,507 @@
+"""Offline safety check of a sampled show that evaluates every frame of the
+show at once, as opposed to the safety check running in the background that
+evaluates the current frame only.
+"""
+
+import csv
+import json
+
+from dataclasses import dataclass, field
+from enum import Enum
+from numpy import (
+    asarray,
+    empty,
+    flatnonzero,
+    float64,
+    full,
+    hypot,
+    inf,
+    intp,
+)
+from numpy.typing import ArrayLike, NDArray
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sbstudio.math.kinematics import get_velocities
+from sbstudio.math.spatial_hash import find_closest_pair
+
+from .safety_check import SafetyCheckParams
+from .trajectory import Trajectory, get_positions_at
+
+__all__ = (
+    "SafetyReport",
+    "SafetyViolation",
+    "SafetyViolationType",
+    "create_safety_report",
+    "create_safety_report_from_trajectories",
+)
+
+
+class SafetyViolationType(Enum):
+    """Types of safety violations found by the offline safety check."""
+
+    PROXIMITY = "proximity"
+    ALTITUDE = "altitude"
+    VELOCITY_XY = "velocity_xy"
+    VELOCITY_Z_UP = "velocity_z_up"
+    VELOCITY_Z_DOWN = "velocity_z_down"
+
+    @property
+    def description(self) -> str:
+        return _descriptions[self]
+
+
+_descriptions = {
+    SafetyViolationType.PROXIMITY: "Drones too close",
+    SafetyViolationType.ALTITUDE: "Altitude too high",
+    SafetyViolationType.VELOCITY_XY: "Horizontal velocity too high",
+    SafetyViolationType.VELOCITY_Z_UP: "Upward velocity too high",
+    SafetyViolationType.VELOCITY_Z_DOWN: "Downward velocity too high",
+}
+
+_type_order = {type: index for index, type in enumerate(SafetyViolationType)}
+
+
+@dataclass(frozen=True)
+class SafetyViolation:
+    """A single type of safety violation in a single frame of the show."""
+
+    type: SafetyViolationType
+    """The type of the violation."""
+
+    frame: int
+    """The index of the frame where the violation occurs."""
+
+    time: float
+    """The timestamp of the frame where the violation occurs, in seconds."""
+
+    value: float
+    """The worst value of the checked quantity in the frame, e.g., the
+    smallest distance between two drones for proximity violations or the
+    largest altitude for altitude violations.
+    """
+
+    limit: float
+    """The limit that was violated."""
+
+    drones: Tuple[str, ...]
+    """The names of the drones involved in the violation."""
+
+    def as_dict(self, ndigits: int = 3) -> Dict[str, Any]:
+        """Returns a JSON-serializable dictionary representation of the
+        violation.
+
+        Parameters:
+            ndigits: round floats to this precision
+        """
+        return {
+            "type": self.type.value,
+            "frame": self.frame,
+            "time": round(self.time, ndigits=ndigits),
+            "value": round(self.value, ndigits=ndigits),
+            "limit": round(self.limit, ndigits=ndigits),
+            "drones": list(self.drones),
+        }
+
+
+@dataclass
+class SafetyReport:
+    """Result of the offline safety check of a sampled show.
+
+    The per-frame statistics are stored in NumPy arrays where the index of
+    each item is the index of the frame in `frames`.
+    """
+
+    params: SafetyCheckParams
+    """The safety check parameters that the show was checked against."""
+
+    names: List[str]
+    """The names of the drones."""
+
+    frames: NDArray[intp]
+    """The indices of the checked frames."""
+
+    times: NDArray[float64]
+    """The timestamps of the checked frames, in seconds."""
+
+    min_distance: NDArray[float64]
+    """The smallest distance between any two drones in each frame; infinity
+    if there are less than two drones.
+    """
+
+    closest_pair: NDArray[intp]
+    """The indices of the two drones that are closest to each other in each
+    frame, one row per frame; -1 if there are less than two drones.
+    """
+
+    min_altitude: NDArray[float64]
+    """The smallest altitude of any drone in each frame."""
+
+    max_altitude: NDArray[float64]
+    """The largest altitude of any drone in each frame."""
+
+    max_velocity_xy: NDArray[float64]
+    """The largest horizontal velocity of any drone in each frame."""
+
+    max_velocity_z_up: NDArray[float64]
+    """The largest upward velocity of any drone in each frame; zero if no
+    drone moves upwards.
+    """
+
+    max_velocity_z_down: NDArray[float64]
+    """The largest downward velocity of any drone in each frame, as a
+    non-negative number; zero if no drone moves downwards.
+    """
+
+    violations: List[SafetyViolation] = field(default_factory=list)
+    """The safety violations, ordered by frame and then by type."""
+
+    @property
+    def num_frames(self) -> int:
+        """Returns the number of checked frames."""
+        return len(self.frames)
+
+    def get_violations(
+        self,
+        type: Optional[SafetyViolationType] = None,
+        *,
+        sort_by: str = "frame",
+    ) -> List[SafetyViolation]:
+        """Returns the safety violations, optionally filtered by type.
+
+        Parameters:
+            type: the type of violations to return; `None` means all types
+            sort_by: the order of the violations; `"frame"` orders them by
+                frame and then by type, `"type"` by type and then by frame,
+                and `"severity"` by the amount by which the value exceeds the
+                limit, the most severe violation first
+
+        Returns:
+            the matching violations in the given order
+        """
+        result = [v for v in self.violations if type is None or v.type is type]
+        if sort_by == "frame":
+            result.sort(key=lambda v: (v.frame, _type_order[v.type]))
+        elif sort_by == "type":
+            result.sort(key=lambda v: (_type_order[v.type], v.frame))
+        elif sort_by == "severity":
+            result.sort(key=lambda v: abs(v.value - v.limit), reverse=True)
+        else:
+            raise ValueError(f"Unknown sort order: {sort_by!r}")
+        return result
+
+    def as_dict(self, ndigits: int = 3) -> Dict[str, Any]:
+        """Returns a JSON-serializable dictionary representation of the report.
+
+        Limits that are disabled, i.e. infinite, are represented by `None`.
+
+        Parameters:
+            ndigits: round floats to this precision
+        """
+        params = {
+            key: None if value == inf else value
+            for key, value in self.params.as_dict(ndigits=ndigits).items()
+        }
+        return {
+            "version": 1,
+            "params": params,
+            "frames": [
+                self._get_frame_stats(index, ndigits)
+                for index in range(self.num_frames)
+            ],
+            "violations": [
+                violation.as_dict(ndigits=ndigits) for violation in self.violations
+            ],
+        }
+
+    def write_csv(self, path: Path, ndigits: int = 3) -> None:
+        """Writes the per-frame statistics and the types of the violations in
+        each frame into a CSV file, one row per frame.
+
+        Parameters:
+            path: the path of the output file
+            ndigits: round floats to this precision
+        """
+        types_by_frame: Dict[int, List[str]] = {}
+        for violation in self.violations:
+            types_by_frame.setdefault(violation.frame, []).append(violation.type.value)
+
+        with open(path, "w", newline="") as fp:
+            writer = csv.writer(fp)
+            writer.writerow(
+                [
+                    "frame",
+                    "time",
+                    "min_distance",
+                    "closest_drone_1",
+                    "closest_drone_2",
+                    "min_altitude",
+                    "max_altitude",
+                    "max_velocity_xy",
+                    "max_velocity_z_up",
+                    "max_velocity_z_down",
+                    "violations",
+                ]
+            )
+            for index in range(self.num_frames):
+                stats = self._get_frame_stats(index, ndigits)
+                first, second = stats["closestPair"] or ("", "")
+                writer.writerow(
+                    [
+                        stats["frame"],
+                        stats["time"],
+                        "" if stats["minDistance"] is None else stats["minDistance"],
+                        first,
+                        second,
+                        stats["minAltitude"],
+                        stats["maxAltitude"],
+                        stats["maxVelocityXY"],
+                        stats["maxVelocityZUp"],
+                        stats["maxVelocityZDown"],
+                        ";".join(types_by_frame.get(stats["frame"], ())),
+                    ]
+                )
+
+    def write_json(self, path: Path, ndigits: int = 3) -> None:
+        """Writes the report into a JSON file.
+
+        Parameters:
+            path: the path of the output file
+            ndigits: round floats to this precision
+        """
+        with open(path, "w") as fp:
+            json.dump(self.as_dict(ndigits=ndigits), fp, indent=2)
+
+    def _get_frame_stats(self, index: int, ndigits: int) -> Dict[str, Any]:
+        """Returns the statistics of the frame with the given index in a
+        JSON-serializable dictionary.
+        """
+        first, second = self.closest_pair[index].tolist()
+        min_distance = float(self.min_distance[index])
+        return {
+            "frame": int(self.frames[index]),
+            "time": round(float(self.times[index]), ndigits=ndigits),
+            "minDistance": (
+                round(min_distance, ndigits=ndigits) if first >= 0 else None
+            ),
+            "closestPair": (
+                [self.names[first], self.names[second]] if first >= 0 else None
+            ),
+            "minAltitude": round(float(self.min_altitude[index]), ndigits=ndigits),
+            "maxAltitude": round(float(self.max_altitude[index]), ndigits=ndigits),
+            "maxVelocityXY": round(float(self.max_velocity_xy[index]), ndigits=ndigits),
+            "maxVelocityZUp": round(
+                float(self.max_velocity_z_up[index]), ndigits=ndigits
+            ),
+            "maxVelocityZDown": round(
+                float(self.max_velocity_z_down[index]), ndigits=ndigits
+            ),
+        }
+
+
+def create_safety_report(
+    positions: ArrayLike,
+    times: ArrayLike,
+    names: Sequence[str],
+    params: SafetyCheckParams,
+    *,
+    frames: Optional[ArrayLike] = None,
+    chunk_size: int = 256,
+) -> SafetyReport:
+    """Checks every frame of a sampled show against the given safety check
+    parameters.
+
+    Velocities are estimated with backward differences between consecutive
+    frames; the velocities in the first frame are assumed to be zero.
+
+    Parameters:
+        positions: the sampled positions; shape is `(frames, drones, 3)`
+        times: the timestamps of the frames, in seconds; shape is `(frames,)`
+        names: the names of the drones
+        params: the safety check parameters to check the show against;
+            limits that are set to infinity are not checked
+        frames: the indices of the frames; `None` means that the frames are
+            numbered from zero
+        chunk_size: the number of frames to process at once when estimating
+            velocities; limits the size of the temporary arrays
+
+    Returns:
+        the per-frame statistics and the safety violations of the show
+    """
+    positions = asarray(positions)
+    times = asarray(times, dtype=float64).reshape(-1)
+    names = list(names)
+    num_frames = len(times)
+    frames = (
+        asarray(range(num_frames), dtype=intp)
+        if frames is None
+        else asarray(frames, dtype=intp).reshape(-1)
+    )
+    if positions.shape != (num_frames, len(names), 3):
+        raise ValueError("positions must have shape (frames, drones, 3)")
+    if len(frames) != num_frames:
+        raise ValueError("frames and times must have the same length")
+
+    max_velocity_z_up = (
+        params.max_velocity_z
+        if params.max_velocity_z_up is None
+        else params.max_velocity_z_up
+    )
+    has_drones = len(names) > 0
+
+    # The closest pair is usually not much farther apart than the proximity
+    # threshold so it is a good initial cell size for the spatial hash
+    cell_size = params.min_distance if params.min_distance > 0 else 1.0
+
+    report = SafetyReport(
+        params=params,
+        names=names,
+        frames=frames,
+        times=times,
+        min_distance=full(num_frames, inf),
+        closest_pair=full((num_frames, 2), -1, dtype=intp),
+        min_altitude=empty(num_frames),
+        max_altitude=empty(num_frames),
+        max_velocity_xy=empty(num_frames),
+        max_velocity_z_up=empty(num_frames),
+        max_velocity_z_down=empty(num_frames),
+    )
+    violations_by_frame: List[List[SafetyViolation]] = [[] for _ in range(num_frames)]
+
+    def add_violations(type, values, mask, limit, offset) -> None:
+        # values must be oriented such that larger values are worse
+        for row in flatnonzero(mask.any(axis=1)).tolist():
+            drones = flatnonzero(mask[row])
+            index = row + offset
+            violations_by_frame[index].append(
+                SafetyViolation(
+                    type=type,
+                    frame=int(frames[index]),
+                    time=float(times[index]),
+                    value=float(values[row, drones].max()),
+                    limit=limit,
+                    drones=tuple(names[drone] for drone in drones.tolist()),
+                )
+            )
+
+    for start in range(0, num_frames, max(1, chunk_size)):
+        end = min(start + chunk_size, num_frames)
+        first = max(start - 1, 0)
+        chunk = slice(start, end)
+
+        # Altitudes
+        altitudes = positions[chunk, :, 2].astype(float64)
+        if has_drones:
+            report.min_altitude[chunk] = altitudes.min(axis=1)
+            report.max_altitude[chunk] = altitudes.max(axis=1)
+        else:
+            report.min_altitude[chunk] = report.max_altitude[chunk] = 0.0
+
+        # Velocities
+        velocities = get_velocities(positions[first:end], times[first:end])
+        velocities = velocities[start - first :]
+        velocities_xy = hypot(velocities[..., 0], velocities[..., 1])
+        velocities_z = velocities[..., 2]
+        if has_drones:
+            report.max_velocity_xy[chunk] = velocities_xy.max(axis=1)
+            report.max_velocity_z_up[chunk] = velocities_z.max(axis=1).clip(min=0)
+            report.max_velocity_z_down[chunk] = (-velocities_z).max(axis=1).clip(min=0)
+        else:
+            report.max_velocity_xy[chunk] = 0.0
+            report.max_velocity_z_up[chunk] = report.max_velocity_z_down[chunk] = 0.0
+
+        # Nearest neighbors
+        for index in range(start, end):
+            closest_pair = find_closest_pair(positions[index], cell_size)
+            if closest_pair is not None:
+                i, j, distance = closest_pair
+                report.min_distance[index] = distance
+                report.closest_pair[index] = i, j
+                if distance < params.min_distance:
+                    violations_by_frame[index].append(
+                        SafetyViolation(
+                            type=SafetyViolationType.PROXIMITY,
+                            frame=int(frames[index]),
+                            time=float(times[index]),
+                            value=float(distance),
+                            limit=params.min_distance,
+                            drones=(names[i], names[j]),
+                        )
+                    )
+
+        add_violations(
+            SafetyViolationType.ALTITUDE,
+            altitudes,
+            altitudes >= params.max_altitude,
+            params.max_altitude,
+            start,
+        )
+        add_violations(
+            SafetyViolationType.VELOCITY_XY,
+            velocities_xy,
+            velocities_xy > params.max_velocity_xy,
+            params.max_velocity_xy,
+            start,
+        )
+        add_violations(
+            SafetyViolationType.VELOCITY_Z_UP,
+            velocities_z,
+            velocities_z > max_velocity_z_up,
+            max_velocity_z_up,
+            start,
+        )
+        add_violations(
+            SafetyViolationType.VELOCITY_Z_DOWN,
+            -velocities_z,
+            velocities_z < -params.max_velocity_z,
+            params.max_velocity_z,
+            start,
+        )
+
+    for violations in violations_by_frame:
+        violations.sort(key=lambda v: _type_order[v.type])
+        report.violations.extend(violations)
+
+    return report
+
+
+def create_safety_report_from_trajectories(
+    trajectories: Mapping[str, Trajectory],
+    times: ArrayLike,
+    params: SafetyCheckParams,
+    *,
+    frames: Optional[ArrayLike] = None,
+    chunk_size: int = 256,
+) -> SafetyReport:
+    """Checks a show given by the trajectories of its drones against the given
+    safety check parameters, at the given timestamps.
+
+    The positions of the drones are interpolated linearly between the points
+    of their trajectories, so the show can be checked at any resolution
+    without evaluating the scene in Blender again.
+
+    Parameters:
+        trajectories: the trajectories of the drones, indexed by drone names
+        times: the timestamps to check the show at, in seconds
+        params: the safety check parameters to check the show against;
+            limits that are set to infinity are not checked
+        frames: the indices of the frames corresponding to the timestamps;
+            `None` means that the frames are numbered from zero
+        chunk_size: the number of frames to process at once when estimating
+            velocities; limits the size of the temporary arrays
+
+    Returns:
+        the per-frame statistics and the safety violations of the show
+
+    Raises:
+        ValueError: if any of the trajectories is empty
+    """
+    times = asarray(times, dtype=float64).reshape(-1)
+    return create_safety_report(
+        get_positions_at(trajectories.values(), times),
+        times,
+        list(trajectories.keys()),
+        params,
+        frames=frames,
+        chunk_size=chunk_size,
+    )
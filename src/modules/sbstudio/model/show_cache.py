@@ -0,0 +1,286 @@
+"""Binary on-disk format for storing the trajectories, light programs, yaw
+setpoints and time markers of a sampled drone show.
+
+A show cache is an uncompressed NumPy archive (`.npz`). The data of all the
+drones is concatenated into a few large arrays per channel, with an
+additional array of offsets that tells where the data of each drone starts,
+so writing and reading the cache does not need to process the drones one by
+one. The model objects of the individual drones are constructed lazily, on
+first access.
+"""
+
+from collections.abc import Mapping
+from functools import cached_property
+from numpy import (
+    asarray,
+    bool_,
+    concatenate,
+    cumsum,
+    empty,
+    float64,
+    int64,
+    load,
+    packbits,
+    savez,
+    str_,
+    uint8,
+    unpackbits,
+)
+from numpy.typing import NDArray
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from .light_program import LightProgram
+from .time_markers import TimeMarkers
+from .trajectory import Trajectory
+from .yaw import YawSetpointList
+
+__all__ = ("ShowCache", "write_show_cache")
+
+_VERSION = 1
+"""Version number of the format."""
+
+
+class ShowCache:
+    """Show loaded from a show cache file.
+
+    The arrays of the file are read on first access, and the model objects of
+    the individual drones are constructed only when they are looked up in
+    `trajectories`, `lights` or `yaw_setpoints`; each model object is
+    constructed at most once. The file is kept open until the cache is
+    closed; the cache can also be used as a context manager.
+    """
+
+    _path: Path
+    """The path of the show cache file."""
+
+    _arrays: Dict[str, NDArray[Any]]
+    """Arrays that were already read from the file, indexed by name."""
+
+    def __init__(self, path: Path):
+        """Constructor.
+
+        Parameters:
+            path: the path of the show cache file
+
+        Raises:
+            RuntimeError: if the file is not a show cache file or its version
+                is not supported
+        """
+        self._path = Path(path)
+        self._file = load(self._path, allow_pickle=False)
+        self._arrays = {}
+
+        try:
+            version = int(self._get("version"))
+        except KeyError:
+            self.close()
+            raise RuntimeError(f"{str(path)!r} is not a show cache file") from None
+
+        if version != _VERSION:
+            self.close()
+            raise RuntimeError(f"Unsupported show cache version: {version}")
+
+        self.names = self._get("names").tolist()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """Closes the underlying file. Arrays and model objects that were
+        already loaded remain accessible.
+        """
+        self._file.close()
+
+    @property
+    def path(self) -> Path:
+        """The path of the show cache file."""
+        return self._path
+
+    @cached_property
+    def trajectories(self) -> Mapping[str, Trajectory]:
+        """The trajectories of the drones, indexed by drone names."""
+        offsets, data = self._get("trajectory_offsets"), self._get("trajectory_data")
+        return _LazyMapping(
+            self.names,
+            lambda index: Trajectory.from_array(
+                data[offsets[index] : offsets[index + 1]]
+            ),
+        )
+
+    @cached_property
+    def lights(self) -> Optional[Mapping[str, LightProgram]]:
+        """The light programs of the drones, indexed by drone names; `None`
+        if the cache does not contain light programs.
+        """
+        if "light_offsets" not in self._file:
+            return None
+
+        offsets, times, rgb = (
+            self._get("light_offsets"),
+            self._get("light_times"),
+            self._get("light_rgb"),
+        )
+        fades = self._get_unpacked_light_fades()
+        return _LazyMapping(
+            self.names,
+            lambda index: LightProgram.from_arrays(
+                times[offsets[index] : offsets[index + 1]],
+                rgb[offsets[index] : offsets[index + 1]],
+                fades[offsets[index] : offsets[index + 1]],
+            ),
+        )
+
+    @cached_property
+    def yaw_setpoints(self) -> Optional[Mapping[str, YawSetpointList]]:
+        """The yaw setpoints of the drones, indexed by drone names; `None` if
+        the cache does not contain yaw setpoints.
+        """
+        if "yaw_offsets" not in self._file:
+            return None
+
+        offsets, data = self._get("yaw_offsets"), self._get("yaw_data")
+        return _LazyMapping(
+            self.names,
+            lambda index: YawSetpointList.from_arrays(
+                data[offsets[index] : offsets[index + 1], 0],
+                data[offsets[index] : offsets[index + 1], 1],
+            ),
+        )
+
+    @property
+    def time_markers(self) -> TimeMarkers:
+        """The time markers of the show."""
+        names, times = self._get("marker_names"), self._get("marker_times")
+        return TimeMarkers(dict(zip(names.tolist(), times.tolist())))
+
+    def _get(self, name: str) -> NDArray[Any]:
+        """Returns the array with the given name, reading it from the file
+        on first access.
+        """
+        result = self._arrays.get(name)
+        if result is None:
+            result = self._arrays[name] = self._file[name]
+        return result
+
+    def _get_unpacked_light_fades(self) -> NDArray[bool_]:
+        result = self._arrays.get("light_fades_unpacked")
+        if result is None:
+            num_keypoints = len(self._get("light_times"))
+            result = unpackbits(
+                self._get("light_fades"), count=num_keypoints, bitorder="little"
+            ).view(bool_)
+            self._arrays["light_fades_unpacked"] = result
+        return result
+
+
+def write_show_cache(
+    path: Path,
+    trajectories: Dict[str, Trajectory],
+    lights: Optional[Dict[str, LightProgram]] = None,
+    yaw_setpoints: Optional[Dict[str, YawSetpointList]] = None,
+    time_markers: Optional[TimeMarkers] = None,
+) -> None:
+    """Writes the trajectories, light programs, yaw setpoints and time markers
+    of a show into a show cache file.
+
+    The file is written to a temporary file first and then moved to its final
+    place so an interrupted write never leaves a corrupted file behind.
+
+    Parameters:
+        path: the path of the show cache file; must end with `.npz`
+        trajectories: dictionary of trajectories indexed by drone names
+        lights: dictionary of light programs indexed by drone names
+        yaw_setpoints: dictionary of yaw setpoints indexed by drone names
+        time_markers: the time markers of the show
+
+    Note: drone names must match in trajectories, lights and yaw setpoints
+    """
+    names = list(trajectories.keys())
+    markers = time_markers.markers if time_markers is not None else {}
+
+    arrays: Dict[str, Any] = {
+        "version": asarray(_VERSION),
+        "names": asarray(names, dtype=str_),
+        "marker_names": asarray(list(markers.keys()), dtype=str_),
+        "marker_times": asarray(list(markers.values()), dtype=float64),
+    }
+
+    items = [trajectories[name] for name in names]
+    arrays["trajectory_offsets"] = _get_offsets(items)
+    arrays["trajectory_data"] = _concatenate(
+        [item.array for item in items], (0, 4), float64
+    )
+
+    if lights is not None:
+        items = [lights[name] for name in names]
+        arrays["light_offsets"] = _get_offsets(items)
+        arrays["light_times"] = _concatenate(
+            [item.times for item in items], (0,), float64
+        )
+        arrays["light_rgb"] = _concatenate([item.rgb for item in items], (0, 3), uint8)
+        arrays["light_fades"] = packbits(
+            _concatenate([item.fades for item in items], (0,), bool_),
+            bitorder="little",
+        )
+
+    if yaw_setpoints is not None:
+        items = [yaw_setpoints[name] for name in names]
+        arrays["yaw_offsets"] = _get_offsets(items)
+        data = empty((int(arrays["yaw_offsets"][-1]), 2), dtype=float64)
+        data[:, 0] = _concatenate([item.times for item in items], (0,), float64)
+        data[:, 1] = _concatenate([item.angles for item in items], (0,), float64)
+        arrays["yaw_data"] = data
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.stem}.tmp.npz")
+    savez(tmp_path, **arrays)
+    tmp_path.replace(path)
+
+
+def _concatenate(
+    arrays: Sequence[NDArray[Any]], empty_shape: Sequence[int], dtype
+) -> NDArray[Any]:
+    """Concatenates the given arrays, returning an empty array with the given
+    shape if there are no arrays.
+    """
+    return concatenate(arrays).astype(dtype) if arrays else empty(empty_shape, dtype)
+
+
+def _get_offsets(items: Sequence[Any]) -> NDArray[int64]:
+    """Returns the offsets where the data of the given items start in the
+    concatenated arrays, followed by the total length of the data.
+    """
+    result = empty(len(items) + 1, dtype=int64)
+    result[0] = 0
+    cumsum(asarray([len(item) for item in items], dtype=int64), out=result[1:])
+    return result
+
+
+class _LazyMapping(Mapping):
+    """Read-only mapping from drone names to model objects that constructs
+    the model objects on first access.
+    """
+
+    def __init__(self, names: List[str], factory: Callable[[int], Any]):
+        self._names = names
+        self._indices = {name: index for index, name in enumerate(names)}
+        self._factory = factory
+        self._items: Dict[int, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        index = self._indices[key]
+        item = self._items.get(index)
+        if item is None:
+            item = self._items[index] = self._factory(index)
+        return item
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
@@ -1,9 +1,15 @@
+from numpy import asarray, clip, empty, float64, newaxis, searchsorted, where
+from numpy.typing import ArrayLike, NDArray
 from operator import attrgetter
-from typing import List, Optional, Sequence, TypeVar
+from typing import Iterable, Optional, Sequence, TypeVar, overload
 
+from sbstudio.math.rounding import round_array
+from sbstudio.math.simplification import get_trajectory_keypoints
+
+from .buffer import ColumnBuffer, ItemSequence, get_time_order
 from .point import Point3D, Point4D
 
-__all__ = ("Trajectory",)
+__all__ = ("Trajectory", "get_positions_at")
 
 C = TypeVar("C", bound="Trajectory")
 
@@ -14,20 +20,132 @@ class Trajectory:
     Positions between given Point4D elements are assumed to be
     linearly interpolated both in space and time.
 
+    The points are stored in a growable NumPy array with one `(t, x, y, z)`
+    row per point. Appending a point takes amortized constant time, and
+    slicing a trajectory returns a new trajectory that shares its points
+    with the original one without copying them, just like slicing a NumPy
+    array. The `points` property provides a read-only sequence of `Point4D`
+    objects for code that does not work with arrays directly.
+    """
+
+    _buffer: ColumnBuffer
+    """Buffer holding the points of the trajectory in a single column of
+    `(t, x, y, z)` rows.
     """
 
-    def __init__(self, points: Sequence[Point4D] = []):
-        self.points = sorted(points, key=attrgetter("t"))
+    def __init__(self, points: Sequence[Point4D] = ()):
+        get_coordinates = attrgetter("t", "x", "y", "z")
+        self._set_data(
+            asarray(
+                [get_coordinates(point) for point in points], dtype=float64
+            ).reshape(-1, 4)
+        )
+
+    @classmethod
+    def from_array(cls, data: ArrayLike, *, copy: bool = True) -> "Trajectory":
+        """Constructs a trajectory from an array with one `(t, x, y, z)` row
+        per point. The rows are sorted by time.
+
+        Parameters:
+            data: the points of the trajectory, one row per point
+            copy: whether to copy the array. When this is `False` and the
+                array is a sorted float64 array already, the trajectory
+                shares its points with the array until the first append that
+                needs to grow the trajectory.
+        """
+        result = cls.__new__(cls)
+        result._set_data(asarray(data, dtype=float64).reshape(-1, 4), copy=copy)
+        return result
+
+    @classmethod
+    def from_arrays(cls, times: ArrayLike, positions: ArrayLike) -> "Trajectory":
+        """Constructs a trajectory from an array of timestamps and an array of
+        the corresponding positions. The points are sorted by time; the arrays
+        are always copied.
+
+        Parameters:
+            times: the timestamps of the points
+            positions: the positions of the points, one `(x, y, z)` row per
+                point
+        """
+        times = asarray(times, dtype=float64).reshape(-1)
+        data = empty((len(times), 4), dtype=float64)
+        data[:, 0] = times
+        data[:, 1:] = positions
+        result = cls.__new__(cls)
+        result._set_data(data, copy=False)
+        return result
+
+    @property
+    def array(self) -> NDArray[float64]:
+        """Read-only view of the points of the trajectory, with one
+        `(t, x, y, z)` row per point.
+        """
+        return self._buffer.column()
+
+    @property
+    def times(self) -> NDArray[float64]:
+        """Read-only view of the timestamps of the points of the trajectory."""
+        return self.array[:, 0]
+
+    @property
+    def positions(self) -> NDArray[float64]:
+        """Read-only view of the positions of the points of the trajectory,
+        with one `(x, y, z)` row per point.
+        """
+        return self.array[:, 1:]
+
+    @property
+    def points(self) -> Sequence[Point4D]:
+        """The points of the trajectory as a read-only sequence of `Point4D`
+        objects. The objects are created on-the-fly; modifying them does not
+        modify the trajectory.
+        """
+        return ItemSequence(_point_from_row, self.array)
+
+    @points.setter
+    def points(self, value: Iterable[Point4D]) -> None:
+        self._buffer = Trajectory(list(value))._buffer
 
     @property
     def first_point(self) -> Optional[Point4D]:
-        return self.points[0] if self.points else None
+        return self._point_at(0) if len(self._buffer) else None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @overload
+    def __getitem__(self, index: int) -> Point4D: ...
+
+    @overload
+    def __getitem__(self: C, index: slice) -> C: ...
+
+    def __getitem__(self, index):
+        """Returns a single point of the trajectory if the index is an integer,
+        or a new trajectory that shares its points with this one if the index
+        is a slice. Modifying the points of one of the trajectories in-place
+        modifies the other one as well.
+        """
+        if isinstance(index, slice):
+            if index.step is not None and index.step < 0:
+                raise ValueError("Trajectories cannot be reversed")
+            result = self.__class__.__new__(self.__class__)
+            result._buffer = self._buffer.take(index)
+            return result
+
+        length = len(self._buffer)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("trajectory index out of range")
+        return self._point_at(index)
 
     def append(self, point: Point4D) -> None:
         """Add a point to the end of the trajectory."""
-        if self.points and self.points[-1].t >= point.t:
+        times = self.times
+        if len(times) and times[-1] >= point.t:
             raise ValueError("New point must come after existing trajectory in time")
-        self.points.append(point)
+        self._buffer.append((point.t, point.x, point.y, point.z))
 
     def as_dict(self, ndigits: int = 3, *, version: int = 1):
         """Create a Skybrush-compatible dictionary representation of this
@@ -41,39 +159,20 @@ class Trajectory:
             dictionary of this instance, to be converted to JSON later
 
         """
+        # Round all coordinates in one go; each row is [t, x, y, z]
+        rows = round_array(self.array, ndigits).tolist()
+
         if version == 0:
             # Special representation to be used when sending a trajectory for
             # rendering to .skyc into the Skybrush Studio server. This
             # representation indicates to the Skybrush Studio server that the
             # points are samples and it is allowed to simplify the trajectory
             # further by eliminating unneeded points
-            return {
-                "points": [
-                    [
-                        round(point.t, ndigits=ndigits),
-                        round(point.x, ndigits=ndigits),
-                        round(point.y, ndigits=ndigits),
-                        round(point.z, ndigits=ndigits),
-                    ]
-                    for point in self.points
-                ],
-                "version": 0,
-            }
+            return {"points": rows, "version": 0}
         else:
             # Standard representation
             return {
-                "points": [
-                    [
-                        round(point.t, ndigits=ndigits),
-                        [
-                            round(point.x, ndigits=ndigits),
-                            round(point.y, ndigits=ndigits),
-                            round(point.z, ndigits=ndigits),
-                        ],
-                        [],
-                    ]
-                    for point in self.points
-                ],
+                "points": [[row[0], row[1:], []] for row in rows],
                 "version": 1,
             }
 
@@ -81,10 +180,57 @@ class Trajectory:
     def duration(self) -> float:
         """Returns the duration of the trajectory in seconds."""
 
-        if len(self.points) < 2:
+        times = self.times
+        if len(times) < 2:
             return 0
 
-        return self.points[-1].t - self.points[0].t
+        return float(times[-1] - times[0])
+
+    def positions_at(self, times: ArrayLike) -> NDArray[float64]:
+        """Returns the positions of the trajectory at the given timestamps,
+        interpolating linearly between the points of the trajectory.
+
+        The trajectory is assumed to stay at its first point before the first
+        timestamp and at its last point after the last timestamp. When
+        multiple points have the same timestamp, the last one of them is
+        returned for that timestamp.
+
+        Parameters:
+            times: the timestamps to query
+
+        Returns:
+            the positions at the given timestamps, one `(x, y, z)` row per
+            timestamp
+
+        Raises:
+            ValueError: if the trajectory is empty
+        """
+        times = asarray(times, dtype=float64).reshape(-1)
+        data = self.array
+        length = len(data)
+        if not length:
+            raise ValueError("Trajectory is empty")
+
+        if length == 1:
+            return data[[0] * len(times), 1:]
+
+        # Find the segment of each timestamp; timestamps outside the time
+        # span of the trajectory are assigned to the first or last segment
+        # and the interpolation ratio is clipped to [0; 1] below
+        end = clip(searchsorted(data[:, 0], times, side="right"), 1, length - 1)
+        start = end - 1
+        start_times, end_times = data[start, 0], data[end, 0]
+        durations = end_times - start_times
+        safe_durations = where(durations > 0, durations, 1.0)
+        ratios = where(durations > 0, (times - start_times) / safe_durations, 1.0)
+        ratios = clip(ratios, 0.0, 1.0)[:, newaxis]
+
+        start_positions, end_positions = data[start, 1:], data[end, 1:]
+        return where(
+            ratios >= 1,
+            end_positions,
+            start_positions + ratios * (end_positions - start_positions),
+        )
 
     def shift_in_place(self: C, offset: Point3D) -> C:
         """Shifts all points of the trajectory in-place.
@@ -93,15 +239,7 @@ class Trajectory:
             offset: the spatial offset to add to each point in the
                 trajectory.
         """
-        self.points = [
-            Point4D(
-                t=point.t,
-                x=point.x + offset.x,
-                y=point.y + offset.y,
-                z=point.z + offset.z,
-            )
-            for point in self.points
-        ]
+        self._buffer.writable_column()[:, 1:] += (offset.x, offset.y, offset.z)
         return self
 
     def shift_time_in_place(self: C, delta: float) -> C:
@@ -111,40 +249,60 @@ class Trajectory:
             delta: the time delta to add to the timestamp of each point in the
                 trajectory.
         """
-        self.points = [
-            Point4D(t=point.t + delta, x=point.x, y=point.y, z=point.z)
-            for point in self.points
-        ]
+        self._buffer.writable_column()[:, 0] += delta
         return self
 
     def simplify_in_place(self: C) -> C:
-        new_points: List[Point4D] = []
-        if not self.points:
-            return self
-
-        first_point = self.points[0]
-
-        # Make up a fake last point that is different from the first one
-        last_point = Point4D(
-            t=first_point.t - 1,
-            x=first_point.x - 1,
-            y=first_point.y - 1,
-            z=first_point.z - 1,
-        )
-
-        keep_next = False
-        for point in self.points:
-            prev_is_same = (
-                last_point.x == point.x
-                and last_point.y == point.y
-                and last_point.z == point.z
-            )
-            if keep_next or not prev_is_same:
-                new_points.append(point)
-            else:
-                new_points[-1] = point
-            keep_next = not prev_is_same
-            last_point = point
-
-        self.points = new_points
+        """Removes the intermediate points of each run of consecutive points
+        at the same position, keeping only the first and the last point of
+        the run. This does not change the shape of the trajectory.
+        """
+        if len(self._buffer) > 2:
+            keep = get_trajectory_keypoints(self.times, self.positions)
+            if len(keep) < len(self._buffer):
+                self._buffer = self._buffer.take(keep)
         return self
+
+    def _point_at(self, index: int) -> Point4D:
+        return _point_from_row(self.array[index].tolist())
+
+    def _set_data(self, data: NDArray[float64], *, copy: bool = True) -> None:
+        """Replaces the points of the trajectory with the rows of the given
+        array, sorted by time. The sort is stable so points with the same
+        timestamp keep their relative order.
+        """
+        order = get_time_order(data[:, 0])
+        if order is not None:
+            data, copy = data[order], False
+        self._buffer = ColumnBuffer(data, copy=copy)
+
+
+def get_positions_at(
+    trajectories: Iterable[Trajectory], times: ArrayLike
+) -> NDArray[float64]:
+    """Returns the positions of multiple trajectories at the given timestamps,
+    interpolating linearly between the points of each trajectory.
+
+    Parameters:
+        trajectories: the trajectories to query
+        times: the timestamps to query
+
+    Returns:
+        the positions at the given timestamps; shape is
+        `(timestamps, trajectories, 3)`, which is the same layout as the one
+        used for sampled positions during export
+
+    Raises:
+        ValueError: if any of the trajectories is empty
+    """
+    times = asarray(times, dtype=float64).reshape(-1)
+    trajectories = list(trajectories)
+    result = empty((len(times), len(trajectories), 3), dtype=float64)
+    for index, trajectory in enumerate(trajectories):
+        result[:, index, :] = trajectory.positions_at(times)
+    return result
+
+
+def _point_from_row(row: Sequence[float]) -> Point4D:
+    t, x, y, z = row
+    return Point4D(t, x, y, z)
@@ -1,9 +1,13 @@
 from dataclasses import dataclass
+from numpy import asarray, empty, float64
+from numpy.typing import ArrayLike, NDArray
 from operator import attrgetter
-from typing import (
-    Sequence,
-    TypeVar,
-)
+from typing import Iterable, Sequence, TypeVar
+
+from sbstudio.math.rounding import round_array
+from sbstudio.math.simplification import simplify_yaw_angles
+
+from .buffer import ColumnBuffer, ItemSequence, get_time_order
 
 __all__ = (
     "YawSetpointList",
@@ -14,7 +18,7 @@ __all__ = (
 C = TypeVar("C", bound="YawSetpointList")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class YawSetpoint:
     """The simplest representation of a yaw setpoint."""
 
@@ -30,16 +34,76 @@ class YawSetpointList:
 
     Setpoints are assumed to be linear, i.e. yaw rate is constant
     between setpoints.
+
+    The setpoints are stored in a growable NumPy array with one
+    `(time, angle)` row per setpoint. The `setpoints` property provides a
+    read-only sequence of `YawSetpoint` objects for code that does not work
+    with arrays directly.
+    """
+
+    _buffer: ColumnBuffer
+    """Buffer holding the setpoints in a single column of `(time, angle)`
+    rows.
     """
 
-    def __init__(self, setpoints: Sequence[YawSetpoint] = []):
-        self.setpoints = sorted(setpoints, key=attrgetter("time"))
+    def __init__(self, setpoints: Sequence[YawSetpoint] = ()):
+        get_time_and_angle = attrgetter("time", "angle")
+        self._set_data(
+            asarray(
+                [get_time_and_angle(setpoint) for setpoint in setpoints],
+                dtype=float64,
+            ).reshape(-1, 2)
+        )
+
+    @classmethod
+    def from_arrays(cls, times: ArrayLike, angles: ArrayLike) -> "YawSetpointList":
+        """Constructs a yaw setpoint list from an array of timestamps and an
+        array of the corresponding yaw angles. The setpoints are sorted by
+        time; the arrays are always copied.
+
+        Parameters:
+            times: the timestamps of the setpoints, in seconds
+            angles: the yaw angles of the setpoints, in degrees
+        """
+        times = asarray(times, dtype=float64).reshape(-1)
+        data = empty((len(times), 2), dtype=float64)
+        data[:, 0] = times
+        data[:, 1] = angles
+        result = cls.__new__(cls)
+        result._set_data(data, copy=False)
+        return result
+
+    @property
+    def setpoints(self) -> Sequence[YawSetpoint]:
+        """The setpoints as a read-only sequence of `YawSetpoint` objects.
+        The objects are created on-the-fly; modifying them does not modify the
+        setpoint list.
+        """
+        return ItemSequence(YawSetpoint, self.times, self.angles)
+
+    @setpoints.setter
+    def setpoints(self, value: Iterable[YawSetpoint]) -> None:
+        self._buffer = YawSetpointList(list(value))._buffer
+
+    @property
+    def times(self) -> NDArray[float64]:
+        """Read-only view of the timestamps of the setpoints."""
+        return self._buffer.column()[:, 0]
+
+    @property
+    def angles(self) -> NDArray[float64]:
+        """Read-only view of the yaw angles of the setpoints."""
+        return self._buffer.column()[:, 1]
+
+    def __len__(self) -> int:
+        return len(self._buffer)
 
     def append(self, setpoint: YawSetpoint) -> None:
         """Add a setpoint to the end of the setpoint list."""
-        if self.setpoints and self.setpoints[-1].time >= setpoint.time:
+        times = self.times
+        if len(times) and times[-1] >= setpoint.time:
             raise ValueError("New setpoint must come after existing setpoints in time")
-        self.setpoints.append(setpoint)
+        self._buffer.append((setpoint.time, setpoint.angle))
 
     def as_dict(self, ndigits: int = 3):
         """Create a Skybrush-compatible dictionary representation of this
@@ -53,13 +117,7 @@ class YawSetpointList:
 
         """
         return {
-            "setpoints": [
-                [
-                    round(setpoint.time, ndigits=ndigits),
-                    round(setpoint.angle, ndigits=ndigits),
-                ]
-                for setpoint in self.setpoints
-            ],
+            "setpoints": round_array(self._buffer.column(), ndigits).tolist(),
             "version": 1,
         }
 
@@ -76,50 +134,37 @@ class YawSetpointList:
         Returns:
             The shifted yaw setpoint list
         """
-
-        self.setpoints = [YawSetpoint(p.time, p.angle + delta) for p in self.setpoints]
-
+        self._buffer.writable_column()[:, 1] += delta
         return self
 
     def simplify(self: C) -> C:
         """Simplify yaw setpoints in place.
 
+        The list is shifted such that the first angle is in the [0; 360)
+        range, and intermediate setpoints on constant angular speed segments
+        are removed. See `sbstudio.math.simplification.simplify_yaw_angles()`
+        for the details.
+
         Returns:
             the simplified yaw setpoint list
         """
-        if not self.setpoints:
+        if not len(self._buffer):
             return self
 
-        # set first yaw in the [0, 360) range and shift entire list accordingly
-        angle = self.setpoints[0].angle % 360
-        delta = angle - self.setpoints[0].angle
-        if delta:
-            self.shift(delta)
-
-        # remove intermediate points on constant angular speed segments
-        new_setpoints: list[YawSetpoint] = []
-        last_angular_speed = -1e12
-        for setpoint in self.setpoints:
-            if not new_setpoints:
-                new_setpoints.append(setpoint)
-            else:
-                dt = setpoint.time - new_setpoints[-1].time
-                if dt <= 0:
-                    raise RuntimeError(
-                        f"Yaw timestamps are not causal ({setpoint.time} <= {new_setpoints[-1].time})"
-                    )
-                # when calculating angular speed, we round timestamps and angles
-                # to avoid large numeric errors at division by small numbers
-                angular_speed = (
-                    round(setpoint.angle, ndigits=3)
-                    - round(new_setpoints[-1].angle, ndigits=3)
-                ) / round(dt, ndigits=3)
-                if abs(angular_speed - last_angular_speed) < 1e-6:
-                    new_setpoints[-1] = setpoint
-                else:
-                    new_setpoints.append(setpoint)
-                last_angular_speed = angular_speed
-
-        self.setpoints = new_setpoints
+        times, angles = simplify_yaw_angles(self.times, self.angles)
+        data = empty((len(times), 2), dtype=float64)
+        data[:, 0] = times
+        data[:, 1] = angles
+        self._buffer = ColumnBuffer(data, copy=False)
 
         return self
+
+    def _set_data(self, data: NDArray[float64], *, copy: bool = True) -> None:
+        """Replaces the setpoints with the rows of the given array, sorted by
+        time. The sort is stable so setpoints with the same timestamp keep
+        their relative order.
+        """
+        order = get_time_order(data[:, 0])
+        if order is not None:
+            data, copy = data[order], False
+        self._buffer = ColumnBuffer(data, copy=copy)
@@ -15,7 +15,7 @@ T = TypeVar("T")
 
 
 @lru_cache(maxsize=1)
-def _get_api_from_url_and_key(url: str, key: str):
+def _get_api_from_url_and_key(url: str, key: str, use_local_renderer: bool = False):
     """Constructs a Skybrush Studio API object from a root URL and an API key.
 
     Memoized so we do not need to re-construct the same instance as long as
@@ -23,7 +23,7 @@ def _get_api_from_url_and_key(url: str, key: str):
     """
     global _fallback_api_key
 
-    result = SkybrushStudioAPI()
+    result = SkybrushStudioAPI(use_local_renderer=use_local_renderer)
 
     result.api_key = key or _fallback_api_key
     if url:
@@ -48,8 +48,9 @@ def get_api() -> SkybrushStudioAPI:
     prefs = get_preferences()
     api_key = str(prefs.api_key).strip()
     server_url = str(prefs.server_url).strip()
+    use_local_renderer = bool(prefs.use_local_renderer)
 
-    return _get_api_from_url_and_key(server_url, api_key)
+    return _get_api_from_url_and_key(server_url, api_key, use_local_renderer)
 
 
 @contextmanager
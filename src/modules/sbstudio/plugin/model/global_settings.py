@@ -1,8 +1,9 @@
-from bpy.props import BoolProperty, StringProperty
+from bpy.props import BoolProperty, FloatProperty, StringProperty
 from bpy.types import AddonPreferences, Context
 from typing import Optional
 
 from sbstudio.plugin.operators.set_server_url import SetServerURLOperator
+from sbstudio.plugin.tasks.scheduler import DEFAULT_FRAME_BUDGET, get_handler_stats
 from sbstudio.plugin.utils import with_context
 
 __all__ = ("DroneShowAddonGlobalSettings",)
@@ -31,6 +32,31 @@ class DroneShowAddonGlobalSettings(AddonPreferences):
         ),
     )
 
+    use_local_renderer = BoolProperty(
+        name="Render shows locally",
+        description=(
+            "Whether to render exported shows on this computer instead of "
+            "sending them to the Skybrush Studio server. Requires the skybrush "
+            "Python package; exports fail if it is not installed"
+        ),
+        default=False,
+    )
+
+    playback_frame_budget = FloatProperty(
+        name="Playback frame budget",
+        description=(
+            "Time that the safety checks and the light effects may take in a "
+            "single frame during playback, in milliseconds. Checks that do not "
+            "fit into the budget are skipped and run when playback stops. Zero "
+            "means no limit"
+        ),
+        default=DEFAULT_FRAME_BUDGET,
+        min=0.0,
+        soft_max=100.0,
+        precision=1,
+        unit="NONE",
+    )
+
     enable_experimental_features = BoolProperty(
         name="Enable experimental features",
         description=(
@@ -54,6 +80,21 @@ class DroneShowAddonGlobalSettings(AddonPreferences):
         op = row.operator(SetServerURLOperator.bl_idname, text="Use community server")
         op.url = ""
 
+        layout.prop(self, "use_local_renderer")
+        layout.prop(self, "playback_frame_budget")
+
+        stats = [item for item in get_handler_stats() if item.num_calls]
+        if stats:
+            col = layout.column(align=True)
+            for item in stats:
+                col.label(
+                    text=(
+                        f"{item.name}: {item.average_duration:.1f} ms per frame "
+                        f"(last: {item.last_duration:.1f} ms, skipped "
+                        f"{item.num_skipped} times during playback)"
+                    )
+                )
+
         layout.prop(self, "enable_experimental_features")
 
 
@@ -286,6 +286,18 @@ class SafetyCheckProperties(PropertyGroup):
             or self.max_velocity_z_down > 0
         )
 
+    @property
+    def num_pairs_too_close(self) -> Tuple[int, bool]:
+        """Returns the number of drone pairs that were closer to each other
+        than the proximity warning threshold in the last safety check, and
+        whether there were more such pairs than what the safety check
+        reported.
+        """
+        return (
+            len(_safety_check_result.pairs_too_close),
+            _safety_check_result.pairs_too_close_truncated,
+        )
+
     @property
     def should_show_altitude_warning(self) -> bool:
         """Returns whether the altitude warning should be drawn in the 3D view
@@ -387,6 +399,8 @@ class SafetyCheckProperties(PropertyGroup):
         self,
         formation_status: Optional[str] = None,
         nearest_neighbors: Optional[Tuple[Coordinate3D, Coordinate3D, float]] = None,
+        pairs_too_close: Optional[List[Tuple[Coordinate3D, Coordinate3D]]] = None,
+        pairs_too_close_truncated: bool = False,
         min_altitude: Optional[float] = None,
         max_altitude: Optional[float] = None,
         drones_over_max_altitude: Optional[List[Coordinate3D]] = None,
@@ -397,7 +411,13 @@ class SafetyCheckProperties(PropertyGroup):
         drones_over_max_velocity_z: Optional[List[Coordinate3D]] = None,
         drones_below_min_nav_altitude: Optional[List[Coordinate3D]] = None,
     ) -> None:
-        """Updates general safety check results."""
+        """Updates general safety check results.
+
+        `pairs_too_close` lists the pairs of drones that are closer to each
+        other than the proximity warning threshold, closest pair first;
+        `pairs_too_close_truncated` tells whether the list is incomplete
+        because there were too many such pairs.
+        """
         global _safety_check_result
 
         refresh = False
@@ -415,6 +435,11 @@ class SafetyCheckProperties(PropertyGroup):
             _safety_check_result.min_distance = distance
             refresh = True
 
+        if pairs_too_close is not None:
+            _safety_check_result.pairs_too_close = pairs_too_close
+            _safety_check_result.pairs_too_close_truncated = pairs_too_close_truncated
+            refresh = True
+
         if max_altitude is not None:
             self.max_altitude = max_altitude
             refresh = True
@@ -469,7 +494,9 @@ class SafetyCheckProperties(PropertyGroup):
             markers: List[Sequence[Coordinate3D]] = []
 
             if self.should_show_proximity_warning:
-                if _safety_check_result.closest_pair is not None:
+                if _safety_check_result.pairs_too_close:
+                    markers.extend(_safety_check_result.pairs_too_close)
+                elif _safety_check_result.closest_pair is not None:
                     markers.append(_safety_check_result.closest_pair)
 
             if self.should_show_altitude_warning:
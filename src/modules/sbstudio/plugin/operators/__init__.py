@@ -6,6 +6,7 @@ from .add_markers_from_svg import AddMarkersFromSVGOperator
 from .add_markers_from_zipped_csv import AddMarkersFromZippedCSVOperator
 from .append_formation_to_storyboard import AppendFormationToStoryboardOperator
 from .apply_color import ApplyColorsToSelectedDronesOperator
+from .check_safety_of_show import CheckSafetyOfShowOperator
 from .create_formation import CreateFormationOperator
 from .create_light_effect import CreateLightEffectOperator
 from .create_new_schedule_override_entry import CreateNewScheduleOverrideEntryOperator
@@ -55,6 +56,7 @@ from .append_all_formation_to_storyboard import AppendAllFormationToStoryboardOp
 __all__ = (
     "AppendFormationToStoryboardOperator",
     "ApplyColorsToSelectedDronesOperator",
+    "CheckSafetyOfShowOperator",
     "CreateFormationOperator",
     "CreateLightEffectOperator",
     "CreateNewScheduleOverrideEntryOperator",
@@ -2,6 +2,7 @@ from math import ceil
 
 from .base import FormationOperator
 
+from sbstudio.model.point_cloud import PointCloud
 from sbstudio.plugin.api import get_api
 from sbstudio.plugin.constants import Collections
 from sbstudio.plugin.model.formation import (
@@ -75,18 +76,22 @@ class AppendFormationToStoryboardOperator(FormationOperator):
 
         with create_position_evaluator() as get_positions_of:
             if last_formation is not None:
-                source = get_world_coordinates_of_markers_from_formation(
-                    last_formation, frame=last_frame
+                source = PointCloud.from_array(
+                    get_world_coordinates_of_markers_from_formation(
+                        last_formation, frame=last_frame
+                    ),
+                    copy=False,
                 )
-                source = [tuple(coord) for coord in source]
             else:
                 drones = Collections.find_drones().objects
                 source = get_positions_of(drones, frame=last_frame)
 
-            target = get_world_coordinates_of_markers_from_formation(
-                formation, frame=entry.frame_start
+            target = PointCloud.from_array(
+                get_world_coordinates_of_markers_from_formation(
+                    formation, frame=entry.frame_start
+                ),
+                copy=False,
             )
-            target = [tuple(coord) for coord in target]
         try:
             plan = get_api().plan_transition(source, target, **safety_kwds)
         except Exception:
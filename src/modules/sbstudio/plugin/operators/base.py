@@ -7,7 +7,7 @@ from numpy import array, floating
 from numpy.typing import NDArray
 from typing import Any, Dict, Optional
 
-from bpy.props import BoolProperty
+from bpy.props import BoolProperty, FloatProperty, IntProperty
 from bpy.types import Collection, Operator
 from bpy_extras.io_utils import ExportHelper
 
@@ -131,6 +131,65 @@ class ExportOperator(Operator, ExportHelper):
     # frame range
     frame_range = FrameRangeProperty(default="RENDER")
 
+    # error budgets of the simplification of the sampled channels
+    max_position_error = FloatProperty(
+        name="Max position error",
+        default=0.0,
+        min=0.0,
+        soft_max=1.0,
+        unit="LENGTH",
+        description=(
+            "Maximum distance between the sampled positions and the exported "
+            "trajectories. Zero removes only the samples that are exactly "
+            "redundant. Larger values yield smaller output files"
+        ),
+    )
+    max_color_error = FloatProperty(
+        name="Max color error",
+        default=4.0,
+        min=0.0,
+        max=255.0,
+        description=(
+            "Maximum deviation of any RGB component of the exported light "
+            "programs from the sampled colors, on a scale of 0 to 255. Larger "
+            "values yield smaller output files"
+        ),
+    )
+
+    # whether to reuse samples from earlier exports when possible
+    use_sample_cache = BoolProperty(
+        name="Use sample cache",
+        default=False,
+        description=(
+            "Reuse the sampled positions, colors and yaw angles of earlier "
+            "exports for channels whose inputs have not changed since then. "
+            "Samples are cached in a folder next to the .blend file"
+        ),
+    )
+
+    # number of background Blender processes to sample the show with
+    num_workers = IntProperty(
+        name="Worker processes",
+        default=1,
+        min=1,
+        soft_max=64,
+        description=(
+            "Number of background Blender processes that sample the show in "
+            "parallel. Values larger than 1 require the file to be saved"
+        ),
+    )
+
+    # whether to write a report about the timings of the export
+    write_report = BoolProperty(
+        name="Write export report",
+        default=False,
+        description=(
+            "Write the time spent in each phase of the export, the number of "
+            "samples and the size of the uploaded data into a JSON file next "
+            "to the output file"
+        ),
+    )
+
     def execute(self, context):
         from sbstudio.plugin.api import call_api_from_blender_operator
         from .utils import export_show_to_file_using_api
@@ -144,19 +203,32 @@ class ExportOperator(Operator, ExportHelper):
         settings = {
             "export_selected": self.export_selected,
             "frame_range": self.frame_range,
+            "num_workers": self.num_workers,
+            "use_sample_cache": self.use_sample_cache,
+            "write_report": self.write_report,
+            "max_position_error": self.max_position_error,
+            "max_color_error": self.max_color_error,
             "min_nav_altitude": 0.1,  # TODO(ntamas): should be configurable
             **self.get_settings(),
         }
 
         try:
             with call_api_from_blender_operator(self, self.get_operator_name()) as api:
-                export_show_to_file_using_api(
+                warnings = export_show_to_file_using_api(
                     api, context, settings, filepath, self.get_format()
                 )
         except Exception:
             return {"CANCELLED"}
 
-        self.report({"INFO"}, "Export successful")
+        if warnings:
+            more = (
+                f" ({len(warnings) - 1} more in the log)" if len(warnings) > 1 else ""
+            )
+            self.report(
+                {"WARNING"}, f"Export successful with warnings: {warnings[0]}{more}"
+            )
+        else:
+            self.report({"INFO"}, "Export successful")
         return {"FINISHED"}
 
     def get_format(self) -> FileFormat:
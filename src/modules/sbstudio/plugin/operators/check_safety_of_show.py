@@ -0,0 +1,186 @@
+from math import inf
+from pathlib import Path
+
+from bpy.props import BoolProperty, StringProperty
+from bpy.types import Operator
+from bpy_extras.io_utils import ExportHelper
+
+from sbstudio.model.safety_check import SafetyCheckParams
+from sbstudio.model.safety_report import (
+    SafetyReport,
+    create_safety_report,
+    create_safety_report_from_trajectories,
+)
+from sbstudio.model.show_cache import ShowCache
+from sbstudio.plugin.props.frame_range import FrameRangeProperty, resolve_frame_range
+from sbstudio.plugin.tasks.light_effects import suspended_light_effects
+from sbstudio.plugin.tasks.safety_check import suspended_safety_checks
+from sbstudio.plugin.utils.sample_cache import get_sample_cache_for_current_file
+from sbstudio.plugin.utils.sampling import sample_objects
+
+from .utils import get_drones_to_export
+
+__all__ = ("CheckSafetyOfShowOperator",)
+
+
+class CheckSafetyOfShowOperator(Operator, ExportHelper):
+    """Checks the minimum distance, the altitude and the velocities of the
+    drones in every frame of a given frame range, without contacting the
+    Skybrush Studio server, and saves a report of the results.
+    """
+
+    bl_idname = "skybrush.check_safety_of_show"
+    bl_label = "Check Whole Show"
+    bl_description = (
+        "Checks the minimum distance, the altitude and the velocities of the "
+        "drones in every frame of a given frame range on the local machine and "
+        "saves a report in JSON or CSV format"
+    )
+
+    # The report is written in CSV format if the user chooses a .csv extension
+    filter_glob = StringProperty(default="*.json;*.csv", options={"HIDDEN"})
+    filename_ext = ".json"
+    check_extension = None
+
+    # check all drones or only selected ones
+    selected_only = BoolProperty(
+        name="Selection only",
+        default=False,
+        description=(
+            "Check only the selected drones. "
+            "Uncheck to check all drones, irrespectively of the selection."
+        ),
+    )
+
+    # frame range source
+    frame_range = FrameRangeProperty(default="RENDER")
+
+    # check the trajectories of the last export instead of sampling the scene
+    use_last_export = BoolProperty(
+        name="Use last export",
+        default=False,
+        description=(
+            "Check the trajectories saved by the last export that used the "
+            "sample cache instead of sampling the scene. Faster, but changes "
+            "made since the last export are not taken into account"
+        ),
+    )
+
+    def execute(self, context):
+        drones = get_drones_to_export(selected_only=self.selected_only)
+        if not drones:
+            self.report({"ERROR"}, "There are no drones to check")
+            return {"CANCELLED"}
+
+        frame_range = resolve_frame_range(self.frame_range)
+        if frame_range is None:
+            self.report({"ERROR"}, "Selected frame range is empty")
+            return {"CANCELLED"}
+
+        safety_check = getattr(context.scene.skybrush, "safety_check", None)
+        params = (
+            get_safety_check_params(safety_check)
+            if safety_check
+            else SafetyCheckParams(max_velocity_z=2)
+        )
+
+        start, end = frame_range
+        frames = range(start, end + 1)
+        if self.use_last_export:
+            try:
+                report = self._check_last_export(drones, frames, params, context)
+            except (OSError, RuntimeError) as ex:
+                self.report({"ERROR"}, str(ex))
+                return {"CANCELLED"}
+        else:
+            with suspended_safety_checks(), suspended_light_effects():
+                samples = sample_objects(
+                    drones, frames, positions=True, by_name=True, context=context
+                )
+
+            report = create_safety_report(
+                samples.positions, samples.times, samples.keys, params, frames=frames
+            )
+
+        # The report is written to the chosen path as-is; anything other than
+        # a .csv file is written in JSON format
+        path = Path(self.filepath)
+        try:
+            if path.suffix.lower() == ".csv":
+                report.write_csv(path)
+            else:
+                report.write_json(path)
+        except OSError as ex:
+            self.report({"ERROR"}, f"Error while writing safety report: {ex}")
+            return {"CANCELLED"}
+
+        violations = report.get_violations()
+        if violations:
+            first = violations[0]
+            num_frames = len({violation.frame for violation in violations})
+            self.report(
+                {"WARNING"},
+                f"Safety violations found in {num_frames} frame(s); the first one "
+                f"is in frame {first.frame}: {first.type.description}",
+            )
+        else:
+            self.report({"INFO"}, "No safety violations found")
+
+        return {"FINISHED"}
+
+    def _check_last_export(
+        self, drones, frames: range, params: SafetyCheckParams, context
+    ) -> SafetyReport:
+        """Checks the trajectories of the given drones in the show cache
+        written by the last export, without sampling the scene.
+
+        Raises:
+            RuntimeError: if there is no show cache for the current file or it
+                does not contain all the given drones
+        """
+        cache = get_sample_cache_for_current_file()
+        if cache is None or not cache.show_path.exists():
+            raise RuntimeError(
+                "There is no saved export of this file; export the show with "
+                "the sample cache enabled first"
+            )
+
+        fps = context.scene.render.fps
+        with ShowCache(cache.show_path) as show:
+            trajectories = {}
+            for drone in drones:
+                trajectory = show.trajectories.get(drone.name)
+                if trajectory is None or not len(trajectory):
+                    raise RuntimeError(
+                        f"Drone {drone.name!r} is missing from the last export"
+                    )
+                trajectories[drone.name] = trajectory
+
+        return create_safety_report_from_trajectories(
+            trajectories, [frame / fps for frame in frames], params, frames=frames
+        )
+
+
+def get_safety_check_params(safety_check) -> SafetyCheckParams:
+    """Returns the limits of the whole-show safety check from the safety check
+    settings of the scene.
+
+    The limits follow the semantics of the safety check that runs after every
+    frame change: an altitude warning threshold of zero disables the altitude
+    check, and the velocity limits are disabled when the velocity warning is
+    turned off. Disabled limits are represented by infinity.
+    """
+    if safety_check.velocity_warning_enabled:
+        max_velocity_xy = safety_check.velocity_xy_warning_threshold
+        max_velocity_z = safety_check.effective_velocity_z_threshold_down
+        max_velocity_z_up = safety_check.effective_velocity_z_threshold_up
+    else:
+        max_velocity_xy = max_velocity_z = max_velocity_z_up = inf
+
+    return SafetyCheckParams(
+        max_velocity_xy=max_velocity_xy,
+        max_velocity_z=max_velocity_z,
+        max_velocity_z_up=max_velocity_z_up,
+        max_altitude=safety_check.altitude_warning_threshold or inf,
+        min_distance=safety_check.proximity_warning_threshold,
+    )
@@ -1,4 +1,4 @@
-from bpy.props import BoolProperty, IntProperty, StringProperty
+from bpy.props import BoolProperty, FloatProperty, IntProperty, StringProperty
 
 from sbstudio.model.file_formats import FileFormat
 
@@ -44,6 +44,19 @@ class SkybrushExportOperator(ExportOperator):
         default=False,
     )
 
+    # error budget of the simplification of yaw angles
+    max_yaw_error = FloatProperty(
+        name="Max yaw error",
+        default=0.0,
+        min=0.0,
+        soft_max=10.0,
+        description=(
+            "Maximum deviation of the exported yaw angles from the sampled "
+            "ones, in degrees. Zero removes only the setpoints that are "
+            "redundant"
+        ),
+    )
+
     def get_format(self) -> FileFormat:
         """Returns the file format that the operator uses. Must be overridden
         in subclasses.
@@ -58,4 +71,5 @@ class SkybrushExportOperator(ExportOperator):
             "output_fps": self.output_fps,
             "light_output_fps": self.light_output_fps,
             "use_yaw_control": self.use_yaw_control,
+            "max_yaw_error": self.max_yaw_error,
         }
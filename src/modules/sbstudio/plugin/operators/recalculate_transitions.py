@@ -11,6 +11,7 @@ from bpy.props import EnumProperty
 from sbstudio.api.errors import SkybrushStudioAPIError
 from sbstudio.api.types import Mapping
 from sbstudio.errors import SkybrushStudioError
+from sbstudio.model.point_cloud import PointCloud
 from sbstudio.plugin.actions import (
     ensure_action_exists_for_object,
 )
@@ -187,16 +188,14 @@ class _LazyFormationObjectList:
         return list(self._formation.objects) if self._formation else []
 
 
-def get_coordinates_of_formation(formation, *, frame: int) -> List[Tuple[float, ...]]:
+def get_coordinates_of_formation(formation, *, frame: int) -> PointCloud:
     """Returns the coordinates of all the markers in the given formation at the
-    given frame as a list of triplets.
+    given frame as a point cloud.
     """
-    return [
-        tuple(pos)
-        for pos in get_world_coordinates_of_markers_from_formation(
-            formation, frame=frame
-        )
-    ]
+    return PointCloud.from_array(
+        get_world_coordinates_of_markers_from_formation(formation, frame=frame),
+        copy=False,
+    )
 
 
 def calculate_mapping_for_transition_into_storyboard_entry(
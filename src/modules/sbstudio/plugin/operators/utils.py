@@ -5,30 +5,38 @@ import logging
 from bpy.path import basename
 from bpy.types import Context
 
+from contextlib import nullcontext
 from natsort import natsorted
 from operator import attrgetter
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from sbstudio.api.base import SkybrushStudioAPI
+from sbstudio.math.kinematics import get_kinematic_peaks
 from sbstudio.model.light_program import LightProgram
 from sbstudio.model.safety_check import SafetyCheckParams
+from sbstudio.model.show_cache import write_show_cache
 from sbstudio.model.trajectory import Trajectory
 from sbstudio.model.yaw import YawSetpointList
 from sbstudio.plugin.constants import Collections
 from sbstudio.plugin.errors import SkybrushStudioExportWarning
 from sbstudio.model.file_formats import FileFormat
 from sbstudio.plugin.props.frame_range import resolve_frame_range
-from sbstudio.plugin.tasks.light_effects import suspended_light_effects
 from sbstudio.plugin.tasks.safety_check import suspended_safety_checks
 from sbstudio.plugin.utils import with_context
+from sbstudio.plugin.utils.export_report import ExportReport
+from sbstudio.plugin.utils.parallel_sampling import sample_objects_in_parallel
+from sbstudio.plugin.utils.parallel_simplification import (
+    simplify_samples_in_parallel,
+)
+from sbstudio.plugin.utils.sample_cache import (
+    get_sample_cache_for_current_file,
+    sample_objects_with_cache,
+)
 from sbstudio.plugin.utils.sampling import (
     frame_range,
-    sample_colors_of_objects,
-    sample_positions_of_objects,
-    sample_positions_and_colors_of_objects,
-    sample_positions_and_yaw_of_objects,
-    sample_positions_colors_and_yaw_of_objects,
+    sample_objects_in_single_pass,
+    SamplingRequest,
 )
 from sbstudio.plugin.utils.time_markers import get_time_markers_from_context
 
@@ -39,6 +47,16 @@ __all__ = ("get_drones_to_export", "export_show_to_file_using_api")
 log = logging.getLogger(__name__)
 
 
+_VELOCITY_DESCRIPTIONS = {
+    "velocity_xy": "Horizontal velocity",
+    "velocity_z_up": "Upward velocity",
+    "velocity_z_down": "Downward velocity",
+}
+"""Human-readable descriptions of the velocity peaks checked before the
+export, indexed by the names of the peaks.
+"""
+
+
 ################################################################################
 # Helper functions for exporter operators
 
@@ -89,6 +107,7 @@ def _get_trajectories_and_lights(
     settings: Dict,
     bounds: Tuple[int, int],
     *,
+    report: Optional[ExportReport] = None,
     context: Optional[Context] = None,
 ) -> Tuple[Dict[str, Trajectory], Dict[str, LightProgram]]:
     """Get trajectories and LED lights of all selected/picked objects.
@@ -98,57 +117,19 @@ def _get_trajectories_and_lights(
         drones: the list of drones to export
         settings: export settings
         bounds: the frame range used for exporting
+        report: optional report to record the timings and sample counts in
 
     Returns:
         dictionary of Trajectory and LightProgram objects indexed by object names
     """
-    trajectory_fps = settings.get("output_fps", 4)
-    light_fps = settings.get("light_output_fps", 4)
-
-    trajectories: Dict[str, Trajectory]
-    lights: Dict[str, LightProgram]
-
-    if trajectory_fps == light_fps:
-        # This is easy, we can iterate over the show once
-        with suspended_safety_checks():
-            result = sample_positions_and_colors_of_objects(
-                drones,
-                frame_range(bounds[0], bounds[1], fps=trajectory_fps, context=context),
-                context=context,
-                by_name=True,
-                simplify=True,
-            )
-
-        trajectories = {}
-        lights = {}
-
-        for key, (trajectory, light_program) in result.items():
-            trajectories[key] = trajectory
-            lights[key] = light_program.simplify()
-
-    else:
-        # We need to iterate over the show twice, once for the trajectories,
-        # once for the lights
-        with suspended_safety_checks():
-            with suspended_light_effects():
-                trajectories = sample_positions_of_objects(
-                    drones,
-                    frame_range(
-                        bounds[0], bounds[1], fps=trajectory_fps, context=context
-                    ),
-                    context=context,
-                    by_name=True,
-                    simplify=True,
-                )
-
-            lights = sample_colors_of_objects(
-                drones,
-                frame_range(bounds[0], bounds[1], fps=light_fps, context=context),
-                context=context,
-                by_name=True,
-                simplify=True,
-            )
-
+    trajectories, lights, _ = _sample_trajectories_lights_and_yaw_setpoints(
+        drones,
+        settings,
+        bounds,
+        use_yaw_control=False,
+        report=report,
+        context=context,
+    )
     return trajectories, lights
 
 
@@ -158,6 +139,7 @@ def _get_trajectories_lights_and_yaw_setpoints(
     settings: Dict,
     bounds: Tuple[int, int],
     *,
+    report: Optional[ExportReport] = None,
     context: Optional[Context] = None,
 ) -> Tuple[Dict[str, Trajectory], Dict[str, LightProgram], Dict[str, YawSetpointList]]:
     """Get trajectories, LED lights and yaw setpoints of all selected/picked objects.
@@ -167,68 +149,162 @@ def _get_trajectories_lights_and_yaw_setpoints(
         drones: the list of drones to export
         settings: export settings
         bounds: the frame range used for exporting
+        report: optional report to record the timings and sample counts in
 
     Returns:
         dictionary of Trajectory, LightProgram and YawSetpointList objects indexed by object names
     """
+    trajectories, lights, yaw_setpoints = _sample_trajectories_lights_and_yaw_setpoints(
+        drones,
+        settings,
+        bounds,
+        use_yaw_control=True,
+        report=report,
+        context=context,
+    )
+    assert yaw_setpoints is not None
+    return trajectories, lights, yaw_setpoints
+
+
+@with_context
+def _sample_trajectories_lights_and_yaw_setpoints(
+    drones,
+    settings: Dict,
+    bounds: Tuple[int, int],
+    *,
+    use_yaw_control: bool,
+    report: Optional[ExportReport] = None,
+    context: Optional[Context] = None,
+) -> Tuple[
+    Dict[str, Trajectory],
+    Dict[str, LightProgram],
+    Optional[Dict[str, YawSetpointList]],
+]:
+    """Samples the trajectories, LED lights and optionally the yaw setpoints of
+    the given drones in a single pass over the timeline, even if the trajectory
+    and light frame rates are different. The timeline is sampled in multiple
+    headless Blender processes if the `num_workers` export setting is larger
+    than 1. Channels whose inputs did not change since the last export are
+    taken from the sample cache of the current file if the `use_sample_cache`
+    export setting is enabled.
+
+    Parameters:
+        context: the main Blender context
+        drones: the list of drones to export
+        settings: export settings
+        bounds: the frame range used for exporting
+        use_yaw_control: whether to sample yaw setpoints
+        report: optional report to record the timings and sample counts in
+
+    Returns:
+        dictionary of Trajectory, LightProgram and YawSetpointList objects
+        indexed by object names; the latter is `None` if yaw control is not
+        used
+    """
     trajectory_fps = settings.get("output_fps", 4)
     light_fps = settings.get("light_output_fps", 4)
 
-    trajectories: Dict[str, Trajectory]
-    lights: Dict[str, LightProgram]
-    yaw_setpoints: Dict[str, YawSetpointList]
-
+    trajectory_frames = frame_range(
+        bounds[0], bounds[1], fps=trajectory_fps, context=context
+    )
     if trajectory_fps == light_fps:
-        # This is easy, we can iterate over the show once
-        with suspended_safety_checks():
-            result = sample_positions_colors_and_yaw_of_objects(
-                drones,
-                frame_range(bounds[0], bounds[1], fps=trajectory_fps, context=context),
-                context=context,
+        requests = [
+            SamplingRequest(
+                trajectory_frames, positions=True, colors=True, yaw=use_yaw_control
+            )
+        ]
+    else:
+        # Frames that feed the trajectories only are evaluated with light
+        # effects suspended
+        requests = [
+            SamplingRequest(trajectory_frames, positions=True, yaw=use_yaw_control),
+            SamplingRequest(
+                frame_range(bounds[0], bounds[1], fps=light_fps, context=context),
+                colors=True,
+            ),
+        ]
+
+    num_workers = settings.get("num_workers", 1)
+
+    def sampler(objects, requests):
+        if num_workers > 1:
+            return sample_objects_in_parallel(
+                objects,
+                requests,
+                num_workers=num_workers,
                 by_name=True,
-                simplify=True,
+                context=context,
+            )
+        else:
+            return sample_objects_in_single_pass(
+                objects, requests, by_name=True, context=context
             )
 
-        trajectories = {}
-        lights = {}
-        yaw_setpoints = {}
-
-        for key, (trajectory, light_program, yaw_curve) in result.items():
-            trajectories[key] = trajectory
-            # TODO(ntamas): why are we simplifying here once again?
-            lights[key] = light_program.simplify()
-            yaw_setpoints[key] = yaw_curve
+    cache = (
+        get_sample_cache_for_current_file()
+        if settings.get("use_sample_cache", False)
+        else None
+    )
 
-    else:
-        # We need to iterate over the show twice, once for the trajectories
-        # and yaw setpoints, once for the lights
+    with report.phase("sampling") if report else nullcontext():
         with suspended_safety_checks():
-            with suspended_light_effects():
-                result = sample_positions_and_yaw_of_objects(
+            if cache is not None:
+                samples = sample_objects_with_cache(
                     drones,
-                    frame_range(
-                        bounds[0], bounds[1], fps=trajectory_fps, context=context
-                    ),
-                    context=context,
+                    requests,
+                    cache=cache,
+                    sampler=sampler,
                     by_name=True,
-                    simplify=True,
+                    context=context,
                 )
+            else:
+                samples = sampler(drones, requests)
 
-                trajectories = {}
-                yaw_setpoints = {}
+    if report:
+        report.set_kinematic_peaks(
+            get_kinematic_peaks(samples[0].positions, samples[0].times),
+            samples[0].keys,
+        )
 
-                for key, (trajectory, yaw_curve) in result.items():
-                    trajectories[key] = trajectory
-                    yaw_setpoints[key] = yaw_curve
+    error_budget = {
+        "max_position_error": settings.get("max_position_error", 0.0),
+        "max_color_error": settings.get("max_color_error", 4),
+        "max_yaw_error": settings.get("max_yaw_error", 0.0),
+    }
 
-            lights = sample_colors_of_objects(
-                drones,
-                frame_range(bounds[0], bounds[1], fps=light_fps, context=context),
-                context=context,
-                by_name=True,
-                simplify=True,
+    with report.phase("simplification") if report else nullcontext():
+        trajectories, lights, yaw_setpoints = simplify_samples_in_parallel(
+            samples[0], samples[-1], yaw=use_yaw_control, **error_budget
+        )
+
+    channels = [
+        ("trajectory", samples[0], trajectories, attrgetter("points")),
+        ("lights", samples[-1], lights, attrgetter("colors")),
+    ]
+    if yaw_setpoints is not None:
+        channels.append(("yaw", samples[0], yaw_setpoints, attrgetter("setpoints")))
+
+    for channel, channel_samples, items, get_keypoints in channels:
+        num_samples = channel_samples.num_frames
+        num_keypoints = 0
+        for key, item in items.items():
+            count = len(get_keypoints(item))
+            num_keypoints += count
+            if report:
+                report.set_keypoint_reduction(key, channel, num_samples, count)
+
+        total = num_samples * len(items)
+        if total:
+            log.info(
+                f"Simplified {channel} channel from {total} samples to "
+                f"{num_keypoints} keypoints ({100 * num_keypoints / total:.1f}%)"
             )
 
+    if report:
+        report.set_count("drones", len(drones))
+        for name, value in error_budget.items():
+            report.set_setting(name, value)
+
     return trajectories, lights, yaw_setpoints
 
 
@@ -238,7 +314,7 @@ def export_show_to_file_using_api(
     settings: Dict,
     filepath: Path,
     format: FileFormat,
-) -> None:
+) -> List[str]:
     """Creates Skybrush-compatible output from Blender trajectories and color
     animation.
 
@@ -251,6 +327,11 @@ def export_show_to_file_using_api(
         filepath: the output path where the export should write
         format: the format that the API should produce
 
+    Returns:
+        the warnings of the local checks that were run before sending the
+        show to the server, e.g., the velocity limits that the sampled
+        trajectories exceed. These do not stop the export.
+
     Raises:
         SkybrushStudioExportWarning: when a local check failed and the export
             operation did not start. These are converted into warnings on the
@@ -258,7 +339,34 @@ def export_show_to_file_using_api(
         SkybrushStudioAPIError: for server-side export errors. These are
             converted into errors on the Blender UI.
     """
+    # sampling, simplification, request, plus storing the show cache if needed
+    num_phases = 4 if settings.get("use_sample_cache", False) else 3
+    with ExportReport(context, num_phases=num_phases) as report:
+        _export_show_to_file_using_api(
+            api, context, settings, filepath, format, report=report
+        )
+
+    if settings.get("write_report", False):
+        report_path = Path(filepath).with_name(Path(filepath).name + ".report.json")
+        report.save(report_path)
+        log.info(f"Export report written to {report_path}")
 
+    return report.warnings
+
+
+def _export_show_to_file_using_api(
+    api: SkybrushStudioAPI,
+    context: Context,
+    settings: Dict,
+    filepath: Path,
+    format: FileFormat,
+    *,
+    report: ExportReport,
+) -> None:
+    """Implementation of `export_show_to_file_using_api()` that records the
+    timings, sample counts and transfer statistics of the export in the given
+    report.
+    """
     log.info(f"Exporting show content to {filepath}")
 
     # get framerange
@@ -291,14 +399,16 @@ def export_show_to_file_using_api(
             lights,
             yaw_setpoints,
         ) = _get_trajectories_lights_and_yaw_setpoints(
-            drones, settings, frame_range, context=context
+            drones, settings, frame_range, report=report, context=context
         )
     else:
         log.info("Getting object trajectories and light programs")
         (
             trajectories,
             lights,
-        ) = _get_trajectories_and_lights(drones, settings, frame_range, context=context)
+        ) = _get_trajectories_and_lights(
+            drones, settings, frame_range, report=report, context=context
+        )
         yaw_setpoints = None
 
     # get automatic show title
@@ -311,6 +421,19 @@ def export_show_to_file_using_api(
     # get time markers (cues)
     time_markers = get_time_markers_from_context(context)
 
+    # store the show next to the sample cache so it can be validated or
+    # exported again later without going through the timeline
+    cache = (
+        get_sample_cache_for_current_file()
+        if settings.get("use_sample_cache", False)
+        else None
+    )
+    if cache is not None:
+        with report.phase("show cache"):
+            write_show_cache(
+                cache.show_path, trajectories, lights, yaw_setpoints, time_markers
+            )
+
     # get validation parameters
     safety_check = getattr(context.scene.skybrush, "safety_check", None)
     validation = SafetyCheckParams(
@@ -327,6 +450,20 @@ def export_show_to_file_using_api(
         min_distance=safety_check.proximity_warning_threshold if safety_check else 3,
     )
 
+    # check the velocity limits locally before sending the show to the server
+    velocity_warning_enabled = (
+        safety_check.velocity_warning_enabled if safety_check else True
+    )
+    if velocity_warning_enabled and report.kinematic_peaks is not None:
+        names = list(trajectories.keys())
+        violations = validation.get_velocity_limit_violations(report.kinematic_peaks)
+        for name, peak in violations.items():
+            report.add_warning(
+                f"{_VELOCITY_DESCRIPTIONS[name]} of {names[peak.drone]} "
+                f"reaches {peak.value:.2f} m/s at {peak.time:.2f}s, which "
+                f"exceeds the safety limit"
+            )
+
     renderer_params = {}
     if "min_nav_altitude" in settings:
         renderer_params = {"min_nav_altitude": settings["min_nav_altitude"]}
@@ -336,14 +473,16 @@ def export_show_to_file_using_api(
         log.info("Exporting validation plots to .pdf")
         plots = settings.get("plots", ["pos", "vel", "nn"])
         fps = settings.get("output_fps", 4)
-        api.generate_plots(
-            trajectories=trajectories,
-            output=filepath,
-            validation=validation,
-            plots=plots,
-            fps=fps,
-            time_markers=time_markers,
-        )
+        with report.phase("request"):
+            api.generate_plots(
+                trajectories=trajectories,
+                output=filepath,
+                validation=validation,
+                plots=plots,
+                fps=fps,
+                time_markers=time_markers,
+                stats=report.transfer,
+            )
     else:
         if format is FileFormat.SKYC:
             log.info("Exporting show to .skyc")
@@ -385,17 +524,19 @@ def export_show_to_file_using_api(
         else:
             raise RuntimeError(f"Unhandled format: {format!r}")
 
-        api.export(
-            show_title=show_title,
-            show_type=show_type,
-            validation=validation,
-            trajectories=trajectories,
-            lights=lights,
-            yaw_setpoints=yaw_setpoints,
-            output=filepath,
-            time_markers=time_markers,
-            renderer=renderer,
-            renderer_params=renderer_params,
-        )
+        with report.phase("request"):
+            api.export(
+                show_title=show_title,
+                show_type=show_type,
+                validation=validation,
+                trajectories=trajectories,
+                lights=lights,
+                yaw_setpoints=yaw_setpoints,
+                output=filepath,
+                time_markers=time_markers,
+                renderer=renderer,
+                renderer_params=renderer_params,
+                stats=report.transfer,
+            )
 
-    log.info("Export finished")
+    log.info(f"Export finished in {report.total_duration:.3f}s")
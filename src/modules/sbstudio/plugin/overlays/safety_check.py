@@ -33,8 +33,8 @@ def set_warning_color_iff(condition: bool, font_id: int) -> None:
 
 
 class SafetyCheckOverlay(ShaderOverlay):
-    """Overlay that marks the closest pair of drones and all drones above the
-    altitude threshold in the 3D view.
+    """Overlay that marks the pairs of drones that are too close to each other
+    and all drones above the altitude threshold in the 3D view.
     """
 
     _markers: Optional[MarkerList] = None
@@ -120,7 +120,14 @@ class SafetyCheckOverlay(ShaderOverlay):
         ):
             set_warning_color_iff(safety_check.should_show_proximity_warning, font_id)
             blf.position(font_id, left_margin, y, 0)
-            blf.draw(font_id, f"Min distance: {safety_check.min_distance:.1f} m")
+            num_pairs, truncated = safety_check.num_pairs_too_close
+            if safety_check.should_show_proximity_warning and num_pairs > 1:
+                suffix = f" ({num_pairs}{'+' if truncated else ''} pairs too close)"
+            else:
+                suffix = ""
+            blf.draw(
+                font_id, f"Min distance: {safety_check.min_distance:.1f} m{suffix}"
+            )
             y -= line_height
 
         if safety_check.altitude_warning_enabled and safety_check.max_altitude_is_valid:
@@ -1,6 +1,9 @@
 from bpy.types import Panel
 
-from sbstudio.plugin.operators import ValidateTrajectoriesOperator
+from sbstudio.plugin.operators import (
+    CheckSafetyOfShowOperator,
+    ValidateTrajectoriesOperator,
+)
 
 __all__ = ("SafetyCheckPanel",)
 
@@ -83,4 +86,5 @@ class SafetyCheckPanel(Panel):
 
         layout.separator()
 
+        layout.operator(CheckSafetyOfShowOperator.bl_idname)
         layout.operator(ValidateTrajectoriesOperator.bl_idname)
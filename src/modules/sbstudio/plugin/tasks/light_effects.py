@@ -7,12 +7,14 @@ from contextlib import contextmanager
 from typing import Iterator, Optional
 
 from .base import Task
+from .scheduler import scheduled
 
+from sbstudio.model.types import RGBAColor
 from sbstudio.plugin.constants import Collections
 from sbstudio.plugin.materials import get_led_light_color, set_led_light_color
 from sbstudio.plugin.utils.evaluator import get_position_of_object
 
-__all__ = ("UpdateLightEffectsTask",)
+__all__ = ("UpdateLightEffectsTask", "get_base_color_of_drone")
 
 
 #: Cache for the "base" color of every drone in the current frame before we
@@ -36,6 +38,7 @@ drone.
 """
 
 
+@scheduled("Light effects")
 def update_light_effects(scene, depsgraph):
     global _last_frame, _base_color_cache, _suspension_counter, WHITE
 
@@ -110,6 +113,18 @@ def update_light_effects(scene, depsgraph):
             set_led_light_color(drone, color)
 
 
+def get_base_color_of_drone(drone) -> RGBAColor:
+    """Returns the color of the LED light of the given drone before the light
+    effects were applied on it.
+
+    The base color is taken from the base color cache if the light effects
+    have already overwritten the color of the drone, and from the LED light
+    itself otherwise.
+    """
+    color = _base_color_cache.get(id(drone))
+    return color if color is not None else get_led_light_color(drone)
+
+
 @contextmanager
 def suspended_light_effects() -> Iterator[None]:
     """Context manager that suspends the calculation of light effects when the
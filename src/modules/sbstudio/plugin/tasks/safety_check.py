@@ -6,26 +6,27 @@ frame.
 import bpy
 
 from contextlib import contextmanager
-from math import hypot
-from typing import Iterator
+from math import hypot, inf
+from numpy import array, float64
+from typing import Iterator, List, Optional, Sequence, Tuple
 
-from sbstudio.math.nearest_neighbors import find_nearest_neighbors
+from sbstudio.math.spatial_hash import ProximityTracker, find_closest_pair
+from sbstudio.model.types import Coordinate3D
 from sbstudio.plugin.utils.evaluator import get_position_of_object
 from sbstudio.plugin.constants import Collections
 from sbstudio.utils import LRUCache
 
-# from sbstudio.plugin.utils import debounced
-
 from .base import Task
-
-
-# TODO(ntamas): make the nearest-neighbor calculation debounced when we have
-# lots of drones, but currently we are good with, say 100 drones
+from .scheduler import scheduled
 
 #: Cache that stores the positions in the last few frames visited by the user
 #: in the hope that we can estimate the velocities from it in the current frame
 _position_snapshot_cache = LRUCache(5)
 
+#: Proximity tracker that keeps the spatial index of the drones between frames
+#: so consecutive frames during playback do not need to rebuild it
+_proximity_tracker: Optional[ProximityTracker] = None
+
 #: Suspension counter. Safety checks are suspended if this counter is positive
 _suspension_counter = 0
 
@@ -33,6 +34,10 @@ _suspension_counter = 0
 #: available
 _ZERO = (0.0, 0.0, 0.0)
 
+#: Maximum number of drone pairs closer than the proximity warning threshold
+#: that are reported to the overlay in a single frame
+MAX_PAIRS_TOO_CLOSE = 100
+
 
 def create_position_snapshot_for_drones_in_collection(collection, *, frame):
     """Create a dictionary mapping the names of the drones in the given
@@ -41,6 +46,67 @@ def create_position_snapshot_for_drones_in_collection(collection, *, frame):
     return {drone.name: get_position_of_object(drone) for drone in collection.objects}
 
 
+def find_pairs_of_drones_too_close(
+    positions: Sequence[Coordinate3D], *, threshold: float
+) -> Tuple[
+    Tuple[Coordinate3D, Coordinate3D, float],
+    List[Tuple[Coordinate3D, Coordinate3D]],
+    bool,
+]:
+    """Finds the closest pair of drones and all the pairs of drones that are
+    closer to each other than the given threshold.
+
+    At most `MAX_PAIRS_TOO_CLOSE` pairs are returned; when there are more
+    pairs than that, the closest ones are kept. The pairs are found with a
+    proximity tracker that is kept between calls, so only the drones that
+    moved to another cell of its grid since the last call are re-bucketed.
+
+    Returns:
+        the positions of the closest pair of drones and their distance (with
+        `None` positions and infinite distance if there are less than two
+        drones), the positions of the pairs of drones that are too close to
+        each other, closest pair first, and whether the list of pairs was
+        truncated
+    """
+    if len(positions) < 2:
+        return (None, None, inf), [], False
+
+    points = array(positions, dtype=float64)
+    if threshold > 0:
+        tracker = _get_proximity_tracker(threshold)
+        tracker.update(points)
+        pairs, distances = tracker.find_pairs(max_pairs=MAX_PAIRS_TOO_CLOSE + 1)
+        truncated = len(pairs) > MAX_PAIRS_TOO_CLOSE
+        pairs = pairs[:MAX_PAIRS_TOO_CLOSE].tolist()
+    else:
+        pairs, truncated = [], False
+
+    if pairs:
+        first, second = pairs[0]
+        distance = float(distances[0])
+    else:
+        # No pairs closer than the threshold; look further
+        first, second, distance = find_closest_pair(points, max(2 * threshold, 1.0))
+
+    return (
+        (positions[first], positions[second], distance),
+        [(positions[first], positions[second]) for first, second in pairs],
+        truncated,
+    )
+
+
+def _get_proximity_tracker(threshold: float) -> ProximityTracker:
+    """Returns the proximity tracker of the safety check for the given
+    proximity threshold, creating a new one if the threshold has changed.
+    """
+    global _proximity_tracker
+
+    if _proximity_tracker is None or _proximity_tracker.distance != threshold:
+        _proximity_tracker = ProximityTracker(threshold)
+
+    return _proximity_tracker
+
+
 def estimate_velocities_of_drones_at_frame(snapshot, *, frame, scene):
     """Attempts to estimate the velocities of the drones in the given frame,
     using the given snapshot for the frame and the current data in the
@@ -93,7 +159,7 @@ def estimate_velocities_of_drones_at_frame(snapshot, *, frame, scene):
     return {drone_name: _ZERO for drone_name in snapshot}
 
 
-# @debounced(delay=0.1)
+@scheduled("Safety check")
 def run_safety_check(scene, depsgraph):
     global _suspension_counter
     if _suspension_counter > 0:
@@ -145,8 +211,12 @@ def run_safety_check(scene, depsgraph):
         min(position[2] for position in positions) if positions else 0.0
     )
 
-    # Check nearest neighbors
-    nearest_neighbors = find_nearest_neighbors(positions)
+    # Check nearest neighbors and all the pairs that are too close
+    nearest_neighbors, pairs_too_close, pairs_too_close_truncated = (
+        find_pairs_of_drones_too_close(
+            positions, threshold=safety_check.proximity_warning_threshold
+        )
+    )
 
     # Check velocities
     max_velocity_xy_found = None
@@ -181,6 +251,8 @@ def run_safety_check(scene, depsgraph):
     safety_check.set_safety_check_result(
         formation_status=formation_status,
         nearest_neighbors=nearest_neighbors,
+        pairs_too_close=pairs_too_close,
+        pairs_too_close_truncated=pairs_too_close_truncated,
         min_altitude=min_altitude_found,
         max_altitude=max_altitude_found,
         drones_over_max_altitude=drones_over_max_altitude,
@@ -204,8 +276,9 @@ def invalidate_caches(clear_result: bool = False):
     This function should be called when the plugin makes radical changes to the
     current scene; for instance, after re-planning transitions.
     """
-    global _position_snapshot_cache
+    global _position_snapshot_cache, _proximity_tracker
     _position_snapshot_cache.clear()
+    _proximity_tracker = None
 
     if clear_result:
         safety_check = bpy.context.scene.skybrush.safety_check
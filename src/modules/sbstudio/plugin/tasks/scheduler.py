@@ -0,0 +1,254 @@
+"""Scheduler that keeps the handlers of background tasks that are invoked after
+every frame change within a per-frame time budget during animation playback.
+
+The scheduler measures the time taken by each scheduled handler. While the
+animation is playing, a handler is executed only if its estimated cost fits
+into the part of the frame budget that the other handlers have not used up in
+the current frame yet; otherwise it is skipped and deferred until playback
+stops. A handler that was skipped for `_MAX_SKIPPED_FRAMES` frames in a row
+or that has not been executed for `_MAX_SKIPPED_INTERVAL` seconds is executed
+regardless of the budget, so it is never starved completely and its cost is
+measured again. The new measurement replaces the estimated cost of the
+handler instead of being averaged into it, so a handler whose cost was
+overestimated (e.g., after a one-off slow frame) gets back into the budget
+immediately. When the animation is not
+playing (e.g., the user scrubs the timeline or jumps to a frame), handlers are
+always executed immediately.
+
+Blender invokes the handlers in the order they were registered, and the
+scheduler admits them into the budget in the same order, so handlers that are
+registered earlier have priority. The add-on registers the light effects
+before the safety check because the colors of the drones are what the user
+watches during playback, while the safety check is re-run for the final
+frame anyway once playback stops.
+"""
+
+import bpy
+
+from dataclasses import dataclass
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+__all__ = ("DEFAULT_FRAME_BUDGET", "HandlerStats", "get_handler_stats", "scheduled")
+
+
+DEFAULT_FRAME_BUDGET = 10.0
+"""Default time budget of the scheduled handlers in a single frame during
+playback, in milliseconds, used when the add-on preferences are not available.
+"""
+
+_SMOOTHING = 0.2
+"""Weight of the most recent measurement in the moving average of the cost of
+a handler.
+"""
+
+_MAX_SKIPPED_FRAMES = 10
+"""Number of consecutive frames in which a handler may be skipped during
+playback; the handler is executed in the next frame regardless of the budget.
+"""
+
+_MAX_SKIPPED_INTERVAL = 0.5
+"""Time after which a handler that was not executed during playback is
+executed in the next frame regardless of the budget, in seconds.
+"""
+
+_POLL_INTERVAL = 0.25
+"""Interval between checks whether playback has stopped when there are
+deferred handlers, in seconds.
+"""
+
+
+@dataclass
+class HandlerStats:
+    """Measured cost of a scheduled handler."""
+
+    name: str
+    """Human-readable name of the handler."""
+
+    last_duration: float = 0.0
+    """Duration of the last execution of the handler, in milliseconds."""
+
+    average_duration: float = 0.0
+    """Exponential moving average of the duration of the handler, in
+    milliseconds. This is the estimated cost of the handler.
+    """
+
+    num_calls: int = 0
+    """Number of times the handler was executed."""
+
+    num_skipped: int = 0
+    """Number of times the handler was skipped during playback because it did
+    not fit into the frame budget.
+    """
+
+    num_skipped_in_a_row: int = 0
+    """Number of frames in which the handler was skipped since its last
+    execution.
+    """
+
+    last_called_at: float = 0.0
+    """Time when the handler was last executed, according to
+    `time.perf_counter()`.
+    """
+
+    def record(self, duration: float, *, reset: bool = False) -> None:
+        """Records a new execution of the handler.
+
+        Parameters:
+            duration: the duration of the execution, in milliseconds
+            reset: whether to replace the moving average with the duration
+                instead of updating it
+        """
+        if self.num_calls and not reset:
+            self.average_duration += _SMOOTHING * (duration - self.average_duration)
+        else:
+            self.average_duration = duration
+        self.last_duration = duration
+        self.num_calls += 1
+        self.num_skipped_in_a_row = 0
+
+    @property
+    def is_starving(self) -> bool:
+        """Returns whether the handler has been skipped for so long during
+        playback that it should be executed regardless of the budget.
+        """
+        return (
+            self.num_skipped_in_a_row >= _MAX_SKIPPED_FRAMES
+            or perf_counter() - self.last_called_at >= _MAX_SKIPPED_INTERVAL
+        )
+
+
+#: Measured costs of the scheduled handlers, keyed by their names
+_stats: Dict[str, HandlerStats] = {}
+
+#: Handlers that were skipped during playback and that should be executed when
+#: playback stops, keyed by their names
+_deferred: Dict[str, Callable] = {}
+
+#: The frame in which the handlers used up `_spent` milliseconds of the budget
+_budget_frame: Optional[int] = None
+
+#: Time spent by the scheduled handlers in `_budget_frame`, in milliseconds
+_spent: float = 0.0
+
+
+def get_handler_stats() -> List[HandlerStats]:
+    """Returns the measured costs of the scheduled handlers, in the order they
+    were declared.
+    """
+    return list(_stats.values())
+
+
+def scheduled(name: str):
+    """Decorator factory that creates a decorator that makes a frame change
+    handler subject to the per-frame time budget of the scheduler during
+    playback.
+
+    The decorated function must accept the scene and the dependency graph as
+    its two positional arguments, just like Blender handlers. The original,
+    unscheduled function is available in the `now` attribute of the result.
+
+    Parameters:
+        name: human-readable name of the handler, used as the key of its
+            measured cost in `get_handler_stats()`
+    """
+
+    def decorator(func):
+        stats = _stats[name] = HandlerStats(name=name)
+
+        @wraps(func)
+        def scheduled(scene, depsgraph=None):
+            global _budget_frame, _spent
+
+            if _is_animation_playing():
+                frame = scene.frame_current
+                if frame != _budget_frame:
+                    _budget_frame, _spent = frame, 0.0
+
+                budget = _get_frame_budget()
+                over_budget = budget > 0 and _spent + stats.average_duration > budget
+                if over_budget and not stats.is_starving:
+                    stats.num_skipped += 1
+                    stats.num_skipped_in_a_row += 1
+                    _defer(name, func)
+                    return
+
+                _deferred.pop(name, None)
+                _spent += _run(func, stats, scene, depsgraph, reset=over_budget)
+            else:
+                _deferred.pop(name, None)
+                _run(func, stats, scene, depsgraph)
+
+        scheduled.now = func
+
+        return scheduled
+
+    return decorator
+
+
+def _defer(name: str, func: Callable) -> None:
+    """Defers the execution of the given handler until playback stops."""
+    _deferred[name] = func
+    if not bpy.app.timers.is_registered(_run_deferred_handlers):
+        bpy.app.timers.register(_run_deferred_handlers, first_interval=_POLL_INTERVAL)
+
+
+def _get_frame_budget() -> float:
+    """Returns the per-frame time budget of the scheduled handlers during
+    playback from the add-on preferences, in milliseconds.
+    """
+    from sbstudio.plugin.model.global_settings import get_preferences
+
+    try:
+        return float(get_preferences().playback_frame_budget)
+    except (AttributeError, KeyError):
+        # Add-on preferences are not available if the add-on was not installed
+        # in the Blender add-on manager
+        return DEFAULT_FRAME_BUDGET
+
+
+def _is_animation_playing() -> bool:
+    """Returns whether the animation is being played back in Blender."""
+    screen = bpy.context.screen
+    return bool(screen and screen.is_animation_playing)
+
+
+def _run(
+    func: Callable, stats: HandlerStats, scene, depsgraph, *, reset: bool = False
+) -> float:
+    """Executes the given handler and records its duration.
+
+    Parameters:
+        reset: whether the duration should replace the estimated cost of the
+            handler instead of being averaged into it
+
+    Returns:
+        the duration of the handler, in milliseconds
+    """
+    started_at = perf_counter()
+    try:
+        func(scene, depsgraph)
+    finally:
+        duration = (perf_counter() - started_at) * 1000
+        stats.record(duration, reset=reset)
+        stats.last_called_at = started_at
+    return duration
+
+
+def _run_deferred_handlers() -> Optional[float]:
+    """Timer function that executes the deferred handlers once playback has
+    stopped.
+    """
+    if _is_animation_playing():
+        return _POLL_INTERVAL
+
+    if _deferred:
+        context = bpy.context
+        scene = context.scene
+        depsgraph = context.evaluated_depsgraph_get()
+        for name, func in list(_deferred.items()):
+            del _deferred[name]
+            _run(func, _stats[name], scene, depsgraph)
+
+    return None
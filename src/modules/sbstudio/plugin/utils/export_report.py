@@ -0,0 +1,300 @@
+"""Timing and progress reporting for the phases of an export operation."""
+
+import json
+import logging
+
+from bpy.types import Context
+from contextlib import contextmanager
+from dataclasses import fields
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sbstudio.api.types import TransferStats
+from sbstudio.math.kinematics import KinematicPeaks
+
+__all__ = ("ExportReport",)
+
+
+log = logging.getLogger(__name__)
+
+
+class ExportReport:
+    """Collects the wall-clock time spent in the individual phases of an
+    export operation, the number of samples and keypoints produced along the
+    way, and the sizes and timings of the request sent to the Skybrush Studio
+    server.
+
+    Progress is shown in the Blender UI while the export is running: the
+    index of the current phase is reported with the progress indicator of the
+    window manager and the name of the phase (and the upload rate during the
+    upload) is shown in the status bar. The collected data can be written to
+    a JSON file when the export has finished.
+
+    The report must be used as a context manager; the progress indicator is
+    shown when the context is entered and hidden when the context is exited.
+    """
+
+    _context: Context
+    """The Blender context that the report uses to show progress."""
+
+    _num_phases: int
+    """Expected number of phases, used to scale the progress indicator."""
+
+    _phases: List[Dict[str, Any]]
+    """Names and durations of the phases that were completed so far."""
+
+    _counts: Dict[str, int]
+    """Named counters, e.g., the number of drones."""
+
+    _keypoints: Dict[str, Dict[str, Dict[str, Any]]]
+    """Number of samples and keypoints after simplification, indexed by drone
+    names and then by channel names.
+    """
+
+    _settings: Dict[str, Any]
+    """Export settings that are worth recording in the report."""
+
+    _peaks: Dict[str, Dict[str, Any]]
+    """Peak velocities, accelerations and jerks of the sampled trajectories,
+    indexed by the names of the kinematic quantities.
+    """
+
+    _warnings: List[str]
+    """Warnings of the local checks that were run during the export."""
+
+    kinematic_peaks: Optional[KinematicPeaks]
+    """Peak values of the kinematic quantities of the sampled trajectories;
+    `None` if they were not calculated.
+    """
+
+    _started_at: Optional[float]
+    """Time when the export started, according to `time.perf_counter()`."""
+
+    _started_at_utc: Optional[datetime]
+    """Time when the export started, in UTC."""
+
+    _finished_at: Optional[float]
+    """Time when the export finished, according to `time.perf_counter()`."""
+
+    transfer: TransferStats
+    """Statistics of the request sent to the server."""
+
+    def __init__(self, context: Context, *, num_phases: int = 1):
+        """Constructor.
+
+        Parameters:
+            context: the Blender context to use for reporting progress
+            num_phases: the expected number of phases of the export
+        """
+        self._context = context
+        self._num_phases = max(1, num_phases)
+        self._phases = []
+        self._counts = {}
+        self._keypoints = {}
+        self._settings = {}
+        self._peaks = {}
+        self._warnings = []
+        self._started_at = None
+        self._started_at_utc = None
+        self._finished_at = None
+
+        self.kinematic_peaks = None
+        self.transfer = TransferStats(on_progress=self._on_transfer_progress)
+
+    def __enter__(self):
+        self._started_at = perf_counter()
+        self._started_at_utc = datetime.now(timezone.utc)
+        self._context.window_manager.progress_begin(0, self._num_phases)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._finished_at = perf_counter()
+        self._context.window_manager.progress_end()
+        self._set_status_text(None)
+
+    @property
+    def total_duration(self) -> float:
+        """Total wall-clock time of the export so far [s]."""
+        if self._started_at is None:
+            return 0.0
+        end = self._finished_at if self._finished_at is not None else perf_counter()
+        return end - self._started_at
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Context manager that measures the wall-clock time spent in the
+        enclosed block and records it as a phase with the given name.
+        """
+        self._context.window_manager.progress_update(len(self._phases))
+        self._set_status_text(f"Exporting: {name}...")
+
+        started_at = perf_counter()
+        try:
+            yield
+        finally:
+            duration = perf_counter() - started_at
+            self._phases.append({"name": name, "duration": duration})
+            log.info(f"Export phase {name!r} took {duration:.3f}s")
+
+    @property
+    def warnings(self) -> List[str]:
+        """Warnings of the local checks that were run during the export."""
+        return list(self._warnings)
+
+    def add_warning(self, message: str) -> None:
+        """Records a warning of a local check in the report and in the log."""
+        log.warning(message)
+        self._warnings.append(message)
+
+    def set_count(self, name: str, value: int) -> None:
+        """Sets the value of a named counter in the report."""
+        self._counts[name] = int(value)
+
+    def set_keypoint_reduction(
+        self, drone: str, channel: str, num_samples: int, num_keypoints: int
+    ) -> None:
+        """Records the number of samples and the number of keypoints left
+        after simplification in a channel of a drone.
+
+        Parameters:
+            drone: the name of the drone
+            channel: the name of the channel (e.g., `trajectory` or `lights`)
+            num_samples: the number of samples in the channel
+            num_keypoints: the number of keypoints after simplification
+        """
+        self._keypoints.setdefault(drone, {})[channel] = {
+            "samples": int(num_samples),
+            "keypoints": int(num_keypoints),
+            "ratio": num_keypoints / num_samples if num_samples else None,
+        }
+
+    def set_kinematic_peaks(self, peaks: KinematicPeaks, names: Sequence[str]) -> None:
+        """Records the peak values of the kinematic quantities of the sampled
+        trajectories.
+
+        Parameters:
+            peaks: the peak values, as returned by
+                `sbstudio.math.kinematics.get_kinematic_peaks()`
+            names: the names of the drones, in the order of the drone indices
+                of the peaks
+        """
+        self.kinematic_peaks = peaks
+        self._peaks = {}
+        for field in fields(peaks):
+            peak = getattr(peaks, field.name)
+            if peak is not None:
+                self._peaks[field.name] = {
+                    "value": peak.value,
+                    "drone": names[peak.drone],
+                    "time": peak.time,
+                }
+
+    def set_setting(self, name: str, value: Any) -> None:
+        """Records the value of an export setting in the report."""
+        self._settings[name] = value
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns a JSON-serializable representation of the report."""
+        return {
+            "version": 1,
+            "started_at": (
+                self._started_at_utc.isoformat() if self._started_at_utc else None
+            ),
+            "total_duration": self.total_duration,
+            "phases": list(self._phases),
+            "settings": dict(self._settings),
+            "counts": {**self._counts, **self._get_keypoint_totals()},
+            "keypoints": {
+                drone: dict(channels) for drone, channels in self._keypoints.items()
+            },
+            "peaks": {name: dict(peak) for name, peak in self._peaks.items()},
+            "warnings": list(self._warnings),
+            "transfer": self._get_transfer_summary(),
+        }
+
+    def save(self, path: Path) -> None:
+        """Writes the report into a JSON file at the given path."""
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(self.as_dict(), fp, indent=2)
+            fp.write("\n")
+
+    def _get_keypoint_totals(self) -> Dict[str, int]:
+        """Returns the total number of samples and keypoints in each
+        channel across all drones.
+        """
+        result: Dict[str, int] = {}
+        for channels in self._keypoints.values():
+            for channel, item in channels.items():
+                for name in ("samples", "keypoints"):
+                    key = f"{channel}_{name}"
+                    result[key] = result.get(key, 0) + item[name]
+        return result
+
+    def _get_transfer_summary(self) -> Dict[str, Any]:
+        """Returns a summary of the transfer statistics. Times that cannot
+        be determined are set to `None`.
+        """
+        stats = self.transfer
+        result: Dict[str, Any] = {
+            "uncompressed_bytes": stats.uncompressed_bytes,
+            "compressed_bytes": stats.compressed_bytes,
+            "compression_ratio": (
+                stats.uncompressed_bytes / stats.compressed_bytes
+                if stats.compressed_bytes
+                else None
+            ),
+            "serialization_time": stats.serialization_time,
+            "compression_time": stats.compression_time,
+            "network_upload_time": None,
+            "upload_rate": stats.upload_rate,
+            "server_time": None,
+            "download_time": None,
+        }
+
+        # Upload times are known only if the request body was streamed;
+        # otherwise the upload and the processing on the server are
+        # indistinguishable from each other
+        if stats.upload_started_at is not None:
+            if stats.upload_finished_at is not None:
+                result["network_upload_time"] = max(
+                    stats.upload_finished_at
+                    - stats.upload_started_at
+                    - stats.serialization_time
+                    - stats.compression_time,
+                    0.0,
+                )
+                if stats.response_started_at is not None:
+                    result["server_time"] = (
+                        stats.response_started_at - stats.upload_finished_at
+                    )
+            elif stats.response_started_at is not None:
+                result["upload_and_server_time"] = (
+                    stats.response_started_at - stats.upload_started_at
+                )
+
+        if (
+            stats.response_started_at is not None
+            and stats.response_finished_at is not None
+        ):
+            result["download_time"] = (
+                stats.response_finished_at - stats.response_started_at
+            )
+
+        return result
+
+    def _on_transfer_progress(self, stats: TransferStats) -> None:
+        rate = stats.upload_rate
+        message = f"Exporting: sent {stats.compressed_bytes / 1048576:.1f} MB"
+        if rate is not None:
+            message += f" ({rate / 1048576:.2f} MB/s)"
+        self._set_status_text(message)
+
+        # Keep the progress indicator alive during long uploads
+        self._context.window_manager.progress_update(len(self._phases))
+
+    def _set_status_text(self, text: Optional[str]) -> None:
+        workspace = getattr(self._context, "workspace", None)
+        if workspace is not None:
+            workspace.status_text_set(text)
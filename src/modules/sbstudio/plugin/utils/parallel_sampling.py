@@ -0,0 +1,251 @@
+"""Sampling of Blender objects in multiple headless Blender worker processes,
+each of which processes a contiguous chunk of the frames to sample.
+
+The parent process (the Blender instance of the user) writes a job
+description for each worker into a temporary directory, launches the workers
+with `blender --background` on the saved .blend file, waits for them to
+finish and then stitches the arrays returned by the workers together.
+"""
+
+import bpy
+import json
+import sys
+
+from bpy.types import Context, Object
+from numpy import concatenate, load, savez
+from pathlib import Path
+from subprocess import DEVNULL, Popen
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Optional, Sequence
+
+from sbstudio.plugin.errors import SkybrushStudioExportWarning
+
+from .decorators import with_context
+from .sampling import ObjectSamples, SamplingRequest, sample_objects_in_single_pass
+
+__all__ = ("sample_objects_in_parallel",)
+
+
+_WORKER_EXPRESSION = (
+    "import sys; sys.path.insert(0, {path!r}); "
+    "from sbstudio.plugin.utils.parallel_sampling import run_worker; run_worker()"
+)
+"""Python expression that the worker processes evaluate after loading the
+.blend file.
+"""
+
+_CHANNELS = ("positions", "colors", "yaw_angles")
+"""Names of the array-valued channels of an ObjectSamples_ instance."""
+
+
+def _split_into_chunks(frames: Sequence[int], num_chunks: int) -> List[List[int]]:
+    """Splits the given sorted list of frames into at most the given number
+    of contiguous, non-empty chunks of roughly equal size.
+    """
+    num_chunks = max(1, min(num_chunks, len(frames)))
+    chunk_size, remainder = divmod(len(frames), num_chunks)
+    result, start = [], 0
+    for index in range(num_chunks):
+        end = start + chunk_size + (1 if index < remainder else 0)
+        result.append(list(frames[start:end]))
+        start = end
+    return result
+
+
+def _load_arrays(path: str) -> Dict[str, Any]:
+    """Loads all the arrays from a NumPy archive written by a worker, making
+    sure that the archive is closed afterwards.
+    """
+    with load(path) as data:
+        return dict(data)
+
+
+@with_context
+def sample_objects_in_parallel(
+    objects: Sequence[Object],
+    requests: Sequence[SamplingRequest],
+    *,
+    num_workers: int,
+    by_name: bool = False,
+    context: Optional[Context] = None,
+) -> List[ObjectSamples]:
+    """Samples the given Blender objects according to multiple sampling
+    requests, distributing the work among multiple headless Blender worker
+    processes.
+
+    The union of the requested frames is split into contiguous chunks, one for
+    each worker. Each worker opens the saved .blend file of the current
+    session, samples its own chunk with `sample_objects_in_single_pass()` and
+    sends back the sampled arrays, which are then concatenated in the parent
+    process. The result is the same as if `sample_objects_in_single_pass()`
+    was called directly in the current process.
+
+    Parameters:
+        objects: the Blender objects to process
+        requests: the sampling requests to fulfill
+        num_workers: the number of worker processes to launch
+        by_name: whether the keys of the results should be the _names_ of the
+            objects
+        context: the Blender execution context; `None` means the current
+            Blender context
+
+    Returns:
+        the sampled data, one item for each sampling request, in the same order
+        as the requests
+
+    Raises:
+        SkybrushStudioExportWarning: if the current file has not been saved or
+            has unsaved changes, as the workers would see a different state
+        RuntimeError: if one of the workers failed
+    """
+    if not bpy.data.filepath or bpy.data.is_dirty:
+        raise SkybrushStudioExportWarning(
+            "Save the file before sampling it with multiple worker processes"
+        )
+
+    frames_per_request = [list(request.frames) for request in requests]
+    all_frames = sorted(set().union(*frames_per_request))
+    chunks = _split_into_chunks(all_frames, num_workers)
+
+    module_path = str(Path(__file__).resolve().parents[3])
+    expression = _WORKER_EXPRESSION.format(path=module_path)
+    names = [obj.name for obj in objects]
+
+    with TemporaryDirectory(prefix="skybrush-") as work_dir:
+        processes = []
+        outputs = []
+
+        try:
+            for index, chunk in enumerate(chunks):
+                first, last = chunk[0], chunk[-1]
+                job = {
+                    "objects": names,
+                    "requests": [
+                        {
+                            "frames": [f for f in frames if first <= f <= last],
+                            "positions": request.positions,
+                            "colors": request.colors,
+                            "yaw": request.yaw,
+                        }
+                        for request, frames in zip(requests, frames_per_request)
+                    ],
+                    "output": str(Path(work_dir) / f"chunk-{index}.npz"),
+                }
+                job_file = Path(work_dir) / f"chunk-{index}.json"
+                job_file.write_text(json.dumps(job))
+                outputs.append(job["output"])
+
+                args = [
+                    bpy.app.binary_path,
+                    "--background",
+                    bpy.data.filepath,
+                    "--python-exit-code",
+                    "1",
+                    "--python-expr",
+                    expression,
+                    "--",
+                    str(job_file),
+                ]
+
+                # Log files are used instead of pipes so a chatty worker never
+                # blocks on a full pipe while we are waiting for another one
+                log_file = Path(work_dir) / f"chunk-{index}.log"
+                with log_file.open("wb") as stderr:
+                    process = Popen(args, stdout=DEVNULL, stderr=stderr)
+                processes.append((process, log_file))
+
+            failures = []
+            for index, (process, log_file) in enumerate(processes):
+                if process.wait() != 0:
+                    message = log_file.read_text(errors="replace").strip()
+                    failures.append(f"worker #{index + 1}: {message[-500:]}")
+        finally:
+            # Do not leave orphaned workers behind if launching one of them
+            # failed or we were interrupted while waiting for them
+            for process, _ in processes:
+                if process.poll() is None:
+                    process.terminate()
+                    process.wait()
+
+        if failures:
+            raise RuntimeError(
+                "Sampling failed in worker processes; " + "; ".join(failures)
+            )
+
+        keys = names if by_name else list(objects)
+        results = []
+        arrays = [_load_arrays(output) for output in outputs]
+        for index in range(len(requests)):
+            parts: Dict[str, Any] = {}
+            for name in ("times",) + _CHANNELS:
+                key = f"{name}_{index}"
+                if key in arrays[0]:
+                    parts[name] = concatenate([chunk[key] for chunk in arrays])
+            results.append(ObjectSamples(keys=keys, **parts))
+
+    return results
+
+
+def _are_light_effects_registered() -> bool:
+    """Returns whether the frame change handler that applies the light effects
+    on the colors of the drones is registered in the current Blender process,
+    i.e. whether the add-on is enabled.
+
+    The handler is matched by name because the add-on may have imported the
+    module under a different module object than the worker itself.
+    """
+    return any(
+        getattr(handler, "__module__", None) == "sbstudio.plugin.tasks.light_effects"
+        and getattr(handler, "__name__", None) == "update_light_effects"
+        for handler in bpy.app.handlers.frame_change_post
+    )
+
+
+def run_worker() -> None:
+    """Entry point of the worker processes launched by
+    `sample_objects_in_parallel()`.
+
+    Reads the job description whose path is given after the `--` separator on
+    the command line, samples the requested frames in the .blend file that is
+    currently loaded and saves the sampled arrays into the output file
+    specified in the job description.
+    """
+    from sbstudio.plugin.tasks.safety_check import suspended_safety_checks
+
+    argv = sys.argv[sys.argv.index("--") + 1 :]
+    job = json.loads(Path(argv[0]).read_text())
+
+    if any(item["colors"] for item in job["requests"]):
+        if not _are_light_effects_registered():
+            raise RuntimeError(
+                "The Skybrush Studio add-on is not enabled in the worker "
+                "Blender process so light effects cannot be evaluated; enable "
+                "the add-on in the preferences of Blender or export with a "
+                "single process"
+            )
+
+    objects = [bpy.data.objects[name] for name in job["objects"]]
+    requests = [
+        SamplingRequest(
+            item["frames"],
+            positions=item["positions"],
+            colors=item["colors"],
+            yaw=item["yaw"],
+        )
+        for item in job["requests"]
+    ]
+
+    with suspended_safety_checks():
+        results = sample_objects_in_single_pass(
+            objects, requests, by_name=True, context=bpy.context
+        )
+
+    arrays = {}
+    for index, result in enumerate(results):
+        arrays[f"times_{index}"] = result.times
+        for name in _CHANNELS:
+            value = getattr(result, name)
+            if value is not None:
+                arrays[f"{name}_{index}"] = value
+
+    savez(job["output"], **arrays)
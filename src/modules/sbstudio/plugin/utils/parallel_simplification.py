@@ -0,0 +1,186 @@
+"""Simplification of sampled trajectories, light programs and yaw setpoints in
+a pool of worker processes, outside of the main thread of Blender.
+
+The workers are plain Python processes (not Blender instances) that run the
+NumPy-based simplification functions of `sbstudio.math.simplification` on
+the sampled arrays of a subset of the objects. The main process then
+constructs the model objects from the samples that were kept.
+"""
+
+import logging
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from numpy import array_split, arange
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sbstudio.math.simplification import simplify_sampled_channels
+from sbstudio.model.light_program import LightProgram
+from sbstudio.model.trajectory import Trajectory
+from sbstudio.model.yaw import YawSetpointList
+
+from .sampling import ObjectSamples
+
+__all__ = ("simplify_samples_in_parallel",)
+
+
+log = logging.getLogger(__name__)
+
+
+_MIN_SAMPLES_PER_WORKER = 250000
+"""Minimum number of samples per worker process; the overhead of starting
+the worker processes is not worth it for smaller shows.
+"""
+
+_CHUNKS_PER_WORKER = 4
+"""Number of chunks to split the objects into per worker process, for sake of
+better load balancing between the workers.
+"""
+
+
+def simplify_samples_in_parallel(
+    trajectory_samples: ObjectSamples,
+    light_samples: ObjectSamples,
+    *,
+    yaw: bool = False,
+    max_position_error: float = 0.0,
+    max_color_error: float = 4,
+    max_yaw_error: float = 0.0,
+    num_workers: Optional[int] = None,
+) -> Tuple[
+    Dict[Any, Trajectory],
+    Dict[Any, LightProgram],
+    Optional[Dict[Any, YawSetpointList]],
+]:
+    """Converts sampled positions, colors and optionally yaw angles into
+    simplified trajectories, light programs and yaw setpoint lists, running
+    the simplification in multiple worker processes.
+
+    With the default error budgets, the result is the same as calling
+    `as_trajectories()`, `as_light_programs()` and `as_yaw_setpoint_lists()`
+    on the samples with `simplify=True`. The simplification runs in the main
+    process if the show is too small for the worker processes to be worth
+    starting, or if the worker processes cannot be started at all.
+
+    Parameters:
+        trajectory_samples: the samples containing the positions and
+            optionally the yaw angles of the objects
+        light_samples: the samples containing the colors of the objects; may
+            be the same as `trajectory_samples`
+        yaw: whether to simplify the yaw angles as well
+        max_position_error: the maximum allowed distance of the simplified
+            trajectories from the sampled positions, in meters
+        max_color_error: the maximum allowed deviation of the color components
+            of the simplified light programs from the sampled colors, in the
+            range [0; 255]
+        max_yaw_error: the maximum allowed deviation of the simplified yaw
+            angles from the sampled ones, in degrees
+        num_workers: the maximum number of worker processes to use; `None`
+            means the number of CPU cores
+
+    Returns:
+        the simplified trajectories, light programs and yaw setpoint lists,
+        indexed by the keys of the samples; the latter is `None` if `yaw` is
+        `False`
+    """
+    if trajectory_samples.keys != light_samples.keys:
+        raise RuntimeError("trajectory and light samples must have the same keys")
+
+    num_objects = trajectory_samples.num_objects
+    num_samples = num_objects * (
+        trajectory_samples.num_frames + light_samples.num_frames
+    )
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = min(num_workers, num_objects, num_samples // _MIN_SAMPLES_PER_WORKER)
+
+    positions = trajectory_samples.positions
+    colors = light_samples.colors
+    yaw_angles = trajectory_samples.yaw_angles if yaw else None
+    if positions is None:
+        raise RuntimeError("positions were not sampled")
+    if colors is None:
+        raise RuntimeError("colors were not sampled")
+    if yaw and yaw_angles is None:
+        raise RuntimeError("yaw angles were not sampled")
+
+    def simplify_chunk(chunk, executor=None):
+        args = (
+            trajectory_samples.times,
+            positions[:, chunk],
+            light_samples.times,
+            colors[:, chunk],
+            yaw_angles[:, chunk] if yaw_angles is not None else None,
+        )
+        kwds = {
+            "position_eps": max_position_error,
+            "color_eps": max_color_error,
+            "yaw_eps": max_yaw_error,
+        }
+        if executor:
+            return executor.submit(simplify_sampled_channels, *args, **kwds)
+        else:
+            return simplify_sampled_channels(*args, **kwds)
+
+    results = None
+    if num_workers > 1:
+        try:
+            results = _run_in_worker_processes(
+                simplify_chunk, num_objects, num_workers=num_workers
+            )
+        except (BrokenProcessPool, OSError) as ex:
+            log.warning(
+                f"Failed to simplify samples in worker processes, "
+                f"falling back to the main process: {ex}"
+            )
+
+    if results is None:
+        results = simplify_chunk(slice(None))
+
+    trajectories, lights, yaw_setpoints = {}, {}, {} if yaw else None
+    for index, (key, (position_indices, color_indices, yaw_result)) in enumerate(
+        zip(trajectory_samples.keys, results)
+    ):
+        trajectories[key] = Trajectory.from_arrays(
+            trajectory_samples.times[position_indices],
+            positions[position_indices, index, :],
+        )
+        lights[key] = LightProgram.from_arrays(
+            light_samples.times[color_indices], colors[color_indices, index, :]
+        )
+        if yaw_setpoints is not None:
+            yaw_setpoints[key] = YawSetpointList.from_arrays(*yaw_result)
+
+    return trajectories, lights, yaw_setpoints
+
+
+def _run_in_worker_processes(
+    simplify_chunk: Callable[..., Any], num_objects: int, *, num_workers: int
+) -> List[Any]:
+    """Splits the objects into chunks, simplifies each chunk in a pool of
+    worker processes and returns the concatenated results.
+
+    Parameters:
+        simplify_chunk: function that receives the indices of the objects in a
+            chunk and an executor, and submits the simplification of the chunk
+            to the executor
+        num_objects: the number of objects
+        num_workers: the number of worker processes
+    """
+    chunks = array_split(arange(num_objects), num_workers * _CHUNKS_PER_WORKER)
+
+    # Workers are spawned instead of forked; forking the entire Blender
+    # process is not safe, and it is not supported on Windows anyway
+    with ProcessPoolExecutor(
+        max_workers=num_workers, mp_context=get_context("spawn")
+    ) as executor:
+        futures = [
+            simplify_chunk(chunk, executor) for chunk in chunks if len(chunk) > 0
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+
+    return results
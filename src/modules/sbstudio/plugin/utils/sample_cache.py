@@ -0,0 +1,767 @@
+"""Persistent cache of the sampled positions, colors and yaw angles of the
+drones, stored next to the .blend file.
+
+Each channel is cached separately and is invalidated by a fingerprint of the
+data that feeds it: the animation (actions, NLA strips and drivers, including
+the targets of the drivers), constraints and constraint targets of the drones
+for positions and yaw angles, and the light effects, the storyboard, the LED
+materials _and_ the positions for colors (as light effects may depend on the
+positions of the drones). Files referenced by the light effects, such as the
+scripts of custom color functions, are fingerprinted by content. Re-exporting a show after tweaking
+a light effect therefore re-evaluates the color channel only.
+"""
+
+import bpy
+
+from bpy.types import (
+    Action,
+    Context,
+    FCurve,
+    ID,
+    Image,
+    Material,
+    NlaStrip,
+    NodeTree,
+    Object,
+    Texture,
+)
+from hashlib import sha1
+from numpy import empty, float32, load, savez
+from numpy.typing import NDArray
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from sbstudio.plugin.materials import (
+    get_material_for_led_light_color,
+    get_shader_node_and_input_for_diffuse_color_of_material,
+)
+from sbstudio.plugin.errors import SkybrushStudioAddonError
+
+from .decorators import with_context
+from .sampling import ObjectSamples, SamplingRequest
+
+__all__ = (
+    "SampleCache",
+    "get_sample_cache_for_current_file",
+    "sample_objects_with_cache",
+)
+
+
+_CHANNELS = (("positions", "positions"), ("colors", "colors"), ("yaw", "yaw_angles"))
+"""Pairs of sampling request flags and the corresponding ObjectSamples_
+attributes.
+"""
+
+_MAX_DEPTH = 8
+"""Maximum nesting depth when hashing Blender data structures, to protect
+against reference cycles between non-ID structures.
+"""
+
+_TRANSFORM_PROPERTIES = (
+    "location",
+    "rotation_mode",
+    "rotation_euler",
+    "rotation_quaternion",
+    "rotation_axis_angle",
+    "scale",
+    "delta_location",
+    "delta_rotation_euler",
+    "delta_rotation_quaternion",
+    "delta_scale",
+)
+"""Properties of Blender objects that influence their positions and
+orientations.
+"""
+
+_NLA_STRIP_PROPERTIES = (
+    "action_frame_start",
+    "action_frame_end",
+    "blend_in",
+    "blend_out",
+    "blend_type",
+    "extrapolation",
+    "frame_start",
+    "frame_end",
+    "influence",
+    "mute",
+    "repeat",
+    "scale",
+    "strip_time",
+    "type",
+    "use_animated_influence",
+    "use_animated_time",
+    "use_animated_time_cyclic",
+    "use_auto_blend",
+    "use_reverse",
+)
+"""Properties of NLA strips that influence the animation they produce."""
+
+_DRIVER_TARGET_PROPERTIES = (
+    "id_type",
+    "data_path",
+    "bone_target",
+    "transform_type",
+    "transform_space",
+    "rotation_mode",
+)
+"""Properties of driver variable targets that influence the value they read."""
+
+_KEY_BLOCK_PROPERTIES = (
+    "name",
+    "interpolation",
+    "mute",
+    "slider_min",
+    "slider_max",
+    "vertex_group",
+)
+"""Properties of shape keys that influence the deformed geometry."""
+
+
+class SampleCache:
+    """Persistent cache of sampled channels, stored in a directory with one
+    NumPy archive per channel.
+    """
+
+    _path: Path
+    """The directory holding the cached channels."""
+
+    def __init__(self, path: Path):
+        """Constructor.
+
+        Parameters:
+            path: the directory holding the cached channels; it is created on
+                demand when the first channel is stored
+        """
+        self._path = path
+
+    @property
+    def path(self) -> Path:
+        """The directory holding the cached channels."""
+        return self._path
+
+    @property
+    def show_path(self) -> Path:
+        """The path of the show cache file in the directory that holds the
+        trajectories, light programs and yaw setpoints of the last export.
+        See `sbstudio.model.show_cache` for its format.
+        """
+        return self._path / "show.npz"
+
+    def clear(self) -> None:
+        """Removes all cached channels and the show cache file."""
+        for file in self._path.glob("*.npz"):
+            file.unlink()
+
+    def get(
+        self, channel: str, fingerprint: str
+    ) -> Optional[Tuple[NDArray[Any], NDArray[Any]]]:
+        """Returns the cached timestamps and values of the given channel if the
+        cache holds an entry for the channel with the given fingerprint.
+
+        Returns:
+            the timestamps and the values of the channel or `None` if the
+            channel is not cached or its fingerprint does not match
+        """
+        try:
+            with load(self._path / f"{channel}.npz") as data:
+                if str(data["fingerprint"]) != fingerprint:
+                    return None
+                return data["times"], data["values"]
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def put(
+        self,
+        channel: str,
+        fingerprint: str,
+        times: NDArray[Any],
+        values: NDArray[Any],
+    ) -> None:
+        """Stores the timestamps and values of the given channel in the cache,
+        replacing any earlier entry for the same channel.
+        """
+        self._path.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so an interrupted write never leaves
+        # a corrupted entry behind
+        tmp_file = self._path / f"{channel}.tmp.npz"
+        savez(tmp_file, fingerprint=fingerprint, times=times, values=values)
+        tmp_file.replace(self._path / f"{channel}.npz")
+
+
+def get_sample_cache_for_current_file() -> Optional[SampleCache]:
+    """Returns the sample cache belonging to the current .blend file, or
+    `None` if the file has not been saved yet.
+    """
+    if not bpy.data.filepath:
+        return None
+
+    path = Path(bpy.data.filepath)
+    return SampleCache(path.with_name(f"{path.stem}.skybrush-cache"))
+
+
+def _get_animated_paths(id: ID) -> Set[str]:
+    """Returns the RNA paths of the properties of the given ID that are
+    controlled by F-curves or drivers. The current values of these properties
+    depend on the current frame so they must not be fingerprinted directly.
+    """
+    animation_data = getattr(id, "animation_data", None)
+    if animation_data is None:
+        return set()
+
+    result = {driver.data_path for driver in animation_data.drivers}
+    if animation_data.action is not None:
+        result.update(fcurve.data_path for fcurve in animation_data.action.fcurves)
+    return result
+
+
+def _update_with_fcurve(hasher, fcurve: FCurve) -> None:
+    """Updates the given hasher with the keyframes and modifiers of the given
+    F-curve.
+    """
+    points = fcurve.keyframe_points
+    num_points = len(points)
+    hasher.update(
+        repr(
+            (
+                fcurve.data_path,
+                fcurve.array_index,
+                fcurve.mute,
+                fcurve.extrapolation,
+                num_points,
+            )
+        ).encode()
+    )
+    buffer = empty(num_points * 2, dtype=float32)
+    for attr in ("co", "handle_left", "handle_right"):
+        points.foreach_get(attr, buffer)
+        hasher.update(buffer.tobytes())
+    hasher.update(
+        repr([(point.interpolation, point.easing) for point in points]).encode()
+    )
+    for modifier in fcurve.modifiers:
+        _update_with_struct(hasher, modifier, set(), 1)
+
+
+def _update_with_action(hasher, action: Optional[Action]) -> None:
+    """Updates the given hasher with the F-curves of the given action."""
+    if action is None:
+        hasher.update(b"-")
+        return
+
+    hasher.update(repr(action.name).encode())
+    for fcurve in action.fcurves:
+        _update_with_fcurve(hasher, fcurve)
+
+
+def _update_with_nla_strip(hasher, strip: NlaStrip) -> None:
+    """Updates the given hasher with the timing, blending and action of the
+    given NLA strip, and of its child strips in case of meta strips.
+    """
+    hasher.update(
+        repr(tuple(getattr(strip, name) for name in _NLA_STRIP_PROPERTIES)).encode()
+    )
+    _update_with_action(hasher, strip.action)
+    for fcurve in strip.fcurves:
+        _update_with_fcurve(hasher, fcurve)
+    for child in strip.strips:
+        _update_with_nla_strip(hasher, child)
+
+
+def _update_with_animation(hasher, id: ID, seen: Set[int]) -> None:
+    """Updates the given hasher with the active action, the NLA tracks and the
+    drivers of the given ID, including the IDs that the drivers read.
+    """
+    animation_data = getattr(id, "animation_data", None)
+    if animation_data is None:
+        hasher.update(b"-")
+        return
+
+    hasher.update(
+        repr(
+            (
+                animation_data.action_blend_type,
+                animation_data.action_extrapolation,
+                animation_data.action_influence,
+                animation_data.use_nla,
+                animation_data.use_tweak_mode,
+            )
+        ).encode()
+    )
+    _update_with_action(hasher, animation_data.action)
+
+    for track in animation_data.nla_tracks:
+        hasher.update(repr((track.name, track.mute, track.is_solo)).encode())
+        for strip in track.strips:
+            _update_with_nla_strip(hasher, strip)
+
+    for fcurve in animation_data.drivers:
+        _update_with_fcurve(hasher, fcurve)
+        driver = fcurve.driver
+        hasher.update(repr((driver.type, driver.expression, driver.use_self)).encode())
+        for variable in driver.variables:
+            hasher.update(repr((variable.name, variable.type)).encode())
+            for target in variable.targets:
+                hasher.update(
+                    repr(
+                        tuple(
+                            getattr(target, name) for name in _DRIVER_TARGET_PROPERTIES
+                        )
+                    ).encode()
+                )
+                if target.id is None:
+                    hasher.update(b"-")
+                else:
+                    _update_with_id(hasher, target.id, seen, 0)
+
+
+def _update_with_id(hasher, id: ID, seen: Set[int], depth: int) -> None:
+    """Updates the given hasher with the relevant content of a Blender ID that
+    is referenced from a structure being fingerprinted. Only objects, actions,
+    images, textures, materials and node trees are fingerprinted by content;
+    other IDs (collections, scenes etc.) are fingerprinted by name.
+    """
+    hasher.update(f"{id.__class__.__name__}:{id.name}".encode())
+
+    pointer = id.as_pointer()
+    if pointer in seen:
+        return
+    seen.add(pointer)
+
+    if isinstance(id, Object):
+        _update_with_object(hasher, id, seen, include_geometry=True)
+    elif isinstance(id, Action):
+        _update_with_action(hasher, id)
+    elif isinstance(id, Image):
+        pixels = empty(len(id.pixels), dtype=float32)
+        id.pixels.foreach_get(pixels)
+        hasher.update(pixels.tobytes())
+    elif isinstance(id, (Material, NodeTree, Texture)) and depth < _MAX_DEPTH:
+        _update_with_animation(hasher, id, seen)
+        _update_with_struct(
+            hasher, id, seen, depth + 1, animated=_get_animated_paths(id)
+        )
+
+
+def _update_with_file(hasher, path: str) -> None:
+    """Updates the given hasher with the contents of the file at the given
+    path, which may be relative to the current .blend file. Custom color
+    functions are loaded from such files again whenever they are evaluated,
+    so editing the file must change the fingerprint.
+    """
+    try:
+        hasher.update(Path(bpy.path.abspath(path)).read_bytes())
+    except OSError:
+        hasher.update(b"<missing>")
+
+
+def _get_path_of_item(item, default: str) -> str:
+    """Returns the RNA path of an item of a collection relative to its owner
+    ID, in the same form as the data paths of F-curves (e.g., items of named
+    collections are indexed by name), or the given default if Blender cannot
+    resolve the path.
+    """
+    try:
+        return item.path_from_id()
+    except (AttributeError, ValueError):
+        return default
+
+
+def _update_with_struct(
+    hasher,
+    struct,
+    seen: Set[int],
+    depth: int,
+    *,
+    animated: Set[str] = frozenset(),  # type: ignore
+    path: str = "",
+) -> None:
+    """Updates the given hasher with all the RNA properties of the given
+    Blender structure, recursively.
+
+    Parameters:
+        hasher: the hasher to update
+        struct: the Blender structure to fingerprint
+        seen: pointers of the Blender IDs that were already fingerprinted
+        depth: the current nesting depth
+        animated: RNA paths of animated properties, relative to the owner ID;
+            these are skipped as their current values depend on the frame
+        path: the RNA path of the structure, relative to the owner ID
+    """
+    for prop in struct.bl_rna.properties:
+        identifier = prop.identifier
+        if identifier == "rna_type" or (
+            identifier.startswith("active_") and identifier.endswith("_index")
+        ):
+            # Type information and UI-only selection state
+            continue
+
+        prop_path = f"{path}.{identifier}" if path else identifier
+        if prop_path in animated:
+            continue
+
+        value = getattr(struct, identifier, None)
+        hasher.update(identifier.encode())
+
+        if prop.type == "POINTER":
+            if value is None:
+                hasher.update(b"-")
+            elif isinstance(value, ID):
+                _update_with_id(hasher, value, seen, depth)
+            elif depth < _MAX_DEPTH:
+                _update_with_struct(
+                    hasher, value, seen, depth + 1, animated=animated, path=prop_path
+                )
+        elif prop.type == "COLLECTION":
+            hasher.update(repr(len(value)).encode())
+            if depth < _MAX_DEPTH:
+                for index, item in enumerate(value):
+                    if isinstance(item, ID):
+                        _update_with_id(hasher, item, seen, depth)
+                    else:
+                        _update_with_struct(
+                            hasher,
+                            item,
+                            seen,
+                            depth + 1,
+                            animated=animated,
+                            path=_get_path_of_item(item, f"{prop_path}[{index}]"),
+                        )
+        elif getattr(prop, "is_array", False):
+            hasher.update(repr(tuple(value)).encode())
+        elif prop.type == "STRING" and prop.subtype == "FILE_PATH" and value:
+            hasher.update(repr(value).encode())
+            _update_with_file(hasher, value)
+        elif isinstance(value, set):
+            hasher.update(repr(sorted(value)).encode())
+        else:
+            hasher.update(repr(value).encode())
+
+
+def _update_with_object(
+    hasher, obj: Object, seen: Set[int], *, include_geometry: bool = False
+) -> None:
+    """Updates the given hasher with everything that determines the position
+    and orientation of the given Blender object, independently of the current
+    frame.
+
+    Parameters:
+        hasher: the hasher to update
+        obj: the object to fingerprint
+        seen: pointers of the Blender IDs that were already fingerprinted
+        include_geometry: whether to include the geometry of the object (its
+            mesh, vertex groups, shape keys and modifiers); needed for objects
+            that are used as constraint targets or light effect meshes
+    """
+    hasher.update(obj.name.encode())
+    seen.add(obj.as_pointer())
+
+    animated = _get_animated_paths(obj)
+
+    for name in _TRANSFORM_PROPERTIES:
+        if name not in animated:
+            value = getattr(obj, name)
+            hasher.update(
+                repr(value if isinstance(value, str) else tuple(value)).encode()
+            )
+
+    _update_with_animation(hasher, obj, seen)
+
+    for index, constraint in enumerate(obj.constraints):
+        _update_with_struct(
+            hasher,
+            constraint,
+            seen,
+            1,
+            animated=animated,
+            path=f'constraints["{constraint.name}"]',
+        )
+        hasher.update(repr(index).encode())
+
+    parent = obj.parent
+    if parent is not None:
+        hasher.update(repr((obj.parent_type, obj.parent_bone)).encode())
+        hasher.update(
+            repr(tuple(tuple(row) for row in obj.matrix_parent_inverse)).encode()
+        )
+        _update_with_id(hasher, parent, seen, 0)
+
+    if include_geometry:
+        _update_with_geometry(hasher, obj, seen, animated=animated)
+
+
+def _update_with_geometry(
+    hasher, obj: Object, seen: Set[int], *, animated: Set[str]
+) -> None:
+    """Updates the given hasher with the geometry of the given Blender object:
+    the modifiers of the object and the vertices, vertex groups and shape keys
+    of its mesh, as well as the vertices of the evaluated mesh in the current
+    frame, which reflects the effect of the modifiers and the shape keys.
+    """
+    for modifier in obj.modifiers:
+        _update_with_struct(
+            hasher,
+            modifier,
+            seen,
+            1,
+            animated=animated,
+            path=f'modifiers["{modifier.name}"]',
+        )
+
+    if obj.type == "MESH" and obj.data is not None:
+        mesh = obj.data
+        vertices = mesh.vertices
+        coords = empty(len(vertices) * 3, dtype=float32)
+        vertices.foreach_get("co", coords)
+        hasher.update(coords.tobytes())
+        hasher.update(repr([group.name for group in obj.vertex_groups]).encode())
+        hasher.update(
+            repr(
+                [
+                    [(item.group, item.weight) for item in vertex.groups]
+                    for vertex in vertices
+                ]
+            ).encode()
+        )
+
+        shape_keys = mesh.shape_keys
+        if shape_keys is not None:
+            _update_with_animation(hasher, shape_keys, seen)
+            shape_key_animated = _get_animated_paths(shape_keys)
+            hasher.update(repr(shape_keys.use_relative).encode())
+            for block in shape_keys.key_blocks:
+                hasher.update(
+                    repr(
+                        tuple(getattr(block, name) for name in _KEY_BLOCK_PROPERTIES)
+                    ).encode()
+                )
+                relative_key = block.relative_key
+                hasher.update(
+                    repr(relative_key.name if relative_key else None).encode()
+                )
+                if f'key_blocks["{block.name}"].value' not in shape_key_animated:
+                    hasher.update(repr(block.value).encode())
+                coords = empty(len(block.data) * 3, dtype=float32)
+                block.data.foreach_get("co", coords)
+                hasher.update(coords.tobytes())
+
+    # The evaluated mesh also covers deformations that cannot be inferred from
+    # the properties hashed above, e.g., geometry nodes reading other objects
+    evaluated = obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+    evaluated_mesh = evaluated.to_mesh()
+    try:
+        if evaluated_mesh is None:
+            hasher.update(b"-")
+        else:
+            vertices = evaluated_mesh.vertices
+            coords = empty(len(vertices) * 3, dtype=float32)
+            vertices.foreach_get("co", coords)
+            hasher.update(coords.tobytes())
+    finally:
+        evaluated.to_mesh_clear()
+
+
+def get_position_fingerprint(objects: Sequence[Object]) -> str:
+    """Returns a fingerprint of all the data that feeds the positions and
+    yaw angles of the given objects: their transforms, actions, NLA strips,
+    drivers and driver targets, constraints, parents and constraint targets.
+    """
+    hasher = sha1()
+    seen: Set[int] = set()
+    for obj in objects:
+        _update_with_object(hasher, obj, seen)
+    return hasher.hexdigest()
+
+
+@with_context
+def get_color_fingerprint(
+    objects: Sequence[Object],
+    position_fingerprint: str,
+    *,
+    context: Optional[Context] = None,
+) -> str:
+    """Returns a fingerprint of all the data that feeds the colors of the
+    given objects: their LED materials (including the base colors and the
+    animation of the materials and their node trees), the light effects, the
+    storyboard, the random seed of the show and the positions of the objects
+    (given as a position fingerprint).
+    """
+    assert context is not None  # injected
+
+    hasher = sha1(position_fingerprint.encode())
+    seen: Set[int] = set()
+
+    # Properties of the add-on are stored in the scene so their F-curves live
+    # in the action of the scene
+    scene = context.scene
+    animated = _get_animated_paths(scene)
+    _update_with_animation(hasher, scene, seen)
+    for name in ("light_effects", "storyboard", "settings"):
+        _update_with_struct(
+            hasher,
+            getattr(scene.skybrush, name),
+            seen,
+            1,
+            animated=animated,
+            path=f"skybrush.{name}",
+        )
+
+    for obj in objects:
+        material = get_material_for_led_light_color(obj)
+        hasher.update(repr(material.name if material else None).encode())
+        if material is not None:
+            _update_with_led_material(hasher, obj, material, seen)
+
+    return hasher.hexdigest()
+
+
+def _update_with_led_material(
+    hasher, drone: Object, material: Material, seen: Set[int]
+) -> None:
+    """Updates the given hasher with the LED material of the given drone,
+    including its node tree and its base color.
+
+    Light effects overwrite the color of the material in every frame, so the
+    current color is not hashed directly. The base color that the light
+    effects started from in the current frame is hashed instead, unless the
+    color is animated, in which case its F-curves determine the base color.
+    """
+    # Imported lazily to avoid a circular import
+    from sbstudio.plugin.tasks.light_effects import get_base_color_of_drone
+
+    pointer = material.as_pointer()
+    if pointer in seen:
+        # Shared material; hashed already
+        return
+    seen.add(pointer)
+
+    material_animated = _get_animated_paths(material)
+    material_ignored = material_animated | {"diffuse_color"}
+
+    node_tree = material.node_tree
+    if node_tree is not None:
+        node_tree_animated = _get_animated_paths(node_tree)
+        node_tree_ignored = set(node_tree_animated)
+        color_path = None
+        if material.use_nodes:
+            try:
+                _, input = get_shader_node_and_input_for_diffuse_color_of_material(
+                    material
+                )
+                color_path = input.path_from_id("default_value")
+            except (SkybrushStudioAddonError, ValueError):
+                pass
+        if color_path is not None:
+            node_tree_ignored.add(color_path)
+            is_color_animated = color_path in node_tree_animated
+        else:
+            is_color_animated = "diffuse_color" in material_animated
+
+        # Mark the node tree as seen so it is hashed below with the color of
+        # the LED ignored instead of being hashed from the material
+        seen.add(node_tree.as_pointer())
+    else:
+        is_color_animated = "diffuse_color" in material_animated
+
+    _update_with_animation(hasher, material, seen)
+    _update_with_struct(hasher, material, seen, 1, animated=material_ignored)
+
+    if node_tree is not None:
+        hasher.update(f"NodeTree:{node_tree.name}".encode())
+        _update_with_animation(hasher, node_tree, seen)
+        _update_with_struct(hasher, node_tree, seen, 1, animated=node_tree_ignored)
+
+    if not is_color_animated:
+        hasher.update(repr(tuple(get_base_color_of_drone(drone))).encode())
+
+
+@with_context
+def sample_objects_with_cache(
+    objects: Sequence[Object],
+    requests: Sequence[SamplingRequest],
+    *,
+    cache: SampleCache,
+    sampler: Callable[
+        [Sequence[Object], Sequence[SamplingRequest]], List[ObjectSamples]
+    ],
+    by_name: bool = False,
+    context: Optional[Context] = None,
+) -> List[ObjectSamples]:
+    """Samples the given Blender objects according to multiple sampling
+    requests, taking channels from the given cache whenever their fingerprints
+    match, and sampling only the remaining channels with the given sampler.
+
+    Parameters:
+        objects: the Blender objects to process
+        requests: the sampling requests to fulfill
+        cache: the cache to use
+        sampler: function that samples the channels not found in the cache;
+            must accept the objects and a list of sampling requests, and return
+            the sampled data with the same semantics as
+            `sample_objects_in_single_pass()`
+        by_name: whether the keys of the results should be the _names_ of the
+            objects
+        context: the Blender execution context; `None` means the current
+            Blender context
+
+    Returns:
+        the sampled data, one item for each sampling request, in the same order
+        as the requests
+    """
+    assert context is not None  # injected
+
+    keys = [obj.name if by_name else obj for obj in objects]
+    base = repr(([obj.name for obj in objects], context.scene.render.fps))
+
+    input_fingerprints: Dict[str, str] = {}
+
+    def get_input_fingerprint(flag: str) -> str:
+        if "positions" not in input_fingerprints:
+            input_fingerprints["positions"] = get_position_fingerprint(objects)
+        if flag == "colors" and "colors" not in input_fingerprints:
+            input_fingerprints["colors"] = get_color_fingerprint(
+                objects, input_fingerprints["positions"], context=context
+            )
+        return input_fingerprints["colors" if flag == "colors" else "positions"]
+
+    results: List[ObjectSamples] = []
+    missing: List[Tuple[int, SamplingRequest, Dict[str, str]]] = []
+
+    for request in requests:
+        frames = list(request.frames)
+        result = ObjectSamples(keys=keys, times=empty((0,)))
+        fingerprints: Dict[str, str] = {}
+        flags: Dict[str, bool] = {}
+
+        for flag, attr in _CHANNELS:
+            if not getattr(request, flag):
+                continue
+
+            fingerprint = sha1(
+                repr((base, flag, frames, get_input_fingerprint(flag))).encode()
+            ).hexdigest()
+            cached = cache.get(attr, fingerprint)
+            if cached is None:
+                fingerprints[attr] = fingerprint
+                flags[flag] = True
+            else:
+                result.times, values = cached
+                setattr(result, attr, values)
+
+        results.append(result)
+        if flags:
+            missing.append(
+                (len(results) - 1, SamplingRequest(frames, **flags), fingerprints)
+            )
+
+    if missing:
+        sampled = sampler(objects, [request for _, request, _ in missing])
+        for (index, _, fingerprints), samples in zip(missing, sampled):
+            result = results[index]
+            result.times = samples.times
+            for attr, fingerprint in fingerprints.items():
+                values = getattr(samples, attr)
+                setattr(result, attr, values)
+                cache.put(attr, fingerprint, samples.times, values)
+
+    return results
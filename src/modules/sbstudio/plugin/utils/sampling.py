@@ -1,14 +1,16 @@
 from bpy.types import Context, Object
 from collections import defaultdict
+from dataclasses import dataclass
 from itertools import chain
-from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+from numpy import empty, float32, float64, rint, uint8
+from numpy.typing import NDArray
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from sbstudio.model.color import Color4D
 from sbstudio.model.light_program import LightProgram
-from sbstudio.model.point import Point4D
 from sbstudio.model.trajectory import Trajectory
-from sbstudio.model.yaw import YawSetpoint, YawSetpointList
+from sbstudio.model.yaw import YawSetpointList
 from sbstudio.plugin.materials import get_led_light_color
+from sbstudio.plugin.tasks.light_effects import suspended_light_effects
 from sbstudio.plugin.utils.evaluator import (
     get_position_of_object,
     get_xyz_euler_rotation_of_object,
@@ -19,6 +21,10 @@ from .decorators import with_context
 __all__ = (
     "each_frame_in",
     "frame_range",
+    "ObjectSamples",
+    "SamplingRequest",
+    "sample_objects",
+    "sample_objects_in_single_pass",
     "sample_colors_of_objects",
     "sample_positions_of_objects",
     "sample_positions_and_yaw_of_objects",
@@ -28,9 +34,107 @@ __all__ = (
 )
 
 
-def _to_int_255(value: float) -> int:
-    """Convert [0,1] float to clamped [0,255] int."""
-    return int(max(0, min(255, round(value * 255))))
+@dataclass
+class ObjectSamples:
+    """Columnar storage for the positions, colors and yaw angles of a set of
+    objects, sampled at a common set of frames.
+
+    Each channel is stored in a single preallocated NumPy array where the first
+    axis is the frame index and the second axis is the object index. Channels
+    that were not sampled are set to `None`. Model objects (trajectories, light
+    programs and yaw setpoint lists) are constructed only on request.
+    """
+
+    keys: List[Any]
+    """The keys of the sampled objects (the objects themselves or their names),
+    in the order they appear along the second axis of the arrays.
+    """
+
+    times: NDArray[float64]
+    """The timestamps of the sampled frames, in seconds; shape is `(frames,)`."""
+
+    positions: Optional[NDArray[float32]] = None
+    """The sampled positions; shape is `(frames, objects, 3)`. Blender stores
+    world matrices in single precision so `float32` is lossless here.
+    """
+
+    colors: Optional[NDArray[uint8]] = None
+    """The sampled RGB colors in the range [0; 255]; shape is
+    `(frames, objects, 3)`.
+    """
+
+    yaw_angles: Optional[NDArray[float64]] = None
+    """The sampled yaw angles in degrees; shape is `(frames, objects)`."""
+
+    @property
+    def num_frames(self) -> int:
+        """Returns the number of sampled frames."""
+        return self.times.shape[0]
+
+    @property
+    def num_objects(self) -> int:
+        """Returns the number of sampled objects."""
+        return len(self.keys)
+
+    def as_trajectories(self, *, simplify: bool = False) -> Dict[Any, Trajectory]:
+        """Converts the sampled positions into a dictionary mapping the keys
+        of the objects to their trajectories.
+
+        Parameters:
+            simplify: whether to simplify the trajectories by removing
+                excess samples that are identical to previous ones
+        """
+        if self.positions is None:
+            raise RuntimeError("positions were not sampled")
+
+        result = {}
+        for index, key in enumerate(self.keys):
+            trajectory = Trajectory.from_arrays(self.times, self.positions[:, index, :])
+            result[key] = trajectory.simplify_in_place() if simplify else trajectory
+
+        return result
+
+    def as_light_programs(self, *, simplify: bool = False) -> Dict[Any, LightProgram]:
+        """Converts the sampled colors into a dictionary mapping the keys
+        of the objects to their light programs.
+
+        Parameters:
+            simplify: whether to simplify the light programs by removing
+                unnecessary keypoints
+        """
+        if self.colors is None:
+            raise RuntimeError("colors were not sampled")
+
+        result = {}
+        for index, key in enumerate(self.keys):
+            light_program = LightProgram.from_arrays(
+                self.times, self.colors[:, index, :]
+            )
+            result[key] = light_program.simplify() if simplify else light_program
+
+        return result
+
+    def as_yaw_setpoint_lists(
+        self, *, simplify: bool = False
+    ) -> Dict[Any, YawSetpointList]:
+        """Converts the sampled yaw angles into a dictionary mapping the keys
+        of the objects to their yaw setpoint lists.
+
+        Parameters:
+            simplify: whether to simplify the yaw setpoint lists by removing
+                intermediate points on constant angular speed segments
+        """
+        if self.yaw_angles is None:
+            raise RuntimeError("yaw angles were not sampled")
+
+        result = {}
+        for index, key in enumerate(self.keys):
+            setpoints = YawSetpointList.from_arrays(
+                self.times, self.yaw_angles[:, index]
+            )
+            result[key] = setpoints.simplify() if simplify else setpoints
+
+        return result
 
 
 @with_context
@@ -66,6 +170,175 @@ def each_frame_in(
         yield frame, time
 
 
+@dataclass
+class SamplingRequest:
+    """Specification of a set of frames to sample and the channels to sample
+    in those frames, used by `sample_objects_in_single_pass()`.
+    """
+
+    frames: Iterable[int]
+    """The indices of the frames to sample."""
+
+    positions: bool = False
+    """Whether to sample the positions of the objects in these frames."""
+
+    colors: bool = False
+    """Whether to sample the LED light colors of the objects in these frames."""
+
+    yaw: bool = False
+    """Whether to sample the yaw angles of the objects in these frames."""
+
+
+@with_context
+def sample_objects(
+    objects: Sequence[Object],
+    frames: Iterable[int],
+    *,
+    positions: bool = True,
+    colors: bool = False,
+    yaw: bool = False,
+    by_name: bool = False,
+    context: Optional[Context] = None,
+) -> ObjectSamples:
+    """Samples the positions, colors and/or yaw angles of the given Blender
+    objects at the given frames into preallocated NumPy arrays.
+
+    This is the sampling engine behind all the other sampling functions in this
+    module. It does not create any model objects; use the conversion methods of
+    the returned ObjectSamples_ instance if you need them.
+
+    Parameters:
+        objects: the Blender objects to process
+        frames: an iterable yielding the indices of the frames to process
+        positions: whether to sample the positions of the objects
+        colors: whether to sample the LED light colors of the objects
+        yaw: whether to sample the yaw angles of the objects
+        by_name: whether the keys of the result should be the _names_ of the
+            objects
+        context: the Blender execution context; `None` means the current
+            Blender context
+
+    Returns:
+        the sampled data
+    """
+    request = SamplingRequest(frames, positions=positions, colors=colors, yaw=yaw)
+    (result,) = sample_objects_in_single_pass(
+        objects, [request], by_name=by_name, context=context
+    )
+    return result
+
+
+@with_context
+def sample_objects_in_single_pass(
+    objects: Sequence[Object],
+    requests: Sequence[SamplingRequest],
+    *,
+    by_name: bool = False,
+    context: Optional[Context] = None,
+) -> List[ObjectSamples]:
+    """Samples the given Blender objects according to multiple sampling
+    requests, each with its own set of frames and channels, while visiting
+    each frame in the union of the requested frames only once.
+
+    This allows one to sample trajectories and light programs with different
+    frame rates without iterating over the timeline twice. When at least one
+    of the requests samples colors, light effects are suspended in frames that
+    do not feed any of the color channels.
+
+    Parameters:
+        objects: the Blender objects to process
+        requests: the sampling requests to fulfill
+        by_name: whether the keys of the results should be the _names_ of the
+            objects
+        context: the Blender execution context; `None` means the current
+            Blender context
+
+    Returns:
+        the sampled data, one item for each sampling request, in the same order
+        as the requests
+    """
+    assert context is not None  # injected
+
+    keys = [obj.name if by_name else obj for obj in objects]
+    num_objects = len(objects)
+
+    # Tag each frame with the (result, row index) pairs that it feeds
+    results: List[ObjectSamples] = []
+    targets: Dict[int, List[Tuple[ObjectSamples, int]]] = defaultdict(list)
+    for request in requests:
+        frames = list(request.frames)
+        num_frames = len(frames)
+        result = ObjectSamples(
+            keys=keys,
+            times=empty((num_frames,), dtype=float64),
+            positions=(
+                empty((num_frames, num_objects, 3), dtype=float32)
+                if request.positions
+                else None
+            ),
+            colors=(
+                empty((num_frames, num_objects, 3), dtype=uint8)
+                if request.colors
+                else None
+            ),
+            yaw_angles=(
+                empty((num_frames, num_objects), dtype=float64) if request.yaw else None
+            ),
+        )
+        results.append(result)
+        for row, frame in enumerate(frames):
+            targets[frame].append((result, row))
+
+    any_colors = any(result.colors is not None for result in results)
+
+    # Scratch buffers for a single frame
+    xyz = empty((num_objects, 3), dtype=float32)
+    rgb = empty((num_objects, 3), dtype=float64)
+    yaw = empty((num_objects,), dtype=float64)
+
+    scene = context.scene
+    fps = scene.render.fps
+
+    for frame in sorted(targets):
+        frame_targets = targets[frame]
+        needs_positions = any(r.positions is not None for r, _ in frame_targets)
+        needs_colors = any(r.colors is not None for r, _ in frame_targets)
+        needs_yaw = any(r.yaw_angles is not None for r, _ in frame_targets)
+
+        if any_colors and not needs_colors:
+            with suspended_light_effects():
+                scene.frame_set(frame)
+        else:
+            scene.frame_set(frame)
+
+        if needs_positions:
+            for index, obj in enumerate(objects):
+                xyz[index] = get_position_of_object(obj)
+
+        if needs_colors:
+            for index, obj in enumerate(objects):
+                rgb[index] = get_led_light_color(obj)[:3]
+            rgb *= 255
+            rint(rgb, out=rgb)
+            rgb.clip(0, 255, out=rgb)
+
+        if needs_yaw:
+            for index, obj in enumerate(objects):
+                yaw[index] = get_xyz_euler_rotation_of_object(obj)[2]
+
+        time = frame / fps
+        for result, row in frame_targets:
+            result.times[row] = time
+            if result.positions is not None:
+                result.positions[row] = xyz
+            if result.colors is not None:
+                result.colors[row] = rgb
+            if result.yaw_angles is not None:
+                result.yaw_angles[row] = yaw
+
+    return results
+
+
 @with_context
 def sample_positions_of_objects(
     objects: Sequence[Object],
@@ -93,17 +366,8 @@ def sample_positions_of_objects(
     Returns:
         a dictionary mapping the objects to their trajectories
     """
-    trajectories = defaultdict(Trajectory)
-
-    for _, time in each_frame_in(frames, context=context):
-        for obj in objects:
-            key = obj.name if by_name else obj
-            trajectories[key].append(Point4D(time, *get_position_of_object(obj)))
-
-    if simplify:
-        return {key: value.simplify_in_place() for key, value in trajectories.items()}
-    else:
-        return dict(trajectories)
+    samples = sample_objects(objects, frames, by_name=by_name, context=context)
+    return samples.as_trajectories(simplify=simplify)
 
 
 @with_context
@@ -133,31 +397,15 @@ def sample_positions_and_yaw_of_objects(
     Returns:
         a dictionaries mapping the objects to their trajectories and yaw setpoints
     """
-    trajectories = defaultdict(Trajectory)
-    yaw_setpoints = defaultdict(YawSetpointList)
-
-    for _, time in each_frame_in(frames, context=context):
-        for obj in objects:
-            key = obj.name if by_name else obj
-            trajectories[key].append(Point4D(time, *get_position_of_object(obj)))
-            yaw_setpoints[key].append(
-                YawSetpoint(time, get_xyz_euler_rotation_of_object(obj)[2])
-            )
-
-    if simplify:
-        return {
-            key: (
-                trajectory.simplify_in_place(),
-                yaw_setpoints[key].simplify(),
-            )
-            for key, trajectory in trajectories.items()
-        }
-
-    else:
-        return {
-            key: (trajectory, yaw_setpoints[key])
-            for key, trajectory in trajectories.items()
-        }
+    samples = sample_objects(
+        objects, frames, yaw=True, by_name=by_name, context=context
+    )
+    trajectories = samples.as_trajectories(simplify=simplify)
+    yaw_setpoints = samples.as_yaw_setpoint_lists(simplify=simplify)
+    return {
+        key: (trajectory, yaw_setpoints[key])
+        for key, trajectory in trajectories.items()
+    }
 
 
 @with_context
@@ -187,25 +435,10 @@ def sample_colors_of_objects(
     Returns:
         a dictionary mapping the objects to their light programs
     """
-    lights = defaultdict(LightProgram)
-
-    for _, time in each_frame_in(frames, context=context):
-        for obj in objects:
-            key = obj.name if by_name else obj
-            color = get_led_light_color(obj)
-            lights[key].append(
-                Color4D(
-                    time,
-                    _to_int_255(color[0]),
-                    _to_int_255(color[1]),
-                    _to_int_255(color[2]),
-                )
-            )
-
-    if simplify:
-        return {key: value.simplify() for key, value in lights.items()}
-    else:
-        return dict(lights)
+    samples = sample_objects(
+        objects, frames, positions=False, colors=True, by_name=by_name, context=context
+    )
+    return samples.as_light_programs(simplify=simplify)
 
 
 @with_context
@@ -236,33 +469,12 @@ def sample_positions_and_colors_of_objects(
     Returns:
         a dictionary mapping the objects to their trajectories and light programs
     """
-    trajectories = defaultdict(Trajectory)
-    lights = defaultdict(LightProgram)
-
-    for _, time in each_frame_in(frames, context=context):
-        for obj in objects:
-            key = obj.name if by_name else obj
-            pos = get_position_of_object(obj)
-            color = get_led_light_color(obj)
-            trajectories[key].append(Point4D(time, *pos))
-            lights[key].append(
-                Color4D(
-                    time,
-                    _to_int_255(color[0]),
-                    _to_int_255(color[1]),
-                    _to_int_255(color[2]),
-                )
-            )
-
-    if simplify:
-        return {
-            key: (trajectory.simplify_in_place(), lights[key].simplify())
-            for key, trajectory in trajectories.items()
-        }
-    else:
-        return {
-            key: (trajectory, lights[key]) for key, trajectory in trajectories.items()
-        }
+    samples = sample_objects(
+        objects, frames, colors=True, by_name=by_name, context=context
+    )
+    trajectories = samples.as_trajectories(simplify=simplify)
+    lights = samples.as_light_programs(simplify=simplify)
+    return {key: (trajectory, lights[key]) for key, trajectory in trajectories.items()}
 
 
 @with_context
@@ -294,41 +506,16 @@ def sample_positions_colors_and_yaw_of_objects(
     Returns:
         a dictionary mapping the objects to their trajectories and light programs
     """
-    trajectories = defaultdict(Trajectory)
-    lights = defaultdict(LightProgram)
-    yaw_setpoints = defaultdict(YawSetpointList)
-
-    for _, time in each_frame_in(frames, context=context):
-        for obj in objects:
-            key = obj.name if by_name else obj
-            pos = get_position_of_object(obj)
-            color = get_led_light_color(obj)
-            rotation = get_xyz_euler_rotation_of_object(obj)
-            trajectories[key].append(Point4D(time, *pos))
-            lights[key].append(
-                Color4D(
-                    time,
-                    _to_int_255(color[0]),
-                    _to_int_255(color[1]),
-                    _to_int_255(color[2]),
-                )
-            )
-            yaw_setpoints[key].append(YawSetpoint(time, rotation[2]))
-
-    if simplify:
-        return {
-            key: (
-                trajectory.simplify_in_place(),
-                lights[key].simplify(),
-                yaw_setpoints[key].simplify(),
-            )
-            for key, trajectory in trajectories.items()
-        }
-    else:
-        return {
-            key: (trajectory, lights[key], yaw_setpoints[key])
-            for key, trajectory in trajectories.items()
-        }
+    samples = sample_objects(
+        objects, frames, colors=True, yaw=True, by_name=by_name, context=context
+    )
+    trajectories = samples.as_trajectories(simplify=simplify)
+    lights = samples.as_light_programs(simplify=simplify)
+    yaw_setpoints = samples.as_yaw_setpoint_lists(simplify=simplify)
+    return {
+        key: (trajectory, lights[key], yaw_setpoints[key])
+        for key, trajectory in trajectories.items()
+    }
 
 
 @with_context
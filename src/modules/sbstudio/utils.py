@@ -4,6 +4,7 @@ from collections import OrderedDict
 from collections.abc import MutableMapping
 from functools import wraps
 from pathlib import Path
+from numpy import ndarray
 from typing import Any, Callable, List, Sequence, TypeVar
 
 from sbstudio.model.types import Coordinate3D
@@ -14,6 +15,7 @@ __all__ = (
     "create_path_and_open",
     "distance_sq_of",
     "simplify_path",
+    "simplify_path_indices",
 )
 
 T = TypeVar("T")
@@ -58,7 +60,10 @@ def negate(func: Callable[..., bool]) -> Callable[..., bool]:
 
 
 def simplify_path(
-    points: Sequence[T], *, eps: float, distance_func: Callable[[List[T], T, T], float]
+    points: Sequence[T],
+    *,
+    eps: float,
+    distance_func: Callable[[Sequence[T], T, T], Sequence[float]],
 ) -> Sequence[T]:
     """Simplifies a sequence of points to a similar sequence with fewer
     points, using a distance function and an acceptable error term.
@@ -69,39 +74,93 @@ def simplify_path(
     Parameters:
         points: a sequence of points. Each point may be an arbitrary object
             as long as the distance function can deal with it appropriately.
+            NumPy arrays are supported as well; in this case the distance
+            function receives views into the array.
         eps: the error term; a point is considered redundant with
             respect to two other points if the point is closer to the line
             formed by the two other points than this error term.
-        distance_func: a callable that receives a _list_ of points and two
-            additional points, and returns the distance of _each_ point in the
-            list from the line formed by the two additional points.
+        distance_func: a callable that receives a slice of the sequence
+            containing the points strictly between two points of the sequence,
+            and the two points themselves, and returns the distance of _each_
+            point in the slice from the line formed by the two points. The
+            distances may be returned as a NumPy array.
 
     Returns:
         the simplified sequence of points. This will be of the same class as the
         input sequence. It is assumed that an instance of the sequence may be
-        constructed from a list of items.
+        constructed from a list of items, unless the input is a NumPy array.
+        A sequence consisting of a single point is returned with the point
+        duplicated.
     """
-    if not points:
-        result = []
+    indices = simplify_path_indices(
+        len(points),
+        eps=eps,
+        distance_func=lambda start, end: distance_func(
+            points[start + 1 : end], points[start], points[end]
+        ),
+    )
+
+    if isinstance(points, ndarray):
+        return points[indices]
     else:
-        # TODO(ntamas): find constant segments and keep those first
-        result = _simplify_line(points, eps=eps, distance_func=distance_func)
+        return points.__class__([points[index] for index in indices])
 
-    return points.__class__(result)
 
+def simplify_path_indices(
+    num_points: int,
+    *,
+    eps: float,
+    distance_func: Callable[[int, int], Sequence[float]],
+) -> List[int]:
+    """Runs the Ramer-Douglas-Peucker algorithm on a sequence of points,
+    identified by their indices only, and returns the indices of the points
+    that are kept.
 
-def _simplify_line(points, *, eps, distance_func):
-    start, end = points[0], points[-1]
-    dists = distance_func(points, start, end)
-    index = max(range(len(dists)), key=dists.__getitem__)
-    dmax = dists[index]
+    The algorithm is iterative and processes the segments with an explicit
+    stack, so it works with arbitrarily long sequences without running into
+    the recursion limit of Python, and it never copies the sequence itself.
 
-    if dmax <= eps:
-        return [start, end]
-    else:
-        pre = _simplify_line(points[: index + 1], eps=eps, distance_func=distance_func)
-        post = _simplify_line(points[index:], eps=eps, distance_func=distance_func)
-        return pre[:-1] + post
+    Parameters:
+        num_points: the number of points in the sequence
+        eps: the error term; a point is considered redundant with
+            respect to two other points if the point is closer to the line
+            formed by the two other points than this error term.
+        distance_func: a callable that receives the indices of two points,
+            `start` and `end`, and returns the distance of each point with
+            index `start + 1`, ..., `end - 1` from the line formed by the
+            two points, preferably as a NumPy array
+
+    Returns:
+        the indices of the points that are kept, in increasing order. The
+        index of the only point is returned twice if the sequence consists of
+        a single point.
+    """
+    if num_points <= 0:
+        return []
+    elif num_points == 1:
+        return [0, 0]
+
+    keep = [0, num_points - 1]
+    stack = [(0, num_points - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        dists = distance_func(start, end)
+        if isinstance(dists, ndarray):
+            index = int(dists.argmax())
+        else:
+            index = max(range(len(dists)), key=dists.__getitem__)
+
+        if dists[index] > eps:
+            index += start + 1
+            keep.append(index)
+            stack.append((start, index))
+            stack.append((index, end))
+
+    keep.sort()
+    return keep
 
 
 def load_module(path: str) -> Any:
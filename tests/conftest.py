@@ -0,0 +1,12 @@
+"""Test configuration that makes the modules of the add-on importable without
+installing them into Blender.
+
+Tests that need Blender-specific modules (``bpy``, ``mathutils``) are skipped
+when those modules are not available.
+"""
+
+import sys
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "modules"))
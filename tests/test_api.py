@@ -0,0 +1,94 @@
+import gzip
+import json
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from threading import Thread
+from time import sleep
+from pytest import fixture, importorskip
+
+importorskip("mathutils")
+
+from sbstudio.api.base import SkybrushStudioAPI
+from sbstudio.api.types import TransferStats
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """Request handler that responds with the decoded JSON request body."""
+
+    def do_POST(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = b""
+            while True:
+                size = int(self.rfile.readline(), 16)
+                chunk = self.rfile.read(size + 2)[:-2]
+                if not size:
+                    break
+                body += chunk
+        else:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+
+        response = json.dumps(json.loads(gzip.decompress(body))).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@fixture
+def api():
+    server = HTTPServer(("127.0.0.1", 0), EchoHandler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield SkybrushStudioAPI(f"http://127.0.0.1:{server.server_port}/api/v1")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def send(api, data, *, stream):
+    stats = TransferStats()
+    with api._send_request("echo", data, stream=stream, stats=stats) as response:
+        assert response.as_json() == data
+    return stats
+
+
+def test_transfer_stats_of_request_that_is_not_streamed(api):
+    data = {"values": list(range(10000))}
+
+    stats = send(api, data, stream=False)
+
+    assert not stats.is_streamed
+    assert stats.uncompressed_bytes == len(json.dumps(data))
+    assert 0 < stats.compressed_bytes < stats.uncompressed_bytes
+    assert stats.upload_started_at is not None
+    assert stats.upload_finished_at is None
+    assert stats.upload_started_at <= stats.response_started_at
+    assert stats.response_started_at <= stats.response_finished_at
+
+    # The end of the upload is not known so neither is the upload rate, no
+    # matter when it is queried
+    assert stats.upload_rate is None
+    sleep(0.01)
+    assert stats.upload_rate is None
+
+
+def test_transfer_stats_of_streamed_request(api):
+    data = {"values": list(range(10000))}
+
+    stats = send(api, data, stream=True)
+
+    assert stats.is_streamed
+    assert stats.uncompressed_bytes == len(json.dumps(data))
+    assert stats.upload_finished_at is not None
+    assert stats.upload_started_at <= stats.upload_finished_at
+    assert stats.upload_finished_at <= stats.response_started_at
+
+    rate = stats.upload_rate
+    assert rate is not None and rate > 0
+    sleep(0.01)
+    assert stats.upload_rate == rate
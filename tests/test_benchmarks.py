@@ -0,0 +1,46 @@
+import sys
+
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+from pytest import importorskip, mark
+
+BENCHMARKS = Path(__file__).resolve().parent.parent / "etc" / "benchmarks"
+
+#: Settings that make each benchmark script run in a fraction of a second:
+#: whether it needs mathutils, command line arguments and module attributes
+#: to override
+SETTINGS = {
+    "memory": (
+        True,
+        ["--", "--drones", "5", "--duration", "2", "--measured-drones", "2"],
+        {},
+    ),
+    "nearest_neighbors": (False, [], {"NUM_POINTS": (50, 200), "NUM_REPEATS": 1}),
+    "serialization": (
+        True,
+        [],
+        {"NUM_DRONES": 2, "NUM_POINTS": 20, "NUM_REPEATS": 1},
+    ),
+}
+
+
+def test_all_benchmarks_are_tested():
+    assert sorted(path.stem for path in BENCHMARKS.glob("*.py")) == sorted(SETTINGS)
+
+
+@mark.parametrize("name", sorted(SETTINGS))
+def test_benchmark(name, monkeypatch, capsys):
+    needs_mathutils, argv, overrides = SETTINGS[name]
+    if needs_mathutils:
+        importorskip("mathutils")
+
+    spec = spec_from_file_location(f"benchmark_{name}", BENCHMARKS / f"{name}.py")
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    for key, value in overrides.items():
+        monkeypatch.setattr(module, key, value)
+    monkeypatch.setattr(sys, "argv", [spec.origin, *argv])
+
+    module.main()
+
+    assert capsys.readouterr().out
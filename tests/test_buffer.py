@@ -0,0 +1,84 @@
+from numpy import arange, array, float64, uint8, zeros
+from numpy.testing import assert_array_equal
+from pytest import raises
+
+from sbstudio.model.buffer import ColumnBuffer, ItemSequence, get_time_order
+
+
+def test_append_grows_buffer():
+    buffer = ColumnBuffer(zeros((0, 2)), zeros((0, 3), dtype=uint8))
+
+    for index in range(100):
+        buffer.append((index, -index), (index, index, index))
+
+    assert len(buffer) == 100
+    times, colors = buffer.columns
+    assert_array_equal(times[:, 0], arange(100))
+    assert_array_equal(colors[:, 2], arange(100))
+    assert colors.dtype == uint8
+
+
+def test_columns_are_read_only():
+    buffer = ColumnBuffer(arange(5, dtype=float64))
+    column = buffer.column()
+
+    with raises(ValueError):
+        column[0] = 42
+
+    buffer.writable_column()[0] = 42
+    assert buffer.column()[0] == 42
+
+
+def test_copy():
+    data = arange(5, dtype=float64)
+
+    ColumnBuffer(data).writable_column()[0] = 42
+    assert data[0] == 0
+
+    ColumnBuffer(data, copy=False).writable_column()[0] = 42
+    assert data[0] == 42
+
+
+def test_take():
+    buffer = ColumnBuffer(arange(10, dtype=float64))
+
+    sliced = buffer.take(slice(2, 5))
+    assert_array_equal(sliced.column(), [2, 3, 4])
+
+    # Slices share their items with the original buffer until they grow
+    buffer.writable_column()[3] = 42
+    assert sliced.column()[1] == 42
+    sliced.append(5)
+    buffer.writable_column()[2] = 42
+    assert_array_equal(sliced.column(), [2, 42, 4, 5])
+    assert len(buffer) == 10
+
+    masked = buffer.take(array([True, False] * 5))
+    assert_array_equal(masked.column(), [0, 42, 4, 6, 8])
+
+
+def test_mismatched_columns():
+    with raises(ValueError):
+        ColumnBuffer()
+    with raises(ValueError):
+        ColumnBuffer(zeros(3), zeros(4))
+
+
+def test_item_sequence():
+    times = array([0.0, 1.0, 2.0])
+    values = array([[1, 2], [3, 4], [5, 6]])
+    items = ItemSequence(lambda t, value: (t, tuple(value)), times, values)
+
+    assert len(items) == 3
+    assert items[1] == (1.0, (3, 4))
+    assert items[-1] == (2.0, (5, 6))
+    assert items[1:] == [(1.0, (3, 4)), (2.0, (5, 6))]
+    assert list(items) == [(0.0, (1, 2)), (1.0, (3, 4)), (2.0, (5, 6))]
+    assert items == list(items)
+    assert items == ItemSequence(lambda t, value: (t, tuple(value)), times, values)
+
+
+def test_get_time_order():
+    assert get_time_order(array([])) is None
+    assert get_time_order(array([1.0, 1.0, 2.0])) is None
+    assert_array_equal(get_time_order(array([2.0, 1.0, 2.0, 0.0])), [3, 1, 0, 2])
@@ -0,0 +1,112 @@
+from math import hypot
+from numpy import arange, float64, stack, zeros
+from numpy.random import default_rng
+from numpy.testing import assert_allclose
+from pytest import raises
+
+from sbstudio.math.kinematics import (
+    get_kinematic_peaks,
+    get_kinematics,
+    get_velocities,
+)
+
+
+def random_swarm(seed, num_frames, num_drones):
+    rng = default_rng(seed)
+    steps = rng.normal(0, 0.1, size=(num_frames, num_drones, 3))
+    times = arange(num_frames, dtype=float64) / 25
+    return steps.cumsum(axis=0), times
+
+
+def reference_velocities(positions, times):
+    """Backward differences computed drone by drone and frame by frame."""
+    num_frames, num_drones, _ = positions.shape
+    result = zeros(positions.shape)
+    for frame in range(1, num_frames):
+        dt = times[frame] - times[frame - 1]
+        for drone in range(num_drones):
+            for axis in range(3):
+                result[frame, drone, axis] = (
+                    positions[frame, drone, axis] - positions[frame - 1, drone, axis]
+                ) / dt
+    return result
+
+
+def test_velocities_match_reference():
+    positions, times = random_swarm(0, 50, 7)
+    times[10:] += 0.5
+
+    assert_allclose(
+        get_velocities(positions, times), reference_velocities(positions, times)
+    )
+    assert_allclose(
+        get_velocities(positions.astype("float32"), times),
+        reference_velocities(positions.astype("float32"), times),
+    )
+
+
+def test_kinematics_of_uniformly_accelerating_drone():
+    times = arange(20, dtype=float64) / 10
+    zs = 0.5 * 2.0 * times**2
+    positions = stack([times * 3, times * 4, zs], axis=1)[:, None, :]
+
+    kinematics = get_kinematics(positions, times)
+
+    assert_allclose(kinematics.velocity_xy[1:, 0], 5.0)
+    # Backward differences lag behind by half a frame
+    assert_allclose(kinematics.velocity_z[1:, 0], 2.0 * (times[1:] - 0.05))
+    assert_allclose(kinematics.acceleration_z[2:, 0], 2.0)
+    assert_allclose(kinematics.acceleration_xy[2:, 0], 0.0, atol=1e-9)
+    assert_allclose(kinematics.jerk_z[3:, 0], 0.0, atol=1e-9)
+    assert (kinematics.velocity[0] == 0).all()
+    assert (kinematics.acceleration[:2] == 0).all()
+    assert (kinematics.jerk[:3] == 0).all()
+
+
+def test_kinematic_peaks_match_brute_force():
+    positions, times = random_swarm(1, 300, 20)
+    velocities = reference_velocities(positions, times)
+
+    peaks = get_kinematic_peaks(positions, times, chunk_size=37)
+
+    expected = max(
+        (hypot(velocities[frame, drone, 0], velocities[frame, drone, 1]), drone, frame)
+        for frame in range(len(times))
+        for drone in range(positions.shape[1])
+    )
+    assert_allclose(peaks.velocity_xy.value, expected[0])
+    assert (peaks.velocity_xy.drone, peaks.velocity_xy.frame) == expected[1:]
+    assert peaks.velocity_xy.time == times[expected[2]]
+
+    expected = min(
+        (velocities[frame, drone, 2], drone, frame)
+        for frame in range(len(times))
+        for drone in range(positions.shape[1])
+    )
+    assert_allclose(peaks.velocity_z_down.value, -expected[0])
+    assert (peaks.velocity_z_down.drone, peaks.velocity_z_down.frame) == expected[1:]
+
+
+def test_kinematic_peaks_do_not_depend_on_chunk_size():
+    positions, times = random_swarm(2, 200, 10)
+
+    expected = get_kinematics(positions, times).get_peaks()
+    for chunk_size in (1, 2, 3, 4, 50, 199, 200, 1000):
+        assert get_kinematic_peaks(positions, times, chunk_size=chunk_size) == expected
+
+
+def test_kinematic_peaks_of_empty_swarm():
+    peaks = get_kinematic_peaks(zeros((0, 0, 3)), [])
+    assert peaks.velocity_xy is None
+
+    peaks = get_kinematic_peaks(zeros((10, 0, 3)), arange(10))
+    assert peaks.jerk_z is None
+
+
+def test_invalid_inputs():
+    with raises(ValueError):
+        get_velocities(zeros((10, 5, 2)), arange(10))
+    with raises(ValueError):
+        get_velocities(zeros((10, 5, 3)), arange(9))
+    with raises(ValueError):
+        get_kinematic_peaks(zeros((3, 5, 3)), [0, 1, 1])
@@ -0,0 +1,64 @@
+from math import inf, isnan, nan
+from numpy import array, float64
+from numpy.random import default_rng
+
+from sbstudio.math.rounding import round_array
+
+
+def assert_same_as_round(values, ndigits):
+    result = round_array(values, ndigits).tolist()
+    assert result == [round(value, ndigits) for value in values]
+
+
+def test_round_array_matches_round_on_random_values():
+    rng = default_rng(0)
+    values = (rng.normal(0, 1000, size=10000)).tolist()
+    for ndigits in range(0, 7):
+        assert_same_as_round(values, ndigits)
+
+
+def test_round_array_matches_round_at_halfway_points():
+    # Values that are (almost) halfway between two rounded values are where
+    # numpy.around() and round() may disagree
+    values = [
+        0.5,
+        1.5,
+        2.5,
+        -0.5,
+        -2.5,
+        0.125,
+        0.375,
+        1.0005,
+        2.675,
+        1.0049999999999999,
+        0.285,
+        1.015,
+        5e-324,
+        123456.7885,
+    ]
+    values += [index / 1000 + 0.0005 for index in range(-2000, 2000)]
+    values += [index / 40 for index in range(-400, 400)]
+    for ndigits in range(0, 5):
+        assert_same_as_round(values, ndigits)
+
+
+def test_round_array_with_large_values():
+    values = [2.0**52 + 0.5, 2.0**53, 1e20, -1e300, 1.7976931348623157e308]
+    for ndigits in (0, 3, 10):
+        assert_same_as_round(values, ndigits)
+
+
+def test_round_array_with_non_finite_values():
+    result = round_array([inf, -inf, nan], 3).tolist()
+    assert result[:2] == [inf, -inf]
+    assert isnan(result[2])
+
+
+def test_round_array_keeps_shape():
+    values = array([[1.23456, 2.34567], [3.45678, 4.56789]], dtype=float64)
+
+    result = round_array(values, 2)
+
+    assert result.shape == (2, 2)
+    assert result.tolist() == [[1.23, 2.35], [3.46, 4.57]]
+    assert values[0, 0] == 1.23456
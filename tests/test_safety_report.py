@@ -0,0 +1,214 @@
+import csv
+import json
+
+from math import dist, hypot, inf
+from numpy import arange, float64, stack
+from numpy.random import default_rng
+from numpy.testing import assert_allclose, assert_array_equal
+from pytest import fixture, importorskip, raises
+
+importorskip("mathutils")
+
+from sbstudio.model.safety_check import SafetyCheckParams
+from sbstudio.model.safety_report import (
+    SafetyViolationType,
+    create_safety_report,
+    create_safety_report_from_trajectories,
+)
+from sbstudio.model.trajectory import Trajectory
+
+
+@fixture
+def show():
+    rng = default_rng(0)
+    num_frames, num_drones = 120, 12
+    times = arange(num_frames, dtype=float64) / 10
+    start = rng.uniform(0, 20, size=(num_drones, 3))
+    steps = rng.normal(0, 0.3, size=(num_frames, num_drones, 3))
+    steps[0] = 0
+    positions = start + steps.cumsum(axis=0)
+    names = [f"drone{index}" for index in range(num_drones)]
+    return positions, times, names
+
+
+def reference_violations(positions, times, names, params):
+    """Checks the frames of a show one by one, drone by drone."""
+    result = []
+    num_frames, num_drones, _ = positions.shape
+
+    def check(type, frame, values, limit, *, inclusive=False):
+        drones = [
+            index
+            for index, value in enumerate(values)
+            if value > limit or (inclusive and value == limit)
+        ]
+        if drones:
+            value = max(values[index] for index in drones)
+            result.append((type, frame, value, tuple(names[index] for index in drones)))
+
+    for frame in range(num_frames):
+        points = positions[frame].tolist()
+        pairs = [
+            (dist(points[i], points[j]), i, j)
+            for i in range(num_drones)
+            for j in range(i + 1, num_drones)
+        ]
+        distance, i, j = min(pairs)
+        if distance < params.min_distance:
+            result.append(("proximity", frame, distance, (names[i], names[j])))
+
+        check(
+            "altitude",
+            frame,
+            [point[2] for point in points],
+            params.max_altitude,
+            inclusive=True,
+        )
+
+        if frame > 0:
+            dt = times[frame] - times[frame - 1]
+            prev = positions[frame - 1].tolist()
+            vs = [
+                [(p - q) / dt for p, q in zip(point, prev_point)]
+                for point, prev_point in zip(points, prev)
+            ]
+        else:
+            vs = [[0.0, 0.0, 0.0] for _ in points]
+        check(
+            "velocity_xy",
+            frame,
+            [hypot(v[0], v[1]) for v in vs],
+            params.max_velocity_xy,
+        )
+        check("velocity_z_up", frame, [v[2] for v in vs], params.max_velocity_z)
+        check("velocity_z_down", frame, [-v[2] for v in vs], params.max_velocity_z)
+    return result
+
+
+def as_tuples(violations):
+    return [
+        (violation.type.value, violation.frame, violation.value, violation.drones)
+        for violation in violations
+    ]
+
+
+def test_report_matches_brute_force(show):
+    positions, times, names = show
+    params = SafetyCheckParams(
+        max_altitude=18, max_velocity_xy=6, max_velocity_z=4, min_distance=2.5
+    )
+    expected = reference_violations(positions, times, names, params)
+    assert expected
+
+    for chunk_size in (1, 7, 256):
+        report = create_safety_report(
+            positions, times, names, params, chunk_size=chunk_size
+        )
+        violations = as_tuples(report.violations)
+
+        assert [item[:2] for item in violations] == [item[:2] for item in expected]
+        assert [item[3] for item in violations] == [item[3] for item in expected]
+        assert_allclose(
+            [item[2] for item in violations], [item[2] for item in expected]
+        )
+
+    assert_allclose(report.max_altitude, positions[:, :, 2].max(axis=1))
+    assert_allclose(report.min_altitude, positions[:, :, 2].min(axis=1))
+    for frame in (0, 50, 119):
+        points = positions[frame].tolist()
+        distance, i, j = min(
+            (dist(points[i], points[j]), i, j)
+            for i in range(len(names))
+            for j in range(i + 1, len(names))
+        )
+        assert_allclose(report.min_distance[frame], distance)
+        assert report.closest_pair[frame].tolist() == [i, j]
+
+
+def test_report_with_disabled_limits(show):
+    positions, times, names = show
+    params = SafetyCheckParams(
+        max_altitude=inf, max_velocity_xy=inf, max_velocity_z=inf, min_distance=0
+    )
+
+    report = create_safety_report(positions, times, names, params)
+
+    assert report.violations == []
+    result = report.as_dict()
+    assert result["params"]["maxAltitude"] is None
+    assert result["params"]["maxVelocityXY"] is None
+    json.dumps(result, allow_nan=False)
+
+
+def test_report_from_trajectories(show):
+    positions, times, names = show
+    params = SafetyCheckParams(min_distance=2.5, max_velocity_xy=6)
+    trajectories = {
+        name: Trajectory.from_arrays(times, positions[:, index])
+        for index, name in enumerate(names)
+    }
+
+    expected = create_safety_report(positions, times, names, params, frames=times * 10)
+    report = create_safety_report_from_trajectories(
+        trajectories, times, params, frames=times * 10
+    )
+
+    assert report.names == names
+    assert_array_equal(report.frames, expected.frames)
+    assert_allclose(report.min_distance, expected.min_distance)
+    assert_allclose(report.max_velocity_xy, expected.max_velocity_xy)
+    assert as_tuples(report.violations) == as_tuples(expected.violations)
+
+
+def test_get_violations(show):
+    positions, times, names = show
+    params = SafetyCheckParams(max_altitude=22, max_velocity_xy=6, min_distance=2.5)
+    report = create_safety_report(positions, times, names, params)
+
+    by_type = report.get_violations(sort_by="type")
+    assert (
+        sorted(
+            by_type, key=lambda v: (v.frame, list(SafetyViolationType).index(v.type))
+        )
+        == report.violations
+    )
+    proximity = report.get_violations(SafetyViolationType.PROXIMITY)
+    assert proximity and all(v.type is SafetyViolationType.PROXIMITY for v in proximity)
+    severity = [
+        abs(v.value - v.limit) for v in report.get_violations(sort_by="severity")
+    ]
+    assert severity == sorted(severity, reverse=True)
+
+    with raises(ValueError):
+        report.get_violations(sort_by="name")
+
+
+def test_write_report(show, tmp_path):
+    positions, times, names = show
+    params = SafetyCheckParams(max_altitude=22, min_distance=2.5)
+    report = create_safety_report(positions, times, names, params)
+
+    report.write_json(tmp_path / "report.json")
+    with open(tmp_path / "report.json") as fp:
+        assert json.load(fp) == report.as_dict()
+
+    report.write_csv(tmp_path / "report.csv")
+    with open(tmp_path / "report.csv", newline="") as fp:
+        rows = list(csv.DictReader(fp))
+    assert len(rows) == report.num_frames
+    frames_with_violations = {str(violation.frame) for violation in report.violations}
+    assert {row["frame"] for row in rows if row["violations"]} == frames_with_violations
+
+
+def test_report_with_less_than_two_drones():
+    times = arange(5, dtype=float64)
+    positions = stack([times, times, times], axis=1)[:, None, :]
+
+    report = create_safety_report(positions, times, ["drone"], SafetyCheckParams())
+
+    assert report.as_dict()["frames"][0]["closestPair"] is None
+    assert (report.min_distance == inf).all()
+    assert report.violations == []
+
+    with raises(ValueError):
+        create_safety_report(positions, times, ["a", "b"], SafetyCheckParams())
@@ -0,0 +1,44 @@
+from hashlib import sha1
+from types import SimpleNamespace
+from pytest import importorskip
+
+bpy = importorskip("bpy")
+
+from sbstudio.plugin.utils.sample_cache import _update_with_struct
+
+
+def color_function(path, name="color"):
+    """Creates a stand-in for the properties of a custom color function."""
+    properties = [
+        SimpleNamespace(identifier="path", type="STRING", subtype="FILE_PATH"),
+        SimpleNamespace(identifier="name", type="ENUM", subtype="NONE"),
+    ]
+    return SimpleNamespace(
+        bl_rna=SimpleNamespace(properties=properties), path=path, name=name
+    )
+
+
+def fingerprint(struct):
+    hasher = sha1()
+    _update_with_struct(hasher, struct, set(), 0)
+    return hasher.hexdigest()
+
+
+def test_fingerprint_depends_on_contents_of_color_function(tmp_path, monkeypatch):
+    monkeypatch.setattr(bpy.path, "abspath", lambda path: path)
+    script = tmp_path / "colors.py"
+    script.write_text("def color(*args):\n    return (1, 0, 0, 1)\n")
+    struct = color_function(str(script))
+
+    original = fingerprint(struct)
+    assert fingerprint(struct) == original
+
+    script.write_text("def color(*args):\n    return (0, 1, 0, 1)\n")
+    modified = fingerprint(struct)
+    assert modified != original
+
+    script.unlink()
+    missing = fingerprint(struct)
+    assert missing not in (original, modified)
+
+    assert fingerprint(color_function("")) != missing
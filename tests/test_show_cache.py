@@ -0,0 +1,117 @@
+from numpy import arange, array, float64, savez
+from numpy.random import default_rng
+from numpy.testing import assert_array_equal
+from pytest import fixture, importorskip, raises
+
+importorskip("mathutils")
+
+from sbstudio.model.light_program import LightProgram
+from sbstudio.model.show_cache import ShowCache, write_show_cache
+from sbstudio.model.time_markers import TimeMarkers
+from sbstudio.model.trajectory import Trajectory
+from sbstudio.model.yaw import YawSetpointList
+
+
+@fixture
+def show():
+    rng = default_rng(0)
+    names = ["drone1", "drone2", "drone3"]
+    # The second drone has no light keypoints and the third one has a single
+    # trajectory point to check the offsets of empty and short channels
+    lengths = {"drone1": 50, "drone2": 20, "drone3": 1}
+    trajectories = {
+        name: Trajectory.from_arrays(
+            arange(length) / 4, rng.normal(0, 10, size=(length, 3))
+        )
+        for name, length in lengths.items()
+    }
+    lights = {
+        "drone1": LightProgram.from_arrays(
+            arange(37) / 10,
+            rng.integers(0, 256, size=(37, 3)),
+            rng.random(37) < 0.5,
+        ),
+        "drone2": LightProgram(),
+        "drone3": LightProgram.from_arrays([0.0, 1.0], [[255, 0, 0], [0, 0, 255]]),
+    }
+    yaw_setpoints = {
+        name: YawSetpointList.from_arrays(
+            arange(length) / 2, rng.uniform(-720, 720, size=length)
+        )
+        for name, length in zip(names, (10, 3, 0))
+    }
+    time_markers = TimeMarkers({"start": 0.0, "end": 12.5})
+    return trajectories, lights, yaw_setpoints, time_markers
+
+
+def test_round_trip(show, tmp_path):
+    trajectories, lights, yaw_setpoints, time_markers = show
+    path = tmp_path / "show.npz"
+
+    write_show_cache(path, trajectories, lights, yaw_setpoints, time_markers)
+
+    with ShowCache(path) as cache:
+        assert cache.path == path
+        assert cache.names == list(trajectories)
+        assert list(cache.trajectories) == list(trajectories)
+        assert len(cache.lights) == len(lights)
+        for name, trajectory in trajectories.items():
+            assert_array_equal(cache.trajectories[name].array, trajectory.array)
+            assert_array_equal(cache.lights[name].times, lights[name].times)
+            assert_array_equal(cache.lights[name].rgb, lights[name].rgb)
+            assert_array_equal(cache.lights[name].fades, lights[name].fades)
+            assert_array_equal(
+                cache.yaw_setpoints[name].times, yaw_setpoints[name].times
+            )
+            assert_array_equal(
+                cache.yaw_setpoints[name].angles, yaw_setpoints[name].angles
+            )
+            assert cache.lights[name].as_dict() == lights[name].as_dict()
+            assert cache.trajectories[name].as_dict() == trajectories[name].as_dict()
+        assert cache.time_markers == time_markers
+
+
+def test_model_objects_are_constructed_once(show, tmp_path):
+    trajectories, lights, _, _ = show
+    path = tmp_path / "show.npz"
+    write_show_cache(path, trajectories, lights)
+
+    with ShowCache(path) as cache:
+        assert cache.trajectories is cache.trajectories
+        assert cache.trajectories["drone1"] is cache.trajectories["drone1"]
+        assert cache.lights["drone2"] is cache.lights["drone2"]
+        assert cache.yaw_setpoints is None
+
+        # Objects that were loaded before closing the cache stay accessible
+        trajectory = cache.trajectories["drone2"]
+    assert len(trajectory.points) == 20
+
+    with ShowCache(path) as cache, raises(KeyError):
+        cache.trajectories["no-such-drone"]
+
+
+def test_without_optional_channels(show, tmp_path):
+    trajectories, _, _, _ = show
+    path = tmp_path / "nested" / "show.npz"
+
+    write_show_cache(path, trajectories)
+
+    with ShowCache(path) as cache:
+        assert cache.lights is None
+        assert cache.yaw_setpoints is None
+        assert cache.time_markers == TimeMarkers()
+        assert_array_equal(
+            cache.trajectories["drone3"].array, trajectories["drone3"].array
+        )
+    assert not list(path.parent.glob("*.tmp.npz"))
+
+
+def test_invalid_files(tmp_path):
+    path = tmp_path / "other.npz"
+    savez(path, data=array([1.0, 2.0], dtype=float64))
+    with raises(RuntimeError, match="not a show cache file"):
+        ShowCache(path)
+
+    savez(path, version=array(42))
+    with raises(RuntimeError, match="version"):
+        ShowCache(path)
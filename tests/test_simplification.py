@@ -0,0 +1,227 @@
+from numpy import arange, array, float64, interp, repeat
+from numpy.random import default_rng
+from numpy.testing import assert_allclose, assert_array_equal
+from pytest import raises
+
+from sbstudio.math.simplification import (
+    get_light_program_keypoints,
+    get_trajectory_keypoints,
+    simplify_yaw_angles,
+)
+from sbstudio.utils import simplify_path
+
+
+def reference_static_hold_keypoints(positions):
+    """Loop that `Trajectory.simplify_in_place()` used to run to keep only the
+    first and the last sample of each run of identical positions; returns the
+    indices of the kept samples.
+    """
+    result = []
+    last_position = None
+    keep_next = False
+    for index, position in enumerate(positions):
+        prev_is_same = position == last_position
+        if keep_next or not prev_is_same:
+            result.append(index)
+        else:
+            result[-1] = index
+        keep_next = not prev_is_same
+        last_position = position
+    return result
+
+
+def reference_color_distances(keypoints, start, end):
+    """Distance function that `LightProgram.simplify()` used to pass to
+    `simplify_path()`, for `(t, r, g, b)` tuples.
+    """
+    timespan = end[0] - start[0]
+    result = []
+    for point in keypoints:
+        ratio = (point[0] - start[0]) / timespan if timespan > 0 else 0.5
+        result.append(
+            max(
+                abs(start[i] + ratio * (end[i] - start[i]) - point[i])
+                for i in range(1, 4)
+            )
+        )
+    return result
+
+
+def random_colors(seed, count):
+    rng = default_rng(seed)
+    # Fades between random colors, held colors and some noise
+    lengths = rng.integers(1, 10, size=count)
+    colors = repeat(rng.integers(0, 256, size=(count, 3)), lengths, axis=0)
+    noisy = rng.random(len(colors)) < 0.2
+    colors[noisy] = (colors[noisy] + rng.integers(-8, 9, size=(noisy.sum(), 3))).clip(
+        0, 255
+    )
+    times = arange(len(colors), dtype=float64) / 25
+    # Some colors change instantly
+    times[rng.random(len(times)) < 0.05] -= 0.02
+    times.sort()
+    return times, colors
+
+
+def reference_simplify_yaw(setpoints):
+    """Loop that `YawSetpointList.simplify()` used to run, for `(time, angle)`
+    tuples.
+    """
+    delta = setpoints[0][1] % 360 - setpoints[0][1]
+    setpoints = [(time, angle + delta) for time, angle in setpoints]
+
+    result = []
+    last_angular_speed = -1e12
+    for time, angle in setpoints:
+        if not result:
+            result.append((time, angle))
+            continue
+
+        dt = time - result[-1][0]
+        if dt <= 0:
+            raise RuntimeError("Yaw timestamps are not causal")
+        angular_speed = (round(angle, ndigits=3) - round(result[-1][1], ndigits=3)) / (
+            round(dt, ndigits=3)
+        )
+        if abs(angular_speed - last_angular_speed) < 1e-6:
+            result[-1] = (time, angle)
+        else:
+            result.append((time, angle))
+        last_angular_speed = angular_speed
+
+    return result
+
+
+def random_yaw(seed, count):
+    rng = default_rng(seed)
+    # Segments of constant angular speed, starting outside of [0; 360)
+    lengths = rng.integers(1, 8, size=count)
+    speeds = repeat(rng.choice([0.0, 15.0, -30.0, 7.5], size=count), lengths)
+    times = arange(len(speeds), dtype=float64) * 0.5
+    angles = 1000 + (speeds * 0.5).cumsum()
+    return times, angles
+
+
+def random_trajectory(seed, count):
+    rng = default_rng(seed)
+    # Runs of random lengths where the position is held or changes
+    lengths = rng.integers(1, 6, size=count)
+    positions = repeat(rng.normal(0, 10, size=(count, 3)), lengths, axis=0)
+    moving = rng.random(len(positions)) < 0.3
+    positions[moving] += rng.normal(0, 1, size=(moving.sum(), 3))
+    times = arange(len(positions), dtype=float64) / 25
+    return times, positions
+
+
+def test_trajectory_keypoints_match_static_hold_removal():
+    for seed in range(10):
+        times, positions = random_trajectory(seed, 200)
+        expected = reference_static_hold_keypoints(
+            [tuple(position) for position in positions.tolist()]
+        )
+
+        assert_array_equal(get_trajectory_keypoints(times, positions), expected)
+
+
+def test_trajectory_keypoints_with_short_inputs():
+    empty = array([], dtype=float64).reshape(0, 3)
+    assert_array_equal(get_trajectory_keypoints(array([]), empty), [])
+    assert_array_equal(get_trajectory_keypoints(array([0.0]), array([[1, 2, 3]])), [0])
+    assert_array_equal(
+        get_trajectory_keypoints(array([0.0, 1.0]), array([[1, 2, 3], [1, 2, 3]])),
+        [0, 1],
+    )
+
+
+def test_trajectory_keypoints_with_error_budget():
+    times, positions = random_trajectory(3, 300)
+
+    for eps in (0.1, 1.0, 5.0):
+        keypoints = get_trajectory_keypoints(times, positions, eps=eps)
+
+        assert keypoints[0] == 0 and keypoints[-1] == len(times) - 1
+        assert len(keypoints) <= len(get_trajectory_keypoints(times, positions))
+        for start, end in zip(keypoints, keypoints[1:]):
+            ratio = (times[start + 1 : end] - times[start]) / (
+                times[end] - times[start]
+            )
+            interp = positions[start] + ratio[:, None] * (
+                positions[end] - positions[start]
+            )
+            errors = ((interp - positions[start + 1 : end]) ** 2).sum(axis=1) ** 0.5
+            assert (errors <= eps).all()
+
+
+def test_light_program_keypoints_match_simplify_path():
+    for seed in range(10):
+        times, colors = random_colors(seed, 100)
+        items = [(t, *rgb) for t, rgb in zip(times.tolist(), colors.tolist())]
+        keypoints = simplify_path(
+            list(enumerate(items)),
+            eps=4,
+            distance_func=lambda keypoints, start, end: reference_color_distances(
+                [item for _, item in keypoints], start[1], end[1]
+            ),
+        )
+
+        assert_array_equal(
+            get_light_program_keypoints(times, colors), [i for i, _ in keypoints]
+        )
+
+
+def test_light_program_keypoints_with_error_budget():
+    times, colors = random_colors(5, 200)
+    colors = colors.astype(float64)
+
+    previous = len(times) + 1
+    for eps in (0, 4, 16, 64):
+        keypoints = get_light_program_keypoints(times, colors, eps=eps)
+
+        assert len(keypoints) <= previous
+        previous = len(keypoints)
+        for start, end in zip(keypoints, keypoints[1:]):
+            errors = reference_color_distances(
+                [(times[i], *colors[i]) for i in range(start + 1, end)],
+                (times[start], *colors[start]),
+                (times[end], *colors[end]),
+            )
+            assert all(error <= eps for error in errors)
+
+
+def test_simplify_yaw_angles_matches_loop():
+    for seed in range(10):
+        times, angles = random_yaw(seed, 50)
+        expected = reference_simplify_yaw(list(zip(times.tolist(), angles.tolist())))
+
+        new_times, new_angles = simplify_yaw_angles(times, angles)
+
+        assert_array_equal(new_times, [time for time, _ in expected])
+        assert_allclose(new_angles, [angle for _, angle in expected])
+
+
+def test_simplify_yaw_angles_with_error_budget():
+    times, angles = random_yaw(1, 100)
+    angles += default_rng(1).normal(0, 0.5, size=len(angles))
+
+    new_times, new_angles = simplify_yaw_angles(times, angles, eps=2.0)
+
+    assert len(new_times) < len(simplify_yaw_angles(times, angles)[0])
+    assert 0 <= new_angles[0] < 360
+    assert new_times[0] == times[0] and new_times[-1] == times[-1]
+    shifted = angles + (new_angles[0] - angles[0])
+    errors = abs(interp(times, new_times, new_angles) - shifted)
+    assert (errors <= 2.0 + 1e-9).all()
+
+
+def test_simplify_yaw_angles_with_short_inputs():
+    new_times, new_angles = simplify_yaw_angles([], [])
+    assert len(new_times) == len(new_angles) == 0
+
+    new_times, new_angles = simplify_yaw_angles([1.0], [-90.0])
+    assert_array_equal(new_times, [1.0])
+    assert_array_equal(new_angles, [270.0])
+
+
+def test_simplify_yaw_angles_with_non_causal_timestamps():
+    with raises(RuntimeError):
+        simplify_yaw_angles([0.0, 1.0, 1.0], [0.0, 10.0, 20.0])
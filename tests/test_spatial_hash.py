@@ -0,0 +1,170 @@
+from numpy import float64, sqrt, sum, triu_indices
+from numpy.random import default_rng
+from numpy.testing import assert_allclose, assert_array_equal
+from pytest import raises
+
+from sbstudio.math.spatial_hash import (
+    ProximityTracker,
+    SpatialHash,
+    find_closest_pair,
+)
+
+
+def brute_force_pairs(points, distance):
+    first, second = triu_indices(len(points), k=1)
+    distances = sqrt(sum((points[first] - points[second]) ** 2, axis=1))
+    close = distances < distance
+    pairs = sorted(
+        zip(distances[close].tolist(), first[close].tolist(), second[close].tolist())
+    )
+    return [(i, j) for _, i, j in pairs], [d for d, _, _ in pairs]
+
+
+def random_points(seed, count, extent):
+    return default_rng(seed).uniform(0, extent, size=(count, 3))
+
+
+def test_find_pairs_matches_brute_force():
+    for seed in range(5):
+        points = random_points(seed, 300, 20.0)
+        expected_pairs, expected_distances = brute_force_pairs(points, 1.5)
+
+        pairs, distances = SpatialHash(points, 1.5).find_pairs()
+
+        assert [tuple(pair) for pair in pairs.tolist()] == expected_pairs
+        assert_allclose(distances, expected_distances)
+
+
+def test_find_pairs_with_smaller_distance_than_cell_size():
+    points = random_points(42, 200, 10.0)
+    expected_pairs, _ = brute_force_pairs(points, 0.5)
+
+    pairs, _ = SpatialHash(points, 2.0).find_pairs(0.5)
+
+    assert [tuple(pair) for pair in pairs.tolist()] == expected_pairs
+
+
+def test_find_pairs_with_limit():
+    points = random_points(7, 200, 10.0)
+    expected_pairs, _ = brute_force_pairs(points, 1.0)
+
+    pairs, distances = SpatialHash(points, 1.0).find_pairs(max_pairs=5)
+
+    assert [tuple(pair) for pair in pairs.tolist()] == expected_pairs[:5]
+    assert len(distances) == 5
+
+
+def test_find_pairs_with_coincident_points():
+    points = [(0, 0, 0), (0, 0, 0), (5, 5, 5), (5, 5, 5.5)]
+
+    pairs, distances = SpatialHash(points, 1.0).find_pairs()
+
+    assert_array_equal(pairs, [(0, 1), (2, 3)])
+    assert_allclose(distances, [0.0, 0.5])
+
+
+def test_find_pairs_with_large_extent():
+    # The grid would have too many cells so the index should grow them
+    points = [(0, 0, 0), (0.5, 0, 0), (1e6, 1e6, 1e6), (1e6, 1e6, 1e6 + 0.25)]
+    index = SpatialHash(points, 1.0)
+
+    pairs, _ = index.find_pairs(1.0)
+
+    assert index.cell_size >= 1.0
+    assert_array_equal(pairs, [(2, 3), (0, 1)])
+
+
+def test_find_pairs_with_too_large_distance():
+    index = SpatialHash(random_points(0, 10, 5.0), 1.0)
+    with raises(ValueError):
+        index.find_pairs(2.0)
+
+
+def test_invalid_cell_size():
+    with raises(ValueError):
+        SpatialHash([(0, 0, 0)], 0)
+
+
+def test_find_closest_pair_matches_brute_force():
+    for seed in range(5):
+        points = random_points(seed, 100, 50.0)
+        expected_pairs, expected_distances = brute_force_pairs(points, float64("inf"))
+
+        # The initial cell size is too small on purpose so the function needs
+        # to grow it
+        result = find_closest_pair(points, 0.01)
+
+        assert result is not None
+        first, second, distance = result
+        assert (first, second) == expected_pairs[0]
+        assert_allclose(distance, expected_distances[0])
+
+
+def test_find_closest_pair_of_index():
+    points = [(0, 0, 0), (3, 0, 0), (3, 0.5, 0), (10, 0, 0)]
+
+    assert SpatialHash(points, 1.0).find_closest_pair() == (1, 2, 0.5)
+    assert SpatialHash(points, 0.25).find_closest_pair() is None
+
+
+def test_find_closest_pair_with_less_than_two_points():
+    assert find_closest_pair([], 1.0) is None
+    assert find_closest_pair([(1, 2, 3)], 1.0) is None
+
+
+def test_proximity_tracker_matches_brute_force_on_moving_points():
+    rng = default_rng(1)
+    points = rng.uniform(0, 30, size=(1000, 3))
+    velocities = rng.normal(0, 0.05, size=points.shape)
+    tracker = ProximityTracker(1.5)
+
+    rebuilds = 0
+    for frame in range(60):
+        if frame == 30:
+            # Jump to a completely different configuration
+            points = rng.uniform(0, 30, size=points.shape)
+        points = points + velocities
+        rebuilds += tracker.update(points)
+
+        expected_pairs, expected_distances = brute_force_pairs(points, 1.5)
+        pairs, distances = tracker.find_pairs()
+
+        assert [tuple(pair) for pair in pairs.tolist()] == expected_pairs
+        assert_allclose(distances, expected_distances)
+
+    # Most updates should have been incremental
+    assert len(tracker) == 1000
+    assert rebuilds < 10
+
+
+def test_proximity_tracker_rebuilds_when_needed():
+    tracker = ProximityTracker(1.0)
+    assert len(tracker) == 0
+    assert tracker.update([(0, 0, 0), (0.5, 0, 0)])
+    assert not tracker.update([(0, 0, 0), (0.6, 0, 0)])
+
+    # Number of points changed
+    assert tracker.update([(0, 0, 0), (0.6, 0, 0), (10, 0, 0)])
+
+    # Point left the grid
+    assert tracker.update([(0, 0, 0), (0.6, 0, 0), (1000, 0, 0)])
+
+    pairs, distances = tracker.find_pairs()
+    assert_array_equal(pairs, [(0, 1)])
+    assert_allclose(distances, [0.6])
+
+
+def test_proximity_tracker_with_limit():
+    points = random_points(3, 300, 10.0)
+    expected_pairs, _ = brute_force_pairs(points, 1.0)
+    tracker = ProximityTracker(1.0)
+    tracker.update(points)
+
+    pairs, _ = tracker.find_pairs(max_pairs=3)
+
+    assert [tuple(pair) for pair in pairs.tolist()] == expected_pairs[:3]
+
+
+def test_proximity_tracker_invalid_distance():
+    with raises(ValueError):
+        ProximityTracker(0)
@@ -0,0 +1,108 @@
+from math import hypot
+from numpy import array, asarray
+from numpy.random import default_rng
+from numpy.testing import assert_array_equal
+
+from sbstudio.utils import simplify_path, simplify_path_indices
+
+
+def reference_simplify_path(points, *, eps, distance_func):
+    """Recursive implementation of the Ramer-Douglas-Peucker algorithm that
+    `simplify_path()` replaced. `distance_func` receives all the points of the
+    segment, including its endpoints.
+    """
+    if not points:
+        return []
+
+    start, end = points[0], points[-1]
+    dists = distance_func(points, start, end)
+    index = max(range(len(dists)), key=dists.__getitem__)
+    if dists[index] <= eps:
+        return [start, end]
+
+    pre = reference_simplify_path(
+        points[: index + 1], eps=eps, distance_func=distance_func
+    )
+    post = reference_simplify_path(points[index:], eps=eps, distance_func=distance_func)
+    return pre[:-1] + post
+
+
+def distances_from_line(points, start, end):
+    """Distances of 2D points from the line through two other points."""
+    (x1, y1), (x2, y2) = start, end
+    length = hypot(x2 - x1, y2 - y1)
+    if length == 0:
+        return [hypot(x - x1, y - y1) for x, y in points]
+    return [
+        abs((x2 - x1) * (y1 - y) - (x1 - x) * (y2 - y1)) / length for x, y in points
+    ]
+
+
+def random_walk(seed, count):
+    rng = default_rng(seed)
+    steps = rng.normal(0, 1, size=(count, 2))
+    # Repeat some points to have segments with zero length and ties
+    steps[rng.random(count) < 0.2] = 0
+    return [tuple(point) for point in steps.cumsum(axis=0).tolist()]
+
+
+def test_simplify_path_matches_recursive_implementation():
+    for seed in range(10):
+        points = random_walk(seed, 500)
+        for eps in (0.0, 0.5, 2.0, 10.0):
+            expected = reference_simplify_path(
+                points, eps=eps, distance_func=distances_from_line
+            )
+            result = simplify_path(points, eps=eps, distance_func=distances_from_line)
+            assert result == expected
+
+
+def test_simplify_path_with_numpy_array():
+    points = random_walk(42, 300)
+    expected = reference_simplify_path(
+        points, eps=1.0, distance_func=distances_from_line
+    )
+
+    result = simplify_path(
+        array(points),
+        eps=1.0,
+        distance_func=lambda points, start, end: asarray(
+            distances_from_line(points.tolist(), start.tolist(), end.tolist())
+        ),
+    )
+
+    assert_array_equal(result, expected)
+
+
+def test_simplify_path_keeps_sequence_class():
+    points = tuple(random_walk(1, 50))
+    result = simplify_path(points, eps=1.0, distance_func=distances_from_line)
+    assert isinstance(result, tuple)
+
+
+def test_simplify_path_with_short_inputs():
+    assert simplify_path([], eps=1.0, distance_func=distances_from_line) == []
+    assert simplify_path([(1, 2)], eps=1.0, distance_func=distances_from_line) == [
+        (1, 2),
+        (1, 2),
+    ]
+    assert simplify_path(
+        [(1, 2), (3, 4)], eps=1.0, distance_func=distances_from_line
+    ) == [(1, 2), (3, 4)]
+
+
+def test_simplify_path_indices_with_long_input():
+    # Long inputs must not run into the recursion limit of Python, and every
+    # dropped point must be within the error term from its segment
+    num_points = 20000
+    points = random_walk(7, num_points)
+
+    def distance_func(start, end):
+        return distances_from_line(points[start + 1 : end], points[start], points[end])
+
+    result = simplify_path_indices(num_points, eps=0.5, distance_func=distance_func)
+
+    assert result[0] == 0 and result[-1] == num_points - 1
+    assert result == sorted(set(result))
+    for start, end in zip(result, result[1:]):
+        assert all(distance <= 0.5 for distance in distance_func(start, end))